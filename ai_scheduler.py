@@ -0,0 +1,105 @@
+"""Ordonnancement des mises à jour d'IA des ennemis.
+
+Les ennemis sont répartis en paliers selon leur distance au joueur : les proches
+sont mis à jour à chaque tick, les lointains seulement tous les N ticks, avec un
+décalage par ennemi pour étaler la charge. Les mises à jour des paliers lointains
+respectent un budget en millisecondes par tick, décompté après les ennemis
+proches ; celles qui le dépassent sont reportées au tick suivant et comptées. Le
+plus en retard est toujours servi, et un ennemi qui attend depuis `max_delay_ticks`
+ticks passe outre le budget : aucun ennemi lointain n'est privé de mises à jour.
+"""
+import math
+import time
+
+# (distance maximale au joueur, période en ticks), du plus proche au plus lointain
+DEFAULT_TIERS = ((8.0, 1), (16.0, 2), (math.inf, 4))
+# Retard (en ticks) au-delà duquel une mise à jour lointaine n'est plus reportée
+DEFAULT_MAX_DELAY_TICKS = 8
+
+
+class AIScheduler:
+    def __init__(self, tiers=DEFAULT_TIERS, budget_ms=None, max_delay_ticks=DEFAULT_MAX_DELAY_TICKS,
+                 clock=time.perf_counter):
+        self.tiers = tuple((max_distance * max_distance, period) for max_distance, period in tiers)
+        self.budget_ms = budget_ms  # None : pas de budget (simulation headless déterministe)
+        self.max_delay_ticks = max_delay_ticks
+        self.clock = clock  # Horloge en secondes du budget (remplaçable dans les tests)
+        self._last_update = {}  # ennemi -> tick de sa dernière mise à jour
+        self._phase = {}  # ennemi -> décalage de son créneau dans sa période
+        self.updates = 0  # Mises à jour effectuées
+        self.skipped = 0  # Ennemis lointains hors de leur créneau
+        self.deferred = 0  # Mises à jour dues mais reportées faute de budget
+        self.overruns = 0  # Ticks où le budget a été atteint
+        self.last_tick_ms = 0.0
+
+    def reset(self):
+        """Oublie les ennemis suivis (nouveau niveau)."""
+        self._last_update.clear()
+        self._phase.clear()
+
+    def forget(self, enemy):
+        self._last_update.pop(enemy, None)
+        self._phase.pop(enemy, None)
+
+    def period_for(self, distance_squared):
+        for max_distance_squared, period in self.tiers:
+            if distance_squared <= max_distance_squared:
+                return period
+        return self.tiers[-1][1]
+
+    def schedule(self, enemies, player, tick):
+        """Générateur des (ennemi, ticks écoulés) à mettre à jour pendant le tick `tick`.
+
+        Le temps passé par l'appelant entre deux valeurs compte : les ennemis du premier
+        palier sont toujours servis, hors budget ; les autres s'arrêtent au budget, sauf le
+        plus en retard et ceux qui attendent depuis `max_delay_ticks` ticks.
+        """
+        tick_start = self.clock()
+        mandatory, optional = [], []
+        for enemy in enemies:
+            period = self.period_for((enemy.x - player.x) ** 2 + (enemy.y - player.y) ** 2)
+            phase = self._phase.get(enemy)
+            if phase is None:
+                phase = self._phase[enemy] = len(self._phase)
+                # Vu pour la première fois : son retard court dès maintenant, même s'il est reporté
+                self._last_update[enemy] = tick - 1
+            elapsed = tick - self._last_update[enemy]
+            if period == 1:
+                mandatory.append((enemy, elapsed))
+            elif elapsed >= period or (tick + phase) % period == 0:
+                optional.append((enemy, elapsed))
+            else:
+                self.skipped += 1
+
+        for enemy, elapsed in mandatory:
+            self._last_update[enemy] = tick
+            self.updates += 1
+            yield enemy, elapsed
+
+        # Le budget ne couvre que les ennemis lointains : des proches lents ne les bloquent pas
+        start = self.clock()
+        # Les plus en retard d'abord, pour qu'un report ne se répète pas sur le même ennemi
+        optional.sort(key=lambda item: -item[1])
+        for position, (enemy, elapsed) in enumerate(optional):
+            if (position > 0 and elapsed < self.max_delay_ticks and self.budget_ms is not None
+                    and (self.clock() - start) * 1000 > self.budget_ms):
+                # Triés par retard décroissant : les suivants sont tous sous max_delay_ticks
+                self.deferred += len(optional) - position
+                self.overruns += 1
+                break
+            self._last_update[enemy] = tick
+            self.updates += 1
+            yield enemy, elapsed
+
+        self.last_tick_ms = (self.clock() - tick_start) * 1000
+
+    def stats(self):
+        """Compteurs de l'ordonnanceur (mises à jour faites, sautées, reportées)."""
+        return {
+            "tracked": len(self._last_update),
+            "updates": self.updates,
+            "skipped": self.skipped,
+            "deferred": self.deferred,
+            "overruns": self.overruns,
+            "last_tick_ms": self.last_tick_ms,
+        }
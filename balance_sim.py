@@ -0,0 +1,195 @@
+"""Simulation de parties headless en lot pour équilibrer la difficulté des niveaux.
+
+Chaque partie est jouée par un bot simple (viser l'ennemi le plus proche, tirer,
+boire une potion quand les PV sont bas) avec une graine fixe, dans un pool de
+processus. Les résultats sont agrégés par niveau de donjon dans un rapport
+CSV et/ou JSON.
+
+    python balance_sim.py --levels 1-5 --games 200 --csv balance.csv --json balance.json
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from dungeon_3d import TICK_RATE, Game, find_path_cached, has_line_of_sight  # noqa: E402
+
+REPORT_FIELDS = [
+    "level", "games", "survival_rate", "clear_rate", "timeout_rate",
+    "mean_time_to_clear", "median_time_to_clear", "mean_damage_taken", "median_damage_taken",
+    "mean_xp_gained", "mean_player_level", "mean_kills",
+]
+
+
+class BalanceBot:
+    """Bot de référence : se dirige vers l'ennemi le plus proche et lui tire dessus."""
+
+    def __init__(self, game):
+        self.game = game
+        self.path = []
+
+    def _next_waypoint(self, target):
+        player = self.game.player
+        start = (int(player.x), int(player.y))
+        goal = (int(target.x), int(target.y))
+        # Chemins mis en cache par niveau : avancer d'une case réutilise la fin du chemin déjà calculé
+        self.path = find_path_cached(self.game.dungeon, start, goal)
+        if self.path:
+            next_x, next_y = self.path[0]
+            return next_x + 0.5, next_y + 0.5
+        return target.x, target.y
+
+    def actions(self):
+        game = self.game
+        player = game.player
+        target = min(game.enemies, key=lambda e: (e.x - player.x) ** 2 + (e.y - player.y) ** 2)
+        actions = []
+
+        if player.hp < player.max_hp * 0.4 and player.potions > 0:
+            actions.append("use_potion")
+
+        in_sight = has_line_of_sight(player, target, game.dungeon)
+        goal_x, goal_y = (target.x, target.y) if in_sight else self._next_waypoint(target)
+        angle_diff = math.remainder(math.atan2(goal_y - player.y, goal_x - player.x) - player.angle, 2 * math.pi)
+
+        if angle_diff > 0.05:
+            actions.append("turn_right")
+        elif angle_diff < -0.05:
+            actions.append("turn_left")
+
+        if in_sight:
+            if abs(angle_diff) < 0.1:
+                actions.append("shoot")
+            if (target.x - player.x) ** 2 + (target.y - player.y) ** 2 > 9:
+                actions.append("forward")
+        elif abs(angle_diff) < 0.5:
+            actions.append("forward")
+        return actions
+
+
+def simulate_game(args):
+    """Joue une partie headless du niveau donné et retourne ses statistiques."""
+    level, seed, player_level, max_ticks = args
+    random.seed(seed)
+
+    game = Game(headless=True)
+    game.start_new_level(level)
+    for _ in range(player_level - 1):
+        game.player.gain_xp(game.player.xp_to_next_level)
+    game.player.hp = game.player.max_hp
+    enemies_at_start = len(game.enemies)
+
+    bot = BalanceBot(game)
+    status = None
+    while status is None and game.tick_count < max_ticks:
+        status = game.step(bot.actions() if game.enemies else ())
+
+    return {
+        "level": level,
+        "seed": seed,
+        "outcome": status or "timeout",
+        "ticks": game.tick_count,
+        "time": game.tick_count / TICK_RATE,
+        "damage_taken": game.damage_taken,
+        "xp_gained": game.xp_gained,
+        "player_level": game.player.level,
+        "kills": game.enemies_killed,
+        "enemies": enemies_at_start,
+    }
+
+
+def aggregate(results):
+    """Agrège les résultats des parties par niveau de donjon."""
+    by_level = {}
+    for result in results:
+        by_level.setdefault(result["level"], []).append(result)
+
+    report = []
+    for level in sorted(by_level):
+        games = by_level[level]
+        cleared = [g["time"] for g in games if g["outcome"] == "victory"]
+        damage = [g["damage_taken"] for g in games]
+        count = len(games)
+        report.append({
+            "level": level,
+            "games": count,
+            "survival_rate": sum(g["outcome"] != "dead" for g in games) / count,
+            "clear_rate": len(cleared) / count,
+            "timeout_rate": sum(g["outcome"] == "timeout" for g in games) / count,
+            "mean_time_to_clear": statistics.fmean(cleared) if cleared else None,
+            "median_time_to_clear": statistics.median(cleared) if cleared else None,
+            "mean_damage_taken": statistics.fmean(damage),
+            "median_damage_taken": statistics.median(damage),
+            "mean_xp_gained": statistics.fmean(g["xp_gained"] for g in games),
+            "mean_player_level": statistics.fmean(g["player_level"] for g in games),
+            "mean_kills": statistics.fmean(g["kills"] for g in games),
+        })
+    return report
+
+
+def parse_levels(text):
+    """'1-5' ou '1,3,7' -> liste de niveaux."""
+    levels = []
+    for part in text.split(","):
+        if "-" in part:
+            first, last = part.split("-")
+            levels.extend(range(int(first), int(last) + 1))
+        else:
+            levels.append(int(part))
+    return levels
+
+
+def run_batch(levels, games_per_level, base_seed=0, player_level=1, max_ticks=TICK_RATE * 180, workers=None):
+    """Joue `games_per_level` parties par niveau sur un pool de processus et retourne les résultats bruts."""
+    jobs = [(level, base_seed * 1_000_000 + level * 10_000 + i, player_level, max_ticks)
+            for level in levels for i in range(games_per_level)]
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(jobs) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(simulate_game, jobs, chunksize=chunksize))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulation headless en lot pour l'équilibrage des niveaux")
+    parser.add_argument("--levels", default="1-5", help="niveaux à simuler, ex. '1-5' ou '1,3,7'")
+    parser.add_argument("--games", type=int, default=100, help="parties par niveau")
+    parser.add_argument("--seed", type=int, default=0, help="graine de base")
+    parser.add_argument("--player-level", type=int, default=1, help="niveau du joueur au début de chaque partie")
+    parser.add_argument("--max-seconds", type=float, default=180, help="durée maximale d'une partie (temps de jeu)")
+    parser.add_argument("--workers", type=int, default=None, help="nombre de processus (défaut : nombre de cœurs)")
+    parser.add_argument("--csv", help="fichier CSV du rapport par niveau")
+    parser.add_argument("--json", help="fichier JSON du rapport (agrégats et parties)")
+    args = parser.parse_args()
+
+    levels = parse_levels(args.levels)
+    start = time.perf_counter()
+    results = run_batch(levels, args.games, args.seed, args.player_level, int(args.max_seconds * TICK_RATE), args.workers)
+    elapsed = time.perf_counter() - start
+    report = aggregate(results)
+
+    print(f"{len(results)} parties simulées en {elapsed:.1f}s ({len(results) / elapsed * 60:.0f} parties/min)")
+    for row in report:
+        clear_time = row["mean_time_to_clear"]
+        clear_text = f"{clear_time:.1f}s" if clear_time is not None else "-"
+        print(f"Niveau {row['level']}: survie {row['survival_rate']:.0%}, nettoyé {row['clear_rate']:.0%} "
+              f"en {clear_text}, dégâts {row['mean_damage_taken']:.1f}, XP {row['mean_xp_gained']:.1f}")
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+            writer.writeheader()
+            writer.writerows(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"levels": report, "games": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
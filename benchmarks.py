@@ -0,0 +1,685 @@
+"""Micro-benchmarks des structures du donjon.
+
+    python benchmarks.py            # tous les benchmarks
+    python benchmarks.py is_wall    # seulement ceux cités
+
+Chaque benchmark compare l'implémentation historique (recopiée ici) à l'actuelle
+sur les mêmes donjons générés avec une graine fixe.
+"""
+import math
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from ai_scheduler import AIScheduler  # noqa: E402
+from bullet_pool import BulletPool  # noqa: E402
+from collision import first_circle_hit, segment_wall_hit, sweep_circles  # noqa: E402
+from generation import carve_room, emplace_rooms, init_dungeon, make_rng, room_overlaps  # noqa: E402
+from dungeon_3d import BULLET_SPEED, HIT_RADIUS, Dungeon, Enemy, find_path, has_line_of_sight  # noqa: E402
+from level_cache import LevelCache, decode_level, encode_level  # noqa: E402
+from pathfinding import PathCache, RoomGraph  # noqa: E402
+from raycaster import wall_mask  # noqa: E402
+from spatial_hash import SpatialHash  # noqa: E402
+from visibility import FieldOfView  # noqa: E402
+
+
+def timed(function, repeat=5):
+    """Meilleur temps (en secondes) sur `repeat` exécutions de `function`."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def make_dungeon(seed, width=20, height=20):
+    random.seed(seed)
+    dungeon = Dungeon(width, height)
+    dungeon.generate()
+    return dungeon
+
+
+def legacy_is_wall(dungeon, x, y):
+    return (x < 0 or x >= dungeon.width or y < 0 or y >= dungeon.height or
+            dungeon.grid[int(y)][int(x)] == 0)
+
+
+def legacy_has_line_of_sight(player, enemy, dungeon):
+    dx = enemy.x - player.x
+    dy = enemy.y - player.y
+    distance = math.sqrt(dx * dx + dy * dy)
+    if distance == 0:
+        return True
+    steps = max(1, int(distance * 10))
+    step_x, step_y = dx / steps, dy / steps
+    x, y = player.x, player.y
+    for _ in range(steps):
+        x += step_x
+        y += step_y
+        if legacy_is_wall(dungeon, x, y):
+            return False
+    return True
+
+
+def legacy_find_path(dungeon, start, goal):
+    from heapq import heappop, heappush
+
+    def heuristic(a, b):
+        return abs(b[0] - a[0]) + abs(b[1] - a[1])
+
+    open_set = []
+    heappush(open_set, (0, start))
+    came_from = {}
+    g_score = {start: 0}
+
+    while open_set:
+        current = heappop(open_set)[1]
+        if current == goal:
+            path = []
+            while current in came_from:
+                path.append(current)
+                current = came_from[current]
+            return path[::-1]
+
+        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            neighbor = (current[0] + dx, current[1] + dy)
+            if dungeon.is_wall(*neighbor):
+                continue
+            tentative_g_score = g_score[current] + 1
+            if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
+                came_from[neighbor] = current
+                g_score[neighbor] = tentative_g_score
+                heappush(open_set, (tentative_g_score + heuristic(neighbor, goal), neighbor))
+    return []
+
+
+def legacy_emplace_rooms(dungeon, rng, max_rooms=20, min_size=3, max_size=8):
+    rooms = dungeon["rooms"]
+    for _ in range(max_rooms):
+        w = rng.randint(min_size, max_size)
+        h = rng.randint(min_size, max_size)
+        x = rng.randint(1, dungeon["width"] - w - 1)
+        y = rng.randint(1, dungeon["height"] - h - 1)
+
+        new_room = {"x": x, "y": y, "w": w, "h": h}
+        if not room_overlaps(new_room, rooms):
+            rooms.append(new_room)
+            carve_room(dungeon["grid"], new_room)
+
+
+def bench_is_wall():
+    """Dungeon.is_wall (bitmap bordé) contre l'accès historique à la grille avec tests de limites."""
+    dungeon = make_dungeon(0)
+    rng = random.Random(1)
+    points = [(rng.uniform(-1, dungeon.width + 1), rng.uniform(-1, dungeon.height + 1)) for _ in range(180_000)]
+    # Points lointains (balles ou rayons qui dépassent la carte), refusés par le test de plage
+    points += [(rng.uniform(-3 * dungeon.width, 4 * dungeon.width), rng.uniform(-3 * dungeon.height, 4 * dungeon.height))
+               for _ in range(20_000)]
+    assert all(legacy_is_wall(dungeon, x, y) == dungeon.is_wall(x, y) for x, y in points)
+
+    legacy = timed(lambda: [legacy_is_wall(dungeon, x, y) for x, y in points])
+    current = timed(lambda: [dungeon.is_wall(x, y) for x, y in points])
+    print(f"is_wall     historique {legacy / len(points) * 1e9:6.0f} ns/appel, "
+          f"bitmap {current / len(points) * 1e9:6.0f} ns/appel (x{legacy / current:.2f})")
+
+
+def bench_line_of_sight():
+    """has_line_of_sight lisant le bitmap contre la version historique appelant is_wall."""
+    from types import SimpleNamespace
+
+    dungeon = make_dungeon(0)
+    floor = [(x + 0.5, y + 0.5) for y in range(dungeon.height) for x in range(dungeon.width) if dungeon.grid[y][x]]
+    rng = random.Random(3)
+    pairs = [(SimpleNamespace(x=ax, y=ay), SimpleNamespace(x=bx, y=by))
+             for (ax, ay), (bx, by) in ((rng.choice(floor), rng.choice(floor)) for _ in range(5_000))]
+    for a, b in pairs:
+        assert legacy_has_line_of_sight(a, b, dungeon) == has_line_of_sight(a, b, dungeon)
+
+    legacy = timed(lambda: [legacy_has_line_of_sight(a, b, dungeon) for a, b in pairs])
+    current = timed(lambda: [has_line_of_sight(a, b, dungeon) for a, b in pairs])
+    print(f"visibilité  historique {legacy / len(pairs) * 1e6:6.1f} µs/appel, "
+          f"bitmap {current / len(pairs) * 1e6:6.1f} µs/appel (x{legacy / current:.2f})")
+
+
+def bench_field_of_view():
+    """Visibilité de tous les ennemis : une requête has_line_of_sight chacun contre un champ de vision par case."""
+    from types import SimpleNamespace
+
+    dungeon = make_dungeon(0)
+    floor = [(x, y) for y in range(dungeon.height) for x in range(dungeon.width) if dungeon.grid[y][x]]
+    rng = random.Random(4)
+    enemies = [SimpleNamespace(x=x + rng.random(), y=y + rng.random()) for x, y in rng.sample(floor, 10)]
+    origins = [rng.choice(floor) for _ in range(500)]
+    players = [SimpleNamespace(x=x + 0.5, y=y + 0.5) for x, y in origins]
+    field_of_view = FieldOfView(dungeon)
+
+    def field_of_view_ticks():
+        # Le joueur reste en moyenne plusieurs ticks dans une case : le champ n'est recalculé qu'au changement
+        for (x, y), player in zip(origins, players):
+            field_of_view.origin = None
+            for _ in range(30):
+                field_of_view.update((x, y))
+                for enemy in enemies:
+                    field_of_view.is_visible(enemy.x, enemy.y)
+
+    legacy = timed(lambda: [has_line_of_sight(player, enemy, dungeon)
+                            for player in players for _ in range(30) for enemy in enemies], repeat=3)
+    current = timed(field_of_view_ticks, repeat=3)
+    ticks = len(players) * 30
+    print(f"vision      10 ennemis, 30 ticks par case : has_line_of_sight {legacy / ticks * 1e6:6.1f} µs/tick, "
+          f"champ de vision {current / ticks * 1e6:6.1f} µs/tick (x{legacy / current:.2f})")
+
+
+def bench_spatial_hash():
+    """Requêtes de proximité d'un tick (espacement de chaque ennemi, tireur le plus proche) : balayage contre index."""
+    class Entity:
+        def __init__(self, x, y):
+            self.x, self.y = x, y
+
+    rng = random.Random(5)
+    for count in (10, 100, 1000):
+        size = max(20, int(count ** 0.5 * 4))
+        enemies = [Entity(rng.uniform(0, size), rng.uniform(0, size)) for _ in range(count)]
+        bullets = [(rng.uniform(0, size), rng.uniform(0, size)) for _ in range(20)]
+        index = SpatialHash(enemies)
+
+        def linear_tick():
+            for enemy in enemies:
+                any(math.sqrt((enemy.x - e.x) ** 2 + (enemy.y - e.y) ** 2) < 0.5 for e in enemies if e is not enemy)
+            for x, y in bullets:
+                min(enemies, key=lambda e: math.sqrt((x - e.x) ** 2 + (y - e.y) ** 2))
+
+        def hashed_tick():
+            for enemy in enemies:
+                any((enemy.x - e.x) ** 2 + (enemy.y - e.y) ** 2 < 0.25
+                    for e in index.nearby(enemy.x, enemy.y, 0.5) if e is not enemy)
+                index.update(enemy)
+            for x, y in bullets:
+                index.nearest(x, y)
+
+        legacy = timed(linear_tick, repeat=3)
+        current = timed(hashed_tick, repeat=3)
+        print(f"proximité   {count:5d} ennemis : balayage {legacy * 1e3:8.2f} ms/tick, "
+              f"index {current * 1e3:6.2f} ms/tick (x{legacy / current:.1f})")
+
+
+def bench_bullet_sweep():
+    """Balles tirées vers un ennemi à différentes vitesses : test ponctuel historique contre segment balayé."""
+    class Entity:
+        def __init__(self, x, y):
+            self.x, self.y = x, y
+
+    dungeon = make_dungeon(0)
+    floor = [(x, y) for y in range(dungeon.height) for x in range(dungeon.width) if dungeon.grid[y][x]]
+    rng = random.Random(6)
+    shots = []
+    for _ in range(2_000):
+        x, y = rng.choice(floor)
+        angle = rng.uniform(0, 2 * math.pi)
+        # Ennemi placé sur la trajectoire (décalage latéral inférieur au rayon), à 1-4 unités
+        distance, offset = rng.uniform(1, 4), rng.uniform(-HIT_RADIUS, HIT_RADIUS) * 0.9
+        target = Entity(x + 0.5 + math.cos(angle) * distance - math.sin(angle) * offset,
+                        y + 0.5 + math.sin(angle) * distance + math.cos(angle) * offset)
+        shots.append((x + 0.5, y + 0.5, angle, target))
+
+    def point_sampled(speed):
+        hits = 0
+        for x, y, angle, target in shots:
+            for _ in range(int(6 / speed) + 1):
+                x += math.cos(angle) * speed
+                y += math.sin(angle) * speed
+                if dungeon.is_wall(x, y):
+                    break
+                if abs(x - target.x) < HIT_RADIUS and abs(y - target.y) < HIT_RADIUS:
+                    hits += 1
+                    break
+        return hits
+
+    def swept(speed):
+        hits = 0
+        for x, y, angle, target in shots:
+            for _ in range(int(6 / speed) + 1):
+                x1, y1 = x + math.cos(angle) * speed, y + math.sin(angle) * speed
+                t = segment_wall_hit(dungeon, x, y, x1, y1)
+                if t is not None:
+                    x1, y1 = x + (x1 - x) * t, y + (y1 - y) * t
+                if first_circle_hit(x, y, x1, y1, (target,), HIT_RADIUS):
+                    hits += 1
+                    break
+                if t is not None:
+                    break
+                x, y = x1, y1
+        return hits
+
+    for speed in (0.3, 0.6, 1.2):
+        start = time.perf_counter()
+        legacy_hits = point_sampled(speed)
+        legacy = time.perf_counter() - start
+        start = time.perf_counter()
+        swept_hits = swept(speed)
+        current = time.perf_counter() - start
+        print(f"balles      vitesse {speed:.1f} : ponctuel {legacy_hits:4d} touches ({legacy * 1e3:5.1f} ms), "
+              f"balayé {swept_hits:4d} touches ({current * 1e3:5.1f} ms) sur {len(shots)} tirs")
+
+
+def bench_bullet_pool():
+    """Tick de N balles contre 20 ennemis : objets Python en liste contre réserve NumPy vectorisée."""
+    import numpy as np
+
+    class Entity:
+        def __init__(self, x, y):
+            self.x, self.y = x, y
+
+    class LegacyBullet:
+        def __init__(self, x, y, angle):
+            self.x, self.y, self.angle, self.life = x, y, angle, 60
+
+    dungeon = make_dungeon(0, 80, 80)
+    walls = wall_mask(dungeon.grid)
+    floor = [(x + 0.5, y + 0.5) for y in range(dungeon.height) for x in range(dungeon.width) if dungeon.grid[y][x]]
+    rng = random.Random(7)
+    enemies = [Entity(*rng.choice(floor)) for _ in range(20)]
+    enemy_x = np.array([e.x for e in enemies])
+    enemy_y = np.array([e.y for e in enemies])
+
+    for count in (100, 1000, 4000):
+        shots = [(*rng.choice(floor), rng.uniform(0, 2 * math.pi)) for _ in range(count)]
+
+        def legacy_tick():
+            bullets = [LegacyBullet(x, y, angle) for x, y, angle in shots]
+            for bullet in bullets[:]:
+                x0, y0 = bullet.x, bullet.y
+                x1, y1 = x0 + math.cos(bullet.angle) * BULLET_SPEED, y0 + math.sin(bullet.angle) * BULLET_SPEED
+                t = segment_wall_hit(dungeon, x0, y0, x1, y1)
+                if t is not None:
+                    x1, y1 = x0 + (x1 - x0) * t, y0 + (y1 - y0) * t
+                bullet.x, bullet.y = x1, y1
+                bullet.life -= 1
+                if first_circle_hit(x0, y0, x1, y1, enemies, HIT_RADIUS) or t is not None:
+                    bullets.remove(bullet)
+
+        def pool_tick():
+            pool = BulletPool(capacity=count, speed=BULLET_SPEED)
+            for x, y, angle in shots:
+                pool.spawn(x, y, angle)
+            indices, stopped = pool.advance(dungeon, walls)
+            hit_t, _ = sweep_circles(pool.prev_x[indices], pool.prev_y[indices], pool.x[indices], pool.y[indices],
+                                     enemy_x, enemy_y, HIT_RADIUS)
+            pool.release(indices[stopped | np.isfinite(hit_t)])
+
+        legacy = timed(legacy_tick, repeat=3)
+        current = timed(pool_tick, repeat=3)
+        print(f"réserve     {count:5d} balles : objets {legacy * 1e3:7.2f} ms/tick, "
+              f"NumPy {current * 1e3:6.2f} ms/tick (x{legacy / current:.1f}, création des balles comprise)")
+
+
+class LegacyEnemy:
+    """Ennemi historique : __dict__ par instance et statistiques recopiées d'un dict reconstruit."""
+
+    def __init__(self, x, y, enemy_type):
+        self.x = x
+        self.y = y
+        self.z = 0.0
+        self.height = 2.2
+        self.ground_level = True
+        self.enemy_type = enemy_type
+        self._set_stats_for_type(enemy_type)
+        self.move_timer = 0
+        self.shoot_timer = 0
+        self.is_shooting = False
+        self.shoot_animation = 0
+        self.hit_animation = 0
+        self.death_animation = 0
+        self.is_dead = False
+
+    def _set_stats_for_type(self, enemy_type):
+        stats = {
+            "goblin": {"hp": 20, "max_hp": 20, "level": 1, "xp_value": 15, "damage_dice": (1, 4), "accuracy": 65},
+            "skeleton": {"hp": 35, "max_hp": 35, "level": 2, "xp_value": 25, "damage_dice": (1, 6), "accuracy": 70},
+            "orc": {"hp": 50, "max_hp": 50, "level": 3, "xp_value": 35, "damage_dice": (1, 8), "accuracy": 75},
+            "troll": {"hp": 80, "max_hp": 80, "level": 4, "xp_value": 50, "damage_dice": (2, 6), "accuracy": 80},
+        }
+        enemy_stats = stats.get(enemy_type, stats["skeleton"])
+        self.hp = enemy_stats["hp"]
+        self.max_hp = enemy_stats["max_hp"]
+        self.level = enemy_stats["level"]
+        self.xp_value = enemy_stats["xp_value"]
+        self.damage_dice = enemy_stats["damage_dice"]
+        self.accuracy = enemy_stats["accuracy"]
+
+
+def bench_entities():
+    """Niveau de 10 000 ennemis : mémoire, création et accès aux attributs, classe historique contre __slots__."""
+    import tracemalloc
+
+    rng = random.Random(8)
+    spawns = [(rng.uniform(0, 200), rng.uniform(0, 200), rng.choice(["goblin", "skeleton", "orc", "troll"]))
+              for _ in range(10_000)]
+
+    for name, factory in (("historique", LegacyEnemy), ("__slots__", Enemy)):
+        tracemalloc.start()
+        enemies = [factory(x, y, enemy_type) for x, y, enemy_type in spawns]
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        create = timed(lambda: [factory(x, y, enemy_type) for x, y, enemy_type in spawns], repeat=3)
+        # Lectures et écritures d'un tick d'Enemy.update : position, timers et animations
+        def tick():
+            for enemy in enemies:
+                enemy.x += 0.0
+                enemy.shoot_timer += 1
+                if enemy.hit_animation > 0 or enemy.death_animation > 0 or enemy.shoot_animation > 0:
+                    enemy.y -= 0.0
+        access = timed(tick)
+        print(f"ennemis     {name:10s} {memory / len(enemies):6.0f} octets/ennemi, "
+              f"création {create / len(enemies) * 1e6:5.2f} µs, tick {access / len(enemies) * 1e9:5.0f} ns/ennemi")
+
+
+def bench_ai_scheduler():
+    """Ticks d'IA de N ennemis sur une carte 80x80 : tous à chaque tick contre ordonnanceur par paliers."""
+    from types import SimpleNamespace
+
+    dungeon = make_dungeon(9, 80, 80)
+    floor = [(x, y) for y in range(dungeon.height) for x in range(dungeon.width) if dungeon.grid[y][x]]
+    rng = random.Random(9)
+    start_x, start_y = rng.choice(floor)
+    path = [(start_x + 0.5, start_y + 0.5)]
+    for _ in range(119):
+        # Marche aléatoire du joueur, pour que le champ de vision soit recalculé de temps en temps
+        x, y = path[-1]
+        nx, ny = x + rng.choice([-0.2, 0, 0.2]), y + rng.choice([-0.2, 0, 0.2])
+        path.append((nx, ny) if not dungeon.is_wall(nx, ny) else (x, y))
+
+    for count in (50, 200, 800):
+        spawns = [(x + 0.5, y + 0.5) for x, y in rng.sample(floor, min(count, len(floor)))]
+
+        def run(scheduler):
+            enemies = [Enemy(x, y, "goblin") for x, y in spawns]
+            index = SpatialHash(enemies)
+            dungeon.field_of_view = None
+            player = SimpleNamespace(x=0.0, y=0.0)
+            worst = 0.0
+            start = time.perf_counter()
+            for tick, (player.x, player.y) in enumerate(path):
+                tick_start = time.perf_counter()
+                if scheduler is None:
+                    for enemy in enemies:
+                        enemy.update(player, dungeon, index)
+                        index.update(enemy)
+                else:
+                    for enemy, ticks in scheduler.schedule(enemies, player, tick):
+                        enemy.update(player, dungeon, index, ticks)
+                        index.update(enemy)
+                worst = max(worst, time.perf_counter() - tick_start)
+            return (time.perf_counter() - start) / len(path), worst
+
+        legacy, legacy_worst = run(None)
+        tiered, tiered_worst = run(AIScheduler())
+        budget = AIScheduler(budget_ms=1.0)
+        budgeted, budgeted_worst = run(budget)
+        print(f"IA          {count:4d} ennemis : tous {legacy * 1e3:6.2f} ms/tick (max {legacy_worst * 1e3:6.2f}), "
+              f"paliers {tiered * 1e3:6.2f} (max {tiered_worst * 1e3:6.2f}), "
+              f"budget 1 ms {budgeted * 1e3:6.2f} (max {budgeted_worst * 1e3:6.2f}, "
+              f"{budget.deferred} reports)")
+
+
+def bench_find_path():
+    """find_path sur la table des voisins contre l'A* historique sur des tuples."""
+    for size in (20, 80):
+        dungeon = make_dungeon(0, size, size)
+        floor = [(x, y) for y in range(size) for x in range(size) if dungeon.grid[y][x]]
+        rng = random.Random(2)
+        queries = [(rng.choice(floor), rng.choice(floor)) for _ in range(200)]
+        for start, goal in queries:
+            assert legacy_find_path(dungeon, start, goal) == find_path(dungeon, start, goal)
+
+        legacy = timed(lambda: [legacy_find_path(dungeon, s, g) for s, g in queries], repeat=3)
+        current = timed(lambda: [find_path(dungeon, s, g) for s, g in queries], repeat=3)
+        print(f"find_path   {size}x{size} historique {legacy / len(queries) * 1e6:7.1f} µs/appel, "
+              f"voisins {current / len(queries) * 1e6:7.1f} µs/appel (x{legacy / current:.2f})")
+
+
+class CountingNeighbors(list):
+    """Table des voisins qui compte ses lectures : une lecture par case développée."""
+    reads = 0
+
+    def __getitem__(self, index):
+        self.reads += 1
+        return list.__getitem__(self, index)
+
+
+def bench_room_graph():
+    """Chemins d'un bout à l'autre du donjon : find_path contre recherche hiérarchique sur le graphe des salles."""
+    for size in (20, 80, 256):
+        random.seed(0)
+        dungeon = Dungeon(size, size)
+        # Une salle pour 200 cases de carte, pour que les grands donjons soient remplis
+        dungeon.generate_rooms(max_rooms=max(10, size * size // 200))
+        dungeon.generate_corridors()
+        dungeon.freeze()
+        build = timed(lambda: RoomGraph(dungeon), repeat=3)
+        graph = dungeon.get_room_graph()
+
+        floor = [(x, y) for y in range(size) for x in range(size) if dungeon.grid[y][x]]
+        rng = random.Random(10)
+        queries = [(rng.choice(floor), rng.choice(floor)) for _ in range(100)]
+        flat_lengths = [len(find_path(dungeon, s, g)) for s, g in queries]
+        graph_lengths = [len(graph.find_path(s, g)) for s, g in queries]
+        assert [bool(n) for n in flat_lengths] == [bool(n) for n in graph_lengths]
+
+        counting = CountingNeighbors(dungeon.neighbors)
+        dungeon.neighbors = counting
+        for s, g in queries:
+            find_path(dungeon, s, g)
+        flat_expansions = counting.reads
+        dungeon.neighbors = list(counting)
+        graph_expansions = 0
+        for s, g in queries:
+            graph.find_path(s, g)
+            graph_expansions += graph.expansions
+
+        flat = timed(lambda: [find_path(dungeon, s, g) for s, g in queries], repeat=3)
+        hierarchical = timed(lambda: [graph.find_path(s, g) for s, g in queries], repeat=3)
+        print(f"hiérarchie  {size}x{size} ({len(graph)} régions, construit en {build * 1e3:.1f} ms) : "
+              f"find_path {flat / len(queries) * 1e6:7.1f} µs, {flat_expansions / len(queries):6.0f} cases ; "
+              f"graphe {hierarchical / len(queries) * 1e6:7.1f} µs, {graph_expansions / len(queries):6.0f} cases ; "
+              f"chemins x{sum(graph_lengths) / max(1, sum(flat_lengths)):.3f}")
+
+
+def bench_path_cache():
+    """Marcheurs qui redemandent leur chemin à chaque case : find_path contre cache LRU avec suffixes."""
+    dungeon = make_dungeon(0, 80, 80)
+    floor = [(x, y) for y in range(dungeon.height) for x in range(dungeon.width) if dungeon.grid[y][x]]
+    rng = random.Random(11)
+    # Quelques cibles communes (le joueur, des potions) et beaucoup de points de départ
+    goals = rng.sample(floor, 5)
+    walks = [(rng.choice(floor), rng.choice(goals)) for _ in range(100)]
+
+    def run(search):
+        for start, goal in walks:
+            path = search(dungeon, start, goal)
+            while path:
+                path = search(dungeon, path[0], goal)
+
+    cache = PathCache()
+    legacy = timed(lambda: run(find_path), repeat=1)
+    current = timed(lambda: run(lambda d, s, g: cache.get(d, s, g, find_path)), repeat=1)
+    stats = cache.stats()
+    print(f"cache       {len(walks)} marcheurs : find_path {legacy * 1e3:7.1f} ms, cache {current * 1e3:6.1f} ms "
+          f"(x{legacy / current:.1f}, {stats['hit_rate']:.1%} de réussites dont {stats['suffix_hits']} par suffixe)")
+
+
+def bench_level_cache():
+    """Installation d'un niveau : génération, LevelData en mémoire ou sur disque, niveau préparé réinstallé (redémarrage)."""
+    import tempfile
+
+    from dungeon_3d import Game
+
+    random.seed(12)
+    game = Game(headless=True)
+    game.verbose = False
+    levels = [1, 2, 3, 4, 5]
+
+    def setup(clear_prepared=True):
+        for level in levels:
+            if clear_prepared:
+                game.prepared_levels.clear()
+            game.setup_dungeon(level)
+
+    def generate():
+        game.level_cache.clear()
+        setup()
+
+    def restart():
+        # Le joueur meurt et rejoue le niveau : même clé, niveau préparé réinstallé tel quel
+        elapsed = 0.0
+        for level in levels:
+            game.setup_dungeon(level)
+            start = time.perf_counter()
+            game.setup_dungeon(level)
+            elapsed += time.perf_counter() - start
+        return elapsed
+
+    generated = timed(generate, repeat=3)
+    in_memory = timed(setup, repeat=3)
+    restarted = min(restart() for _ in range(3))
+    spawned = timed(lambda: [game.place_entities_for_level(level) for level in levels], repeat=3)
+    with tempfile.TemporaryDirectory() as directory:
+        game.level_cache = LevelCache(directory)
+        setup()
+        level = game.cached_level
+        on_disk = timed(lambda: (game.level_cache.clear(), setup()), repeat=3)
+    size = len(encode_level(level))
+    decode = timed(lambda: decode_level(encode_level(level)), repeat=5)
+    print(f"niveaux     {len(levels)} niveaux 20x20 : génération {generated / len(levels) * 1e3:6.2f} ms/niveau, "
+          f"LevelData en mémoire {in_memory / len(levels) * 1e3:5.2f} ms, sur disque {on_disk / len(levels) * 1e3:5.2f} ms "
+          f"(grille relue, freeze et champ de vision refaits), niveau préparé réinstallé "
+          f"{restarted / len(levels) * 1e3:5.3f} ms ; apparitions {spawned / len(levels) * 1e3:5.2f} ms dans tous les cas "
+          f"({size} octets, encodage + décodage {decode * 1e6:.0f} µs)")
+
+
+def bench_level_prefetch():
+    """Transition de niveau : préparation synchrone contre niveau préparé dans le thread de fond."""
+    from dungeon_3d import bake_minimap_surface, prepare_level
+    from level_prefetch import LevelPrefetcher
+
+    types = ["orc", "troll"]
+    prefetcher = LevelPrefetcher(prepare_level)
+    for size in (20, 80, 256):
+        # Une salle pour 200 cases de carte, comme bench_room_graph
+        keys = [(seed, size, size, (max(10, size * size // 200), 3, 6), 3) for seed in range(3)]
+        synchronous = timed(lambda: [prepare_level(key, types) for key in keys], repeat=1) / len(keys)
+        transition = 0.0
+        for key in keys:
+            prefetcher.request(key, types)
+            prefetcher.wait()  # Le niveau en cours dure bien plus longtemps que la préparation
+            start = time.perf_counter()
+            prepared = prefetcher.take(key)
+            # La Surface de la mini-carte est créée dans le thread principal, à la transition
+            bake_minimap_surface(prepared.minimap)
+            transition += time.perf_counter() - start
+            assert prepared is not None and prepared.key == key
+        print(f"préchargement {size}x{size} : synchrone {synchronous * 1e3:7.1f} ms/niveau, "
+              f"préparé en arrière-plan {transition / len(keys) * 1e6:5.1f} µs à la transition (mini-carte comprise)")
+    prefetcher.shutdown()
+
+
+def bench_room_placement():
+    """Placement des salles : tirages rejetés en cas de chevauchement contre index d'occupation (Scattered, Packed)."""
+    # (côté, salles demandées) : difficulté 3 de dungeon.py, puis une salle pour 200 cases
+    for size, count in ((80, 25), (256, 330), (1024, 5000)):
+        seeds = range(5) if size < 1024 else range(1)
+
+        def place(function, **options):
+            placed = 0
+            for seed in seeds:
+                dungeon = init_dungeon(size, size, seed)
+                function(dungeon, make_rng(seed), count, 3, 8, **options)
+                placed += len(dungeon["rooms"])
+            return placed / len(seeds)
+
+        results = []
+        for label, function, options in (("rejet", legacy_emplace_rooms, {}),
+                                         ("Scattered", emplace_rooms, {}),
+                                         ("Packed", emplace_rooms, {"room_layout": "Packed"})):
+            placed = place(function, **options)
+            elapsed = timed(lambda: place(function, **options), repeat=1) / len(seeds)
+            results.append(f"{label} {placed:6.0f} salles en {elapsed * 1e3:7.1f} ms")
+        print(f"salles {size}x{size} ({count} demandées) : " + ", ".join(results))
+
+
+# Sortie de dungeon.pl (options par défaut, 39x39) avec 'seed' => graine, pour les graines 1 à 20 :
+# graine -> (octets du JSON, salles, portes, cases de couloir hors salles, escaliers). Relevé avec perl 5.36,
+# la partie image (GD) du script retirée et JSON::PP à la place de JSON ; la génération est inchangée.
+PERL_REFERENCE = {
+    1: (7749, 8, 19, 398, 2), 2: (7348, 7, 18, 493, 2), 3: (7748, 7, 19, 470, 2), 4: (8580, 10, 22, 404, 2),
+    5: (6751, 6, 14, 460, 2), 6: (10670, 12, 34, 318, 2), 7: (7318, 8, 16, 414, 2), 8: (10056, 10, 33, 393, 2),
+    9: (8670, 11, 22, 450, 2), 10: (7835, 8, 19, 431, 2), 11: (8175, 8, 24, 477, 2), 12: (9033, 10, 25, 421, 2),
+    13: (7281, 7, 16, 385, 2), 14: (8477, 9, 22, 392, 2), 15: (7627, 9, 18, 537, 2), 16: (8186, 10, 19, 458, 2),
+    17: (8454, 9, 23, 357, 2), 18: (9117, 10, 26, 414, 2), 19: (8903, 9, 25, 403, 2), 20: (8028, 8, 20, 373, 2),
+}
+
+
+def maze_summary(dungeon):
+    """(octets du JSON, salles, portes, cases de couloir hors salles, escaliers), comme PERL_REFERENCE."""
+    import maze
+
+    corridors = sum(1 for cell in dungeon["cell"] if cell & maze.CORRIDOR and not cell & maze.ROOM)
+    return (len(maze.to_json(dungeon)), dungeon["n_rooms"], len(dungeon["door"]), corridors, len(dungeon["stair"]))
+
+
+def bench_maze():
+    """Générateur de dungeon.pl porté (maze.py) : temps et contenu, comparés à la sortie du script Perl (PERL_REFERENCE)."""
+    import maze
+
+    for size in (39, 101, 1001):
+        dungeon = maze.create_dungeon(seed=1, n_rows=size, n_cols=size)
+        elapsed = timed(lambda: maze.create_dungeon(seed=1, n_rows=size, n_cols=size), repeat=1 if size > 500 else 3)
+        json_size, rooms, doors, corridors, _ = maze_summary(dungeon)
+        print(f"maze {size}x{size} : {elapsed * 1e3:7.1f} ms, {rooms} salles, {doors} portes, {corridors} cases de couloir, "
+              f"cases {len(dungeon['cell']) * dungeon['cell'].itemsize} octets, JSON {json_size} octets")
+
+    # Générateurs aléatoires différents (srand de Perl, random.Random) : on compare les distributions sur 20 graines
+    ported = [maze_summary(maze.create_dungeon(seed=seed)) for seed in PERL_REFERENCE]
+    reference = list(PERL_REFERENCE.values())
+    for position, label in enumerate(("octets JSON", "salles", "portes", "cases de couloir", "escaliers")):
+        perl_values = [values[position] for values in reference]
+        port_values = [values[position] for values in ported]
+        print(f"maze 39x39 {label:17s}: dungeon.pl moyenne {sum(perl_values) / len(perl_values):7.1f} "
+              f"[{min(perl_values)}-{max(perl_values)}], portage {sum(port_values) / len(port_values):7.1f} "
+              f"[{min(port_values)}-{max(port_values)}]")
+
+
+BENCHMARKS = {
+    "is_wall": bench_is_wall,
+    "line_of_sight": bench_line_of_sight,
+    "field_of_view": bench_field_of_view,
+    "spatial_hash": bench_spatial_hash,
+    "bullet_sweep": bench_bullet_sweep,
+    "bullet_pool": bench_bullet_pool,
+    "entities": bench_entities,
+    "ai_scheduler": bench_ai_scheduler,
+    "find_path": bench_find_path,
+    "room_graph": bench_room_graph,
+    "path_cache": bench_path_cache,
+    "level_cache": bench_level_cache,
+    "level_prefetch": bench_level_prefetch,
+    "room_placement": bench_room_placement,
+    "maze": bench_maze,
+}
+
+
+def main():
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            sys.exit(f"Benchmark inconnu : {name} (disponibles : {', '.join(BENCHMARKS)})")
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main()
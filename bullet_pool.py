@@ -0,0 +1,144 @@
+"""Réserve de projectiles en tableaux NumPy parallèles.
+
+Les balles vivent dans des tableaux de capacité fixe (une colonne par attribut)
+avec une liste de places libres : tirer ne crée pas d'objet, retirer une balle
+est en O(1), et le déplacement, les collisions avec les murs et le sol ainsi que
+l'expiration sont calculés pour toutes les balles à la fois.
+"""
+import math
+from collections import namedtuple
+
+import numpy as np
+
+from collision import segment_wall_hit, sweep_walls
+
+# Valeurs de la colonne owner
+OWNER_PLAYER, OWNER_ENEMY = 0, 1
+
+# Jusqu'à ce nombre de balles, le calcul balle par balle en Python coûte moins que les appels NumPy
+SCALAR_BATCH_MAX = 32
+
+# Vue en lecture seule d'une balle, utilisée pour le rendu
+BulletView = namedtuple("BulletView", ["x", "y", "z", "is_player_bullet"])
+
+
+class BulletPool:
+    def __init__(self, capacity=4096, speed=0.3, life=60):
+        self.capacity = capacity
+        self.speed = speed
+        self.life_ticks = life
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.z = np.zeros(capacity)
+        self.angle = np.zeros(capacity)
+        self.z_velocity = np.zeros(capacity)
+        self.life = np.zeros(capacity, dtype=np.int32)
+        self.owner = np.zeros(capacity, dtype=np.int8)
+        self.active = np.zeros(capacity, dtype=bool)
+        # Début du segment parcouru pendant le dernier tick
+        self.prev_x = np.zeros(capacity)
+        self.prev_y = np.zeros(capacity)
+        self.free = list(range(capacity - 1, -1, -1))  # Pile des places libres
+        self.dropped = 0  # Tirs perdus faute de place
+
+    def __len__(self):
+        return self.capacity - len(self.free)
+
+    def __iter__(self):
+        for index in np.flatnonzero(self.active):
+            yield BulletView(float(self.x[index]), float(self.y[index]), float(self.z[index]),
+                             self.owner[index] == OWNER_PLAYER)
+
+    def spawn(self, x, y, angle, is_player_bullet=True, z=1.0, z_velocity=0.0):
+        """Ajoute une balle (mêmes paramètres que l'ancien Bullet) ; retourne sa place, ou None si la réserve est pleine."""
+        if not self.free:
+            self.dropped += 1
+            return None
+        index = self.free.pop()
+        self.x[index] = self.prev_x[index] = x
+        self.y[index] = self.prev_y[index] = y
+        self.z[index] = z
+        self.angle[index] = angle
+        self.z_velocity[index] = z_velocity
+        self.life[index] = self.life_ticks
+        self.owner[index] = OWNER_PLAYER if is_player_bullet else OWNER_ENEMY
+        self.active[index] = True
+        return index
+
+    def release(self, indices):
+        """Retire les balles des places `indices` (ignorées si déjà libres)."""
+        for index in indices:
+            index = int(index)
+            if self.active[index]:
+                self.active[index] = False
+                self.free.append(index)
+
+    def clear(self):
+        self.active[:] = False
+        self.free = list(range(self.capacity - 1, -1, -1))
+
+    def segment(self, index):
+        """Segment (x0, y0, x1, y1) parcouru par la balle `index` pendant le dernier tick."""
+        return float(self.prev_x[index]), float(self.prev_y[index]), float(self.x[index]), float(self.y[index])
+
+    def advance(self, dungeon, walls):
+        """Avance toutes les balles actives d'un tick.
+
+        Chaque trajet est arrêté au point d'impact exact avec un mur (bitmap de `dungeon`,
+        ou masque `walls` de raycaster.wall_mask pour les grands lots) ou avec le sol.
+        Retourne (indices, stopped) : les places des balles déplacées et, pour chacune,
+        si elle s'est arrêtée ou a expiré ce tick. Les balles arrêtées restent actives
+        pour que l'appelant teste d'abord leurs impacts.
+        """
+        indices = np.flatnonzero(self.active)
+        if not indices.size:
+            return indices, np.zeros(0, dtype=bool)
+        if indices.size <= SCALAR_BATCH_MAX:
+            return indices, self._advance_scalar(indices, dungeon)
+
+        x0, y0, z0 = self.x[indices], self.y[indices], self.z[indices]
+        angle, z_velocity = self.angle[indices], self.z_velocity[indices]
+        move_x = np.cos(angle) * self.speed
+        move_y = np.sin(angle) * self.speed
+
+        # Première fraction du trajet qui rencontre un mur ou le sol
+        t = sweep_walls(walls, x0, y0, x0 + move_x, y0 + move_y)
+        falling = z0 + z_velocity < 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ground_t = np.where(falling, np.maximum(z0, 0.0) / -z_velocity, np.inf)
+        t = np.minimum(t, ground_t)
+        fraction = np.minimum(t, 1.0)
+
+        self.prev_x[indices] = x0
+        self.prev_y[indices] = y0
+        self.x[indices] = x0 + move_x * fraction
+        self.y[indices] = y0 + move_y * fraction
+        self.z[indices] = z0 + z_velocity * fraction
+        life = self.life[indices] - 1
+        self.life[indices] = life
+        return indices, (t <= 1.0) | (life <= 0)
+
+    def _advance_scalar(self, indices, dungeon):
+        """Même calcul que advance, balle par balle, pour les petits lots."""
+        stopped = np.zeros(indices.size, dtype=bool)
+        for row, index in enumerate(indices.tolist()):
+            x0, y0, z0 = float(self.x[index]), float(self.y[index]), float(self.z[index])
+            angle, z_velocity = float(self.angle[index]), float(self.z_velocity[index])
+            move_x = math.cos(angle) * self.speed
+            move_y = math.sin(angle) * self.speed
+
+            t = segment_wall_hit(dungeon, x0, y0, x0 + move_x, y0 + move_y)
+            t = math.inf if t is None else t
+            if z0 + z_velocity < 0:
+                t = min(t, max(z0, 0.0) / -z_velocity)
+            fraction = min(t, 1.0)
+
+            self.prev_x[index] = x0
+            self.prev_y[index] = y0
+            self.x[index] = x0 + move_x * fraction
+            self.y[index] = y0 + move_y * fraction
+            self.z[index] = z0 + z_velocity * fraction
+            life = self.life[index] - 1
+            self.life[index] = life
+            stopped[row] = t <= 1.0 or life <= 0
+        return stopped
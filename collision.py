@@ -0,0 +1,157 @@
+"""Collisions continues des projectiles.
+
+Le trajet d'une balle pendant un tick est traité comme un segment : on cherche la
+première fraction t ∈ [0, 1] du segment où il entre dans un mur (DDA sur le
+bitmap Dungeon.walkable) ou dans le cercle d'une cible. Le résultat est exact
+quelle que soit la vitesse de la balle.
+
+Les fonctions sweep_walls et sweep_circles traitent un lot de segments à la fois
+(tableaux NumPy) pour la réserve de balles.
+"""
+import math
+
+import numpy as np
+
+
+def segment_wall_hit(dungeon, x0, y0, x1, y1):
+    """Fraction du segment (x0, y0) -> (x1, y1) où il entre dans un mur, None s'il n'en traverse aucun."""
+    map_x, map_y = math.floor(x0), math.floor(y0)
+    if not (0 <= map_x < dungeon.width and 0 <= map_y < dungeon.height):
+        return 0.0
+    walkable = dungeon.walkable
+    index = dungeon.cell_index(map_x, map_y)
+    if not walkable[index]:
+        return 0.0
+
+    dx, dy = x1 - x0, y1 - y0
+    # Même parcours case par case que cast_ray, paramétré par la fraction du segment
+    if dx > 0:
+        step_x, delta_x = 1, 1.0 / dx
+        side_x = (map_x + 1 - x0) * delta_x
+    elif dx < 0:
+        step_x, delta_x = -1, -1.0 / dx
+        side_x = (x0 - map_x) * delta_x
+    else:
+        step_x, delta_x, side_x = 0, math.inf, math.inf
+
+    if dy > 0:
+        step_y, delta_y = dungeon.stride, 1.0 / dy
+        side_y = (map_y + 1 - y0) * delta_y
+    elif dy < 0:
+        step_y, delta_y = -dungeon.stride, -1.0 / dy
+        side_y = (y0 - map_y) * delta_y
+    else:
+        step_y, delta_y, side_y = 0, math.inf, math.inf
+
+    while True:
+        if side_x < side_y:
+            t = side_x
+            side_x += delta_x
+            index += step_x
+        else:
+            t = side_y
+            side_y += delta_y
+            index += step_y
+        if t > 1.0:
+            return None
+        if not walkable[index]:
+            return t
+
+
+def segment_circle_hit(x0, y0, x1, y1, center_x, center_y, radius):
+    """Fraction du segment où il entre dans le cercle, 0 s'il y commence, None s'il ne le touche pas."""
+    dx, dy = x1 - x0, y1 - y0
+    fx, fy = x0 - center_x, y0 - center_y
+    c = fx * fx + fy * fy - radius * radius
+    if c <= 0:
+        return 0.0
+    a = dx * dx + dy * dy
+    if a == 0:
+        return None
+    b = 2 * (fx * dx + fy * dy)
+    discriminant = b * b - 4 * a * c
+    if discriminant < 0:
+        return None
+    t = (-b - math.sqrt(discriminant)) / (2 * a)
+    return t if 0.0 <= t <= 1.0 else None
+
+
+def first_circle_hit(x0, y0, x1, y1, entities, radius):
+    """Première entité (cercle de rayon `radius` autour de x, y) touchée par le segment.
+
+    Retourne (t, entité) ou None.
+    """
+    best = None
+    for entity in entities:
+        t = segment_circle_hit(x0, y0, x1, y1, entity.x, entity.y, radius)
+        if t is not None and (best is None or t < best[0]):
+            best = (t, entity)
+    return best
+
+
+def sweep_walls(walls, x0, y0, x1, y1):
+    """Version vectorisée de segment_wall_hit sur le masque bordé de raycaster.wall_mask.
+
+    Retourne pour chaque segment la fraction où il entre dans un mur, inf s'il n'en traverse aucun.
+    """
+    n = x0.shape[0]
+    t = np.full(n, np.inf)
+    map_x = np.floor(x0).astype(np.intp) + 1
+    map_y = np.floor(y0).astype(np.intp) + 1
+    inside = (map_x >= 0) & (map_x < walls.shape[1]) & (map_y >= 0) & (map_y < walls.shape[0])
+    blocked = ~inside
+    blocked[inside] = walls[map_y[inside], map_x[inside]]
+    t[blocked] = 0.0
+
+    dx, dy = x1 - x0, y1 - y0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        delta_x = np.where(dx != 0, np.abs(1.0 / dx), np.inf)
+        delta_y = np.where(dy != 0, np.abs(1.0 / dy), np.inf)
+        side_x = np.where(dx > 0, (map_x - x0) * delta_x, (x0 - map_x + 1) * delta_x)
+        side_y = np.where(dy > 0, (map_y - y0) * delta_y, (y0 - map_y + 1) * delta_y)
+    side_x[dx == 0] = np.inf
+    side_y[dy == 0] = np.inf
+    step_x = np.where(dx > 0, 1, -1)
+    step_y = np.where(dy > 0, 1, -1)
+
+    # Même boucle que cast_rays : chaque itération avance chaque segment actif d'une case
+    active = ~blocked
+    while active.any():
+        use_x = side_x < side_y
+        crossing = np.where(use_x, side_x, side_y)
+        active &= crossing <= 1.0
+        adv_x = active & use_x
+        adv_y = active & ~use_x
+        map_x += step_x * adv_x
+        map_y += step_y * adv_y
+        side_x = np.where(adv_x, side_x + delta_x, side_x)
+        side_y = np.where(adv_y, side_y + delta_y, side_y)
+
+        landed = active & walls[map_y, map_x]
+        t[landed] = crossing[landed]
+        active &= ~landed
+    return t
+
+
+def sweep_circles(x0, y0, x1, y1, center_x, center_y, radius):
+    """Version vectorisée de first_circle_hit : segments (n) contre cercles (m).
+
+    Retourne (t, cible) : pour chaque segment, la fraction du premier impact (inf si aucun)
+    et l'index du cercle touché.
+    """
+    dx = (x1 - x0)[:, None]
+    dy = (y1 - y0)[:, None]
+    fx = x0[:, None] - center_x[None, :]
+    fy = y0[:, None] - center_y[None, :]
+    a = dx * dx + dy * dy
+    b = 2 * (fx * dx + fy * dy)
+    c = fx * fx + fy * fy - radius * radius
+    discriminant = b * b - 4 * a * c
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = (-b - np.sqrt(np.maximum(discriminant, 0.0))) / (2 * a)
+    t = np.where((discriminant >= 0) & (a > 0) & (t >= 0) & (t <= 1), t, np.inf)
+    t[c <= 0] = 0.0
+
+    target = np.argmin(t, axis=1) if t.shape[1] else np.zeros(t.shape[0], dtype=np.intp)
+    first_t = t[np.arange(t.shape[0]), target] if t.shape[1] else np.full(t.shape[0], np.inf)
+    return first_t, target
@@ -1,81 +1,8 @@
-import random
 import pygame
 from PIL import Image
 
+from generation import generate
 
-def init_dungeon(width=50, height=50):
-	return {"width": width, "height": height, "grid": [[0 for _ in range(width)] for _ in range(height)], "rooms": [], "connections": [], "stairs": []}
-
-def emplace_rooms(dungeon, max_rooms=20, min_size=3, max_size=8):
-    width = dungeon["width"]
-    height = dungeon["height"]
-    grid = dungeon["grid"]
-    rooms = []
-
-    for _ in range(max_rooms):
-        w = random.randint(min_size, max_size)
-        h = random.randint(min_size, max_size)
-        x = random.randint(1, width - w - 1)
-        y = random.randint(1, height - h - 1)
-
-        new_room = {"x": x, "y": y, "w": w, "h": h}
-        overlap = any(
-            x < r["x"] + r["w"] and x + w > r["x"] and
-            y < r["y"] + r["h"] and y + h > r["y"]
-            for r in rooms
-        )
-
-        if not overlap:
-            rooms.append(new_room)
-            for i in range(x, x + w):
-                for j in range(y, y + h):
-                    grid[j][i] = 1  # salle
-
-    dungeon["rooms"] = rooms
-
-def corridors(dungeon, corridor_ratio=1.0):
-    rooms = dungeon["rooms"]
-    grid = dungeon["grid"]
-    connections = []
-    
-    # Réduire le nombre de connexions selon la difficulté
-    max_connections = int((len(rooms) - 1) * corridor_ratio)
-    
-    for i in range(max_connections):
-        a = rooms[i]
-        b = rooms[i + 1]
-        ax, ay = a["x"] + a["w"] // 2, a["y"] + a["h"] // 2
-        bx, by = b["x"] + b["w"] // 2, b["y"] + b["h"] // 2
-
-        for x in range(min(ax, bx), max(ax, bx) + 1):
-            if grid[ay][x] == 0:  # Ne pas écraser les salles
-                grid[ay][x] = 2  # couloir
-        for y in range(min(ay, by), max(ay, by) + 1):
-            if grid[y][bx] == 0:  # Ne pas écraser les salles
-                grid[y][bx] = 2
-
-        connections.append(((ax, ay), (bx, by)))
-
-    dungeon["connections"] = connections
-
-def emplace_stairs(dungeon):
-    rooms = dungeon["rooms"]
-    grid = dungeon["grid"]
-    stairs = []
-
-    if len(rooms) < 2:
-        return
-
-    up, down = random.sample(rooms, 2)
-    ux, uy = up["x"] + up["w"] // 2, up["y"] + up["h"] // 2
-    dx, dy = down["x"] + down["w"] // 2, down["y"] + down["h"] // 2
-
-    grid[uy][ux] = 3  # escalier montant
-    grid[dy][dx] = 4  # escalier descendant
-
-    stairs.append({"type": "up", "x": ux, "y": uy})
-    stairs.append({"type": "down", "x": dx, "y": dy})
-    dungeon["stairs"] = stairs
 
 def print_dungeon(dungeon):
     symbols = {0: ' ', 1: '.', 2: '#', 3: '<', 4: '>'}
@@ -118,16 +45,19 @@ def select_difficulty(screen, font):
     easy = font.render("1 - FACILE (30s, petit donjon)", True, (0, 255, 0))
     medium = font.render("2 - MOYEN (20s, donjon moyen)", True, (255, 255, 0))
     hard = font.render("3 - DIFFICILE (15s, grand donjon)", True, (255, 0, 0))
+    maze = font.render("4 - LABYRINTHE (30s, couloirs de dungeon.pl)", True, (0, 200, 255))
     
     title_rect = title.get_rect(center=(screen.get_width()//2, 200))
     easy_rect = easy.get_rect(center=(screen.get_width()//2, 280))
     medium_rect = medium.get_rect(center=(screen.get_width()//2, 320))
     hard_rect = hard.get_rect(center=(screen.get_width()//2, 360))
+    maze_rect = maze.get_rect(center=(screen.get_width()//2, 400))
     
     screen.blit(title, title_rect)
     screen.blit(easy, easy_rect)
     screen.blit(medium, medium_rect)
     screen.blit(hard, hard_rect)
+    screen.blit(maze, maze_rect)
     pygame.display.flip()
     
     while True:
@@ -141,6 +71,9 @@ def select_difficulty(screen, font):
                     return {"time": 20000, "size": 60, "rooms": 20, "corridors": 0.7}
                 elif event.key == pygame.K_3:
                     return {"time": 15000, "size": 80, "rooms": 25, "corridors": 0.5}
+                elif event.key == pygame.K_4:
+                    # Nombre de salles et couloirs décidés par le générateur de dungeon.pl (maze.py)
+                    return {"time": 30000, "size": 41, "rooms": 0, "corridors": 1.0, "corridor_layout": "Bent"}
 
 def show_instructions(screen, font, difficulty):
     screen.fill((0, 0, 0))
@@ -317,15 +250,13 @@ def play_dungeon(dungeon, difficulty):
 def generate_dungeon():
     difficulty = None
     while True:
+        # Génération partagée avec dungeon_3d.py ; dungeon["seed"] permet de régénérer le même donjon
         if difficulty:
-            dungeon = init_dungeon(difficulty["size"], difficulty["size"])
-            emplace_rooms(dungeon, difficulty["rooms"])
-            corridors(dungeon, difficulty["corridors"])
+            dungeon = generate(difficulty["size"], difficulty["size"], max_rooms=difficulty["rooms"],
+                               corridor_ratio=difficulty["corridors"],
+                               corridor_layout=difficulty.get("corridor_layout"))
         else:
-            dungeon = init_dungeon()
-            emplace_rooms(dungeon)
-            corridors(dungeon)
-        emplace_stairs(dungeon)
+            dungeon = generate()
         restart = play_dungeon(dungeon, difficulty)
         if not restart:
             break
@@ -1,67 +1,204 @@
 import random
 import pygame
 import math
+import itertools
+import numpy as np
+from collections import OrderedDict, namedtuple
 from load_assets import load_enemy_sprites, load_textures
+from ai_scheduler import AIScheduler
+from bullet_pool import OWNER_PLAYER, SCALAR_BATCH_MAX, BulletPool
+from collision import first_circle_hit, segment_circle_hit, sweep_circles
+import generation
+from framebuffer import FramebufferRenderer
+from hud import Hud
+from level_cache import LevelCache, LevelData
+from level_prefetch import LevelPrefetcher
+from maze import CORRIDOR_LAYOUT
+from pathfinding import FlowField, PathCache, RoomGraph
+from spatial_hash import SpatialHash
+from sprite_cache import ScaledSpriteCache
+from visibility import FieldOfView
+from raycaster import cast_rays, clear_camera_projections, get_camera_projection, visible_spans, wall_mask, wall_strips
 import os
+import sys
 import json
 import pickle
 from datetime import datetime
 
-pygame.mixer.init()
 
 # Constantes de perspective
 VERTICAL_PERSPECTIVE_FACTOR = 160  # Facteur pour la position verticale des sprites
 
+# Taille en pixels de la mini-carte
+MINIMAP_SIZE = 150
+
+# Cadence fixe de la logique de jeu : un tick par frame à 60 FPS
+TICK_RATE = 60
+
+# Actions du joueur acceptées par Game.step (et touches correspondantes en jeu)
+KEY_ACTIONS = {
+    pygame.K_z: "forward",
+    pygame.K_s: "backward",
+    pygame.K_q: "turn_left",
+    pygame.K_d: "turn_right",
+    pygame.K_LEFT: "strafe_left",
+    pygame.K_RIGHT: "strafe_right",
+    pygame.K_p: "use_potion",
+}
+
+# Moteurs de rendu des murs disponibles (touche F pour basculer en jeu)
+WALL_RENDERERS = ("framebuffer", "lines")
+
+# Projectiles : distance parcourue par tick et rayon de la zone touchée autour d'un personnage.
+# Les collisions étant calculées sur le segment parcouru, la vitesse peut être augmentée sans sous-pas.
+BULLET_SPEED = 0.3
+HIT_RADIUS = 0.3
+
+# IA des ennemis : budget par tick des mises à jour des ennemis éloignés (jeu interactif uniquement)
+# et nombre maximal de ticks rattrapés d'un coup par un ennemi mis à jour en différé.
+AI_BUDGET_MS = 2.0
+MAX_CATCH_UP_TICKS = 4
+
+# Distance de poursuite (en pas sur le champ de flux) d'un ennemi qui ne voit plus le joueur,
+# et ticks entre deux pas de cette poursuite
+CHASE_DISTANCE = 12
+CHASE_MOVE_TICKS = 30
+
+# Taille des donjons du jeu 3D et paramètres des salles (max_rooms, min_size, max_size) de Dungeon.generate
+DUNGEON_SIZE = 20
+ROOM_PARAMS = (10, 3, 6)  # max_rooms, min_size, max_size de Dungeon.generate
+
+# Dossier du cache des niveaux générés (grille et positions d'apparition), voir level_cache.py
+LEVEL_CACHE_DIR = os.path.join(os.path.dirname(__file__), "level_cache")
+PREPARED_LEVELS_KEPT = 4  # Niveaux préparés (donjon figé, masque, mini-carte) gardés en mémoire pour un redémarrage
+
+# Statistiques de base par type d'ennemi, partagées (et non copiées) par toutes les instances
+EnemyStats = namedtuple("EnemyStats", ["hp", "level", "xp_value", "damage_dice", "accuracy"])
+ENEMY_STATS = {
+    "goblin": EnemyStats(hp=20, level=1, xp_value=15, damage_dice=(1, 4), accuracy=65),  # 1d4 dégâts, 65% précision
+    "skeleton": EnemyStats(hp=35, level=2, xp_value=25, damage_dice=(1, 6), accuracy=70),  # 1d6 dégâts, 70% précision
+    "orc": EnemyStats(hp=50, level=3, xp_value=35, damage_dice=(1, 8), accuracy=75),  # 1d8 dégâts, 75% précision
+    "troll": EnemyStats(hp=80, level=4, xp_value=50, damage_dice=(2, 6), accuracy=80),  # 2d6 dégâts, 80% précision
+}
+
+# Numéros attribués à chaque grille figée par Dungeon.freeze
+_level_ids = itertools.count()
+
 class Dungeon:
-    def __init__(self, width=20, height=20):
+    def __init__(self, width=20, height=20, seed=None):
         self.width = width
         self.height = height
+        # Graine de la génération (voir generation.py) : la même graine redonne le même niveau
+        self.seed = generation.new_seed() if seed is None else seed
+        self.rng = generation.make_rng(self.seed)
         self.grid = [[0] * width for _ in range(height)]
         self.rooms = []
-    
-    def _room_overlaps(self, new_room, existing_rooms):
-        x, y, w, h = new_room["x"], new_room["y"], new_room["w"], new_room["h"]
-        return any(x < r["x"] + r["w"] and x + w > r["x"] and y < r["y"] + r["h"] and y + h > r["y"] for r in existing_rooms)
-    
-    def _create_room(self, room):
-        for i in range(room["x"], room["x"] + room["w"]):
-            for j in range(room["y"], room["y"] + room["h"]):
-                self.grid[j][i] = 1
-    
-    def _create_corridor(self, x1, y1, x2, y2):
-        for x in range(min(x1, x2), max(x1, x2) + 1):
-            if self.grid[y1][x] == 0:
-                self.grid[y1][x] = 1
-        for y in range(min(y1, y2), max(y1, y2) + 1):
-            if self.grid[y][x2] == 0:
-                self.grid[y][x2] = 1
-    
-    def generate_rooms(self, max_rooms=10, min_size=3, max_size=6):
-        for _ in range(max_rooms):
-            w, h = random.randint(min_size, max_size), random.randint(min_size, max_size)
-            x, y = random.randint(1, self.width - w - 1), random.randint(1, self.height - h - 1)
-            new_room = {"x": x, "y": y, "w": w, "h": h}
-            
-            if not self._room_overlaps(new_room, self.rooms):
-                self.rooms.append(new_room)
-                self._create_room(new_room)
-    
+        self.flow_field = None  # Champ de flux vers le joueur, partagé par tous les ennemis
+        self.field_of_view = None  # Cases visibles depuis la case du joueur
+        self.room_graph = None  # Graphe abstrait des salles et couloirs (recherche hiérarchique)
+        # walkable, neighbors et level_id sont construits par freeze, appelé par generate et restore
+
+    def _as_level(self):
+        """Vue dict de la grille et des salles, au format des fonctions de generation.py"""
+        return {"width": self.width, "height": self.height, "grid": self.grid, "rooms": self.rooms,
+                "connections": [], "stairs": [], "seed": self.seed}
+
+    def generate_rooms(self, max_rooms=10, min_size=3, max_size=6, room_layout="Scattered"):
+        generation.emplace_rooms(self._as_level(), self.rng, max_rooms, min_size, max_size, room_layout)
+
     def generate_corridors(self):
-        for i in range(len(self.rooms) - 1):
-            a, b = self.rooms[i], self.rooms[i + 1]
-            ax, ay = a["x"] + a["w"] // 2, a["y"] + a["h"] // 2
-            bx, by = b["x"] + b["w"] // 2, b["y"] + b["h"] // 2
-            self._create_corridor(ax, ay, bx, by)
-    
-    def generate(self):
-        self.generate_rooms()
-        self.generate_corridors()
+        generation.corridors(self._as_level())
+
+    def generate(self, max_rooms=10, min_size=3, max_size=6, room_layout="Scattered", corridor_layout=None):
+        # Tirages repris depuis la graine : générer deux fois donne la même grille
+        self.rng = generation.make_rng(self.seed)
+        if corridor_layout is not None:
+            # Couloirs en labyrinthe de dungeon.pl (maze.py) au lieu des couloirs en L
+            level = generation.generate(self.width, self.height, self.seed, max_rooms, min_size, max_size,
+                                        room_layout=room_layout, corridor_layout=corridor_layout)
+            self.grid = level["grid"]
+            self.rooms = level["rooms"]
+        else:
+            self.grid = [[0] * self.width for _ in range(self.height)]
+            self.rooms = []
+            self.generate_rooms(max_rooms, min_size, max_size, room_layout)
+            self.generate_corridors()
+        self.freeze()
+
+    def restore(self, grid, rooms):
+        """Reprend une grille (octets, ligne par ligne) et des salles (x, y, w, h) mémorisées, sans rien tirer"""
+        width = self.width
+        self.grid = [list(grid[y * width:(y + 1) * width]) for y in range(self.height)]
+        self.rooms = [{"x": x, "y": y, "w": w, "h": h} for x, y, w, h in rooms]
+        self.freeze()
+
+    def freeze(self):
+        """Fige la grille en représentation compacte (à rappeler si la grille est modifiée).
+
+        walkable : bytearray des cases praticables, bordé d'une case de mur de chaque côté
+        (index d'une case : (y + 1) * stride + x + 1), ce qui supprime les tests de limites.
+        neighbors : pour chaque case de la carte, index des voisines praticables (4-voisinage).
+        """
+        stride = self.width + 2
+        walkable = bytearray(stride * (self.height + 2))
+        for y, row in enumerate(self.grid):
+            start = (y + 1) * stride + 1
+            walkable[start:start + self.width] = bytes(1 if cell else 0 for cell in row)
+
+        neighbors = [()] * len(walkable)
+        for y in range(self.height):
+            row_start = (y + 1) * stride + 1
+            for i in range(row_start, row_start + self.width):
+                neighbors[i] = tuple(j for j in (i - 1, i + 1, i - stride, i + stride) if walkable[j])
+
+        self.stride = stride
+        self.walkable = walkable
+        self.neighbors = neighbors
+        self.flow_field = None
+        self.field_of_view = None
+        self.room_graph = None
+        self.level_id = next(_level_ids)  # Identifie cette grille figée (clé du cache de chemins)
+
+    def cell_index(self, x, y):
+        """Index de la case (x, y) dans walkable / neighbors."""
+        return (y + 1) * self.stride + x + 1
+
+    def index_cell(self, index):
+        """Case (x, y) correspondant à un index de walkable / neighbors."""
+        y, x = divmod(index, self.stride)
+        return x - 1, y - 1
     
+    def get_flow_field(self, goal):
+        """Champ de flux partagé vers la case `goal`, recalculé seulement quand la cible change de case"""
+        if self.flow_field is None:
+            self.flow_field = FlowField(self)
+        self.flow_field.update(goal)
+        return self.flow_field
+
+    def get_field_of_view(self, origin):
+        """Champ de vision partagé depuis la case `origin`, recalculé seulement quand elle change"""
+        if self.field_of_view is None:
+            self.field_of_view = FieldOfView(self)
+        self.field_of_view.update(origin)
+        return self.field_of_view
+
+    def get_room_graph(self):
+        """Graphe des salles et couloirs du niveau, construit au premier appel après freeze (utilisé par benchmarks.py)"""
+        if self.room_graph is None:
+            self.room_graph = RoomGraph(self)
+        return self.room_graph
+
     def is_wall(self, x, y):
-        return (x < 0 or x >= self.width or y < 0 or y >= self.height or 
-                self.grid[int(y)][int(x)] == 0)
+        cell_x, cell_y = math.floor(x), math.floor(y)
+        # La bordure de walkable couvre une case hors de la carte ; au-delà, tout est mur
+        if not (-1 <= cell_x <= self.width and -1 <= cell_y <= self.height):
+            return True
+        return not self.walkable[(cell_y + 1) * self.stride + cell_x + 1]
 
 class Player3D:
+    __slots__ = ("x", "y", "z", "eye_height", "angle", "fov", "hp", "max_hp", "shoot_cooldown", "potions",
+                 "shoot_flash", "level", "xp", "xp_to_next_level")
+
     def __init__(self, x, y):
         self.x = x
         self.y = y
@@ -154,11 +291,12 @@ class Player3D:
         roll = random.randint(1, 100)
         return roll <= effective_accuracy
     def _calculate_shoot_angle(self, mouse_x, screen_width):
-        center_x = screen_width // 2
-        angle_offset = (mouse_x - center_x) / center_x * (self.fov / 2)
-        return self.angle + angle_offset
+        projection = get_camera_projection(screen_width, self.fov)
+        return self.angle + projection.column_offset(mouse_x)
     
     def _play_shoot_sound(self):
+        if not pygame.mixer.get_init():
+            return
         try:
             shoot_sound = pygame.mixer.Sound(buffer=b'\x00\x80' * 1500)
             shoot_sound.set_volume(0.8)
@@ -184,48 +322,36 @@ class Player3D:
         target_height = shoulder_height - vertical_offset * 2.0  # Ajuster la sensibilité
         
         # Calculer la distance approximative vers le mur/cible
-        distance, _, _ = cast_ray(self, shoot_angle, dungeon)
+        distance = cast_ray(self, shoot_angle, dungeon)[0]
         
         # Calculer la vélocité verticale pour atteindre la cible
-        z_velocity = (target_height - shoulder_height) / (distance / 0.3) if distance > 0 else 0
-        
-        return Bullet(self.x, self.y, shoot_angle, True, shoulder_height, z_velocity)
-
-class Bullet:
-    def __init__(self, x, y, angle, is_player_bullet=True, z=1.0, z_velocity=0.0):
-        self.x = x
-        self.y = y
-        self.z = z  # Height above ground
-        self.angle = angle
-        self.z_velocity = z_velocity  # Vertical velocity
-        self.speed = 0.3
-        self.life = 60
-        self.is_player_bullet = is_player_bullet
-    
-    def update(self, dungeon):
-        self.x += math.cos(self.angle) * self.speed
-        self.y += math.sin(self.angle) * self.speed
-        self.z += self.z_velocity
-        self.life -= 1
+        z_velocity = (target_height - shoulder_height) / (distance / BULLET_SPEED) if distance > 0 else 0
         
-        # Hit ground or wall
-        return (not dungeon.is_wall(self.x, self.y) and self.life > 0 and self.z >= 0)
+        # Paramètres du tir, dans l'ordre de BulletPool.spawn
+        return self.x, self.y, shoot_angle, True, shoulder_height, z_velocity
 
 class HealthPotion:
-    def __init__(self, x, y):
+    __slots__ = ("x", "y", "z", "heal_amount")
+
+    def __init__(self, x, y, heal_amount=None):
         self.x = x
         self.y = y
         self.z = 0.0  # Ground level
-        self.heal_amount = random.randint(20, 40)
+        self.heal_amount = random.randint(20, 40) if heal_amount is None else heal_amount
 
 class Enemy:
+    # Attributs fixes : pas de __dict__ par instance, ce qui compte sur les niveaux à milliers d'ennemis
+    __slots__ = ("x", "y", "z", "enemy_type", "stats", "hp", "max_hp", "level", "xp_value", "move_timer",
+                 "shoot_timer", "is_shooting", "shoot_animation", "hit_animation", "death_animation", "is_dead")
+
+    height = 2.2  # Enemy height (plus grand que le joueur)
+    ground_level = True  # Flag for ground-level rendering
+
     def __init__(self, x, y, enemy_type=None, available_types=None):
         self.x = x
         self.y = y
         self.z = 0.0  # Ground level
-        self.height = 2.2  # Enemy height (plus grand que le joueur)
-        self.ground_level = True  # Flag for ground-level rendering
-        
+
         # Use available types from loaded sprites or fallback
         if available_types is None:
             available_types = ["orc", "skeleton", "goblin", "troll"]
@@ -249,32 +375,22 @@ class Enemy:
 
     def _set_stats_for_type(self, enemy_type):
         """Définit les statistiques selon le type d'ennemi"""
-        stats = {
-            "goblin": {
-                "hp": 20, "max_hp": 20, "level": 1, "xp_value": 15,
-                "damage_dice": (1, 4), "accuracy": 65  # 1d4 dégâts, 65% précision
-            },
-            "skeleton": {
-                "hp": 35, "max_hp": 35, "level": 2, "xp_value": 25,
-                "damage_dice": (1, 6), "accuracy": 70  # 1d6 dégâts, 70% précision
-            },
-            "orc": {
-                "hp": 50, "max_hp": 50, "level": 3, "xp_value": 35,
-                "damage_dice": (1, 8), "accuracy": 75  # 1d8 dégâts, 75% précision
-            },
-            "troll": {
-                "hp": 80, "max_hp": 80, "level": 4, "xp_value": 50,
-                "damage_dice": (2, 6), "accuracy": 80  # 2d6 dégâts, 80% précision
-            }
-        }
-
-        enemy_stats = stats.get(enemy_type, stats["skeleton"])
-        self.hp = enemy_stats["hp"]
-        self.max_hp = enemy_stats["max_hp"]
-        self.level = enemy_stats["level"]
-        self.xp_value = enemy_stats["xp_value"]
-        self.damage_dice = enemy_stats["damage_dice"]  # (nombre_dés, faces_par_dé)
-        self.accuracy = enemy_stats["accuracy"]  # Pourcentage de précision
+        self.stats = ENEMY_STATS.get(enemy_type, ENEMY_STATS["skeleton"])
+        # Valeurs modifiées en jeu (dégâts, difficulté du niveau) : copiées dans l'instance
+        self.hp = self.stats.hp
+        self.max_hp = self.stats.hp
+        self.level = self.stats.level
+        self.xp_value = self.stats.xp_value
+
+    @property
+    def damage_dice(self):
+        """(nombre_dés, faces_par_dé), lu dans les statistiques partagées du type"""
+        return self.stats.damage_dice
+
+    @property
+    def accuracy(self):
+        """Pourcentage de précision, lu dans les statistiques partagées du type"""
+        return self.stats.accuracy
 
     def take_damage(self, damage):
         """L'ennemi prend des dégâts"""
@@ -320,31 +436,35 @@ class Enemy:
                 self.x, self.y = new_x, new_y
             self.move_timer = 0
 
-    def _try_move(self, dungeon, player, enemies):
+    def _is_crowded(self, x, y, enemies, spacing=0.5):
+        """Vrai si un autre ennemi de l'index spatial `enemies` est à moins de `spacing` de (x, y)"""
+        spacing_squared = spacing * spacing
+        return any((x - e.x) ** 2 + (y - e.y) ** 2 < spacing_squared
+                   for e in enemies.nearby(x, y, spacing) if e is not self)
+
+    def _try_move(self, dungeon, player, enemies, ticks=1):
         if self.move_timer > 0:
-            self.move_timer -= 1
+            self.move_timer -= ticks
             return
 
-        self.move_timer = 30  # Temps entre chaque mouvement
+        self.move_timer = CHASE_MOVE_TICKS  # Temps entre chaque mouvement
 
-        # Calculer le chemin vers le joueur
+        # Prochain pas vers le joueur, lu dans le champ de flux partagé (un seul BFS par case du joueur)
         start = (int(self.x), int(self.y))
         goal = (int(player.x), int(player.y))
-        path = find_path(dungeon, start, goal)
-
-        if path and len(path) > 1:
-            next_step = path[1]
-            new_x, new_y = next_step
-
-            # Vérifier si la nouvelle position est dans les limites de la carte
-            if 0 <= new_x < dungeon.width and 0 <= new_y < dungeon.height:
-                # Vérifier si la nouvelle position n'est pas un mur
-                if not dungeon.is_wall(new_x, new_y):
-                    # Vérifier si la nouvelle position ne chevauche pas un autre monstre
-                    if not any(math.sqrt((new_x - e.x) ** 2 + (new_y - e.y) ** 2) < 0.5 for e in enemies if e != self):
-                        # Déplacement progressif pour un mouvement fluide
-                        self.x += (new_x - self.x) * 0.5
-                        self.y += (new_y - self.y) * 0.5
+        flow_field = dungeon.get_flow_field(goal)
+
+        # Ne pas avancer quand le joueur est à moins de deux cases ou hors de portée de poursuite ;
+        # viser le centre de la case suivante pour que le déplacement progressif en franchisse bien la frontière
+        if 1 < flow_field.distance(start) <= CHASE_DISTANCE:
+            next_x, next_y = flow_field.next_step(start)
+            new_x, new_y = next_x + 0.5, next_y + 0.5
+
+            # Vérifier si la nouvelle position ne chevauche pas un autre monstre
+            if not self._is_crowded(new_x, new_y, enemies):
+                # Déplacement progressif pour un mouvement fluide
+                self.x += (new_x - self.x) * 0.5
+                self.y += (new_y - self.y) * 0.5
 
     def _try_shoot(self, player):
         distance = math.sqrt((player.x - self.x) ** 2 + (player.y - self.y) ** 2)
@@ -354,18 +474,23 @@ class Enemy:
                 self.is_shooting = True
                 self.shoot_animation = 15
                 self.shoot_timer = 0
-                try:
-                    shoot_sound = pygame.mixer.Sound(buffer=b'\x00\xFF' * 2000)
-                    shoot_sound.set_volume(1.0)
-                    shoot_sound.play()
-                except:
-                    pass
+                self._play_shoot_sound()
 
                 angle_to_player = math.atan2(player.y - self.y, player.x - self.x)
                 bullet_z = self.z + self.height / 2
-                return Bullet(self.x, self.y, angle_to_player, False, bullet_z, 0.0)
+                return self.x, self.y, angle_to_player, False, bullet_z, 0.0
         return None
     
+    def _play_shoot_sound(self):
+        if not pygame.mixer.get_init():
+            return
+        try:
+            shoot_sound = pygame.mixer.Sound(buffer=b'\x00\xFF' * 2000)
+            shoot_sound.set_volume(1.0)
+            shoot_sound.play()
+        except:
+            pass
+
     def _update_animations(self):
         if self.shoot_animation > 0:
             self.shoot_animation -= 1
@@ -383,30 +508,42 @@ class Enemy:
                 self.max_hp = 0
                 self.is_dead = True  # Marquer comme mort et désactiver les actions
 
-    def update(self, player, dungeon, enemies):
+    def update(self, player, dungeon, enemies, ticks=1):
+        """Avance l'ennemi de `ticks` ticks (plus d'un si l'ordonnanceur d'IA l'a laissé en attente)."""
         distance_to_player = math.sqrt((player.x - self.x) ** 2 + (player.y - self.y) ** 2)
 
-        if has_line_of_sight(player, self, dungeon):
+        # Visibilité lue dans le champ de vision partagé, recalculé quand le joueur change de case
+        field_of_view = dungeon.get_field_of_view((int(player.x), int(player.y)))
+        if field_of_view.is_visible(self.x, self.y):
             if distance_to_player > 4:  # Distance de tir
                 dx = player.x - self.x
                 dy = player.y - self.y
                 norm = math.sqrt(dx ** 2 + dy ** 2)
-                new_x = self.x + (dx / norm) * 0.1
-                new_y = self.y + (dy / norm) * 0.1
+                # Pas cumulé sur les ticks écoulés, plafonné pour ne jamais franchir une case
+                step = 0.1 * min(ticks, MAX_CATCH_UP_TICKS)
+                new_x = self.x + (dx / norm) * step
+                new_y = self.y + (dy / norm) * step
 
                 # Vérifier collisions avec murs et ennemis
-                if not dungeon.is_wall(new_x, new_y) and not any(math.sqrt((new_x - e.x) ** 2 + (new_y - e.y) ** 2) < 0.5 for e in enemies if e != self):
+                if not dungeon.is_wall(new_x, new_y) and not self._is_crowded(new_x, new_y, enemies):
                     self.x, self.y = new_x, new_y
             else:
                 return self._try_shoot(player)  # Tirer si à portée
+        else:
+            # Joueur hors de vue : suivre le champ de flux partagé, recalculé quand le joueur change de case
+            self._try_move(dungeon, player, enemies, ticks)
 
-        self._update_animations()
+        for _ in range(ticks):
+            self._update_animations()
         return None
 
 
 # Global sprite cache
 _enemy_sprites_cache = None
 
+# Sprites mis à l'échelle et assombris, partagés par render_entity et render_sprite
+_scaled_sprite_cache = ScaledSpriteCache()
+
 def get_all_enemy_sprites():
     """Get all loaded enemy sprites (cached)"""
     global _enemy_sprites_cache
@@ -477,11 +614,11 @@ def render_sprite(screen, sprite, x, y, distance, screen_height):
     aspect_ratio = original_width / original_height
     
     # Calculate sprite size based on distance - LARGER SIZE
-    sprite_height = int(screen_height / distance * 1.5)
+    sprite_height = _scaled_sprite_cache.quantize_height(int(screen_height / distance * 1.5))
     sprite_width = int(sprite_height * aspect_ratio)  # Preserve aspect ratio
     
-    # Scale sprite
-    scaled_sprite = pygame.transform.scale(sprite, (sprite_width, sprite_height))
+    # Scale sprite (cached per quantized height)
+    scaled_sprite = _scaled_sprite_cache.get(sprite, sprite, sprite_height)
     
     # Position sprite on ground - bottom of sprite AT horizon line
     horizon_y = screen_height // 2
@@ -490,21 +627,71 @@ def render_sprite(screen, sprite, x, y, distance, screen_height):
     
     screen.blit(scaled_sprite, (sprite_x, sprite_y))
 
-def cast_ray(player, angle, dungeon, max_distance=20, step=0.1):
-    x, y = player.x, player.y
-    dx = math.cos(angle) * step
-    dy = math.sin(angle) * step
-    
-    steps = int(max_distance / step)
-    for _ in range(steps):
-        x += dx
-        y += dy
-        
-        if dungeon.is_wall(x, y):
-            distance = math.sqrt((x - player.x)**2 + (y - player.y)**2)
-            return distance, x, y
-    
-    return max_distance, x, y
+def cast_ray(player, angle, dungeon, max_distance=20):
+    """Lance un rayon par DDA (Amanatides-Woo) : chaque case traversée est visitée une seule fois.
+
+    Retourne (distance, hit_x, hit_y, face, tex_x) : distance exacte jusqu'au mur,
+    point d'impact, face touchée ('N', 'S', 'E', 'W' ou None si rien n'est touché)
+    et coordonnée de texture dans [0, 1[.
+    """
+    ox, oy = player.x, player.y
+    dir_x, dir_y = math.cos(angle), math.sin(angle)
+    map_x, map_y = int(ox), int(oy)
+    # Parcours directement sur le bitmap bordé de murs : pas de test de limites dans la boucle
+    walkable = dungeon.walkable
+    index = dungeon.cell_index(map_x, map_y)
+
+    # Distance (le long du rayon) jusqu'à la prochaine frontière verticale / horizontale
+    if dir_x > 0:
+        step_x, delta_x = 1, 1.0 / dir_x
+        side_x = (map_x + 1 - ox) * delta_x
+    elif dir_x < 0:
+        step_x, delta_x = -1, -1.0 / dir_x
+        side_x = (ox - map_x) * delta_x
+    else:
+        step_x, delta_x, side_x = 0, math.inf, math.inf
+
+    if dir_y > 0:
+        step_y, delta_y = 1, 1.0 / dir_y
+        side_y = (map_y + 1 - oy) * delta_y
+    elif dir_y < 0:
+        step_y, delta_y = -1, -1.0 / dir_y
+        side_y = (oy - map_y) * delta_y
+    else:
+        step_y, delta_y, side_y = 0, math.inf, math.inf
+    row_step = step_y * dungeon.stride
+
+    while True:
+        if side_x < side_y:
+            distance = side_x
+            side_x += delta_x
+            index += step_x
+            vertical_side = True
+        else:
+            distance = side_y
+            side_y += delta_y
+            index += row_step
+            vertical_side = False
+
+        if distance > max_distance:
+            break
+
+        if not walkable[index]:
+            hit_x = ox + dir_x * distance
+            hit_y = oy + dir_y * distance
+            if vertical_side:
+                face = "W" if step_x > 0 else "E"
+                tex_x = hit_y - math.floor(hit_y)
+                if step_x < 0:
+                    tex_x = 1.0 - tex_x
+            else:
+                face = "N" if step_y > 0 else "S"
+                tex_x = hit_x - math.floor(hit_x)
+                if step_y > 0:
+                    tex_x = 1.0 - tex_x
+            return distance, hit_x, hit_y, face, tex_x
+
+    return max_distance, ox + dir_x * max_distance, oy + dir_y * max_distance, None, 0.0
 
 def has_line_of_sight(player, enemy, dungeon):
     dx = enemy.x - player.x
@@ -517,11 +704,13 @@ def has_line_of_sight(player, enemy, dungeon):
     steps = max(1, int(distance * 10))
     step_x, step_y = dx / steps, dy / steps
     
+    # Les points échantillonnés restent entre deux positions de la carte : lecture directe du bitmap
+    walkable, stride, floor = dungeon.walkable, dungeon.stride, math.floor
     x, y = player.x, player.y
     for _ in range(steps):
         x += step_x
         y += step_y
-        if dungeon.is_wall(x, y):
+        if not walkable[(floor(y) + 1) * stride + floor(x) + 1]:
             return False
     
     return True
@@ -529,65 +718,260 @@ def has_line_of_sight(player, enemy, dungeon):
 def find_path(dungeon, start, goal):
     from heapq import heappop, heappush
 
-    def heuristic(a, b):
-        return abs(a[0] - b[0]) + abs(a[1] - b[1])
+    if not (0 <= start[0] < dungeon.width and 0 <= start[1] < dungeon.height):
+        return []
+    if not (0 <= goal[0] < dungeon.width and 0 <= goal[1] < dungeon.height):
+        return []
+
+    # Recherche sur les index de la table des voisins précalculée par Dungeon.freeze
+    stride = dungeon.stride
+    neighbors = dungeon.neighbors
+    goal_x, goal_y = goal
+    start_index = dungeon.cell_index(*start)
+    goal_index = dungeon.cell_index(*goal)
 
     open_set = []
-    heappush(open_set, (0, start))
+    heappush(open_set, (0, start[0], start[1], start_index))
     came_from = {}
-    g_score = {start: 0}
-    f_score = {start: heuristic(start, goal)}
+    g_score = {start_index: 0}
+    closed = set()  # Cases déjà développées : leurs entrées restées dans le tas sont ignorées
 
     while open_set:
-        _, current = heappop(open_set)
+        _, _, _, current = heappop(open_set)
 
-        if current == goal:
+        if current == goal_index:
             path = []
             while current in came_from:
-                path.append(current)
+                path.append(dungeon.index_cell(current))
                 current = came_from[current]
             return path[::-1]
+        if current in closed:
+            continue
+        closed.add(current)
 
-        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-            neighbor = (current[0] + dx, current[1] + dy)
-            if dungeon.is_wall(neighbor[0], neighbor[1]):
-                continue
-
-            tentative_g_score = g_score[current] + 1
+        tentative_g_score = g_score[current] + 1
+        for neighbor in neighbors[current]:
             if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
                 came_from[neighbor] = current
                 g_score[neighbor] = tentative_g_score
-                f_score[neighbor] = tentative_g_score + heuristic(neighbor, goal)
-                heappush(open_set, (f_score[neighbor], neighbor))
+                ny, nx = divmod(neighbor, stride)
+                nx -= 1
+                ny -= 1
+                heappush(open_set, (tentative_g_score + abs(nx - goal_x) + abs(ny - goal_y), nx, ny, neighbor))
 
     return []
 
-class Game:
-    def __init__(self):
-        pygame.init()
-        self.screen = pygame.display.set_mode((800, 600))
-        pygame.display.set_caption("Dungeon Explorer 3D")
-        self.font = pygame.font.Font(None, 36)
-        self.clock = pygame.time.Clock()
+# Chemins déjà calculés, partagés par tous les appelants de find_path_cached
+_path_cache = PathCache()
+
+def find_path_cached(dungeon, start, goal):
+    """find_path, en réutilisant les chemins (ou la fin des chemins) déjà calculés sur ce niveau"""
+    return _path_cache.get(dungeon, start, goal, find_path)
+
+# Niveau construit hors de Game, éventuellement dans un thread, puis installé d'un bloc par Game.install_level
+# minimap : cases de la mini-carte (minimap_cells) ; minimap_surface : sa Surface, créée dans le thread principal
+PreparedLevel = namedtuple("PreparedLevel", ["key", "dungeon", "level", "wall_mask", "minimap", "minimap_surface",
+                                             "from_cache"])
+
+def start_position(dungeon):
+    """Position de départ du joueur : près du coin de la première salle"""
+    if dungeon.rooms:
+        room = dungeon.rooms[0]
+        return room["x"] + 1, room["y"] + 1
+    return 1, 1
+
+def is_near_wall(dungeon, x, y, min_distance=2):
+    """Vérifie si une position est à moins de `min_distance` cases d'un mur."""
+    for dx in range(-min_distance, min_distance + 1):
+        for dy in range(-min_distance, min_distance + 1):
+            if dungeon.is_wall(x + dx, y + dy):
+                return True
+    return False
+
+def roll_spawns(dungeon, level, available_types):
+    """Tire les positions d'apparition (ennemis (x, y, type), potions (x, y, soin)) avec le générateur du donjon.
+
+    Le niveau 0 (nouvelle partie) suit les règles du niveau 1. Le joueur est supposé à start_position.
+    """
+    rng = dungeon.rng
+    level = max(level, 1)
+    player_x, player_y = start_position(dungeon)
+    enemies = []
+    min_distance_from_player = 5
+    min_distance_between_enemies = 2
+
+    # Plus d'ennemis pour les niveaux élevés
+    base_enemies_per_room = 1 + (level - 1) // 2
+    base_corridor_enemies = 3 + (level - 1)
+
+    # Placer des ennemis dans chaque salle (sauf la première)
+    for room in dungeon.rooms[1:]:
+        for _ in range(base_enemies_per_room):
+            for attempt in range(50):
+                x = rng.randint(room["x"], room["x"] + room["w"] - 1)
+                y = rng.randint(room["y"], room["y"] + room["h"] - 1)
 
-        try:
-            self.enemy_sprites = load_enemy_sprites()
-            self.textures = load_textures()
-            base_path = os.path.dirname(__file__) + "/assets/audio/"
-            self.potion_sound = pygame.mixer.Sound(os.path.join(base_path, "potion_pickup.wav"))
-            self.potion_use_sound = pygame.mixer.Sound(os.path.join(base_path, "02_Heal_02.wav"))
-        except Exception as e:
-            print(f"Erreur de chargement des ressources : {e}")
-            self.potion_sound = None
-            self.potion_use_sound = None
+                if not (0 <= x < dungeon.width and 0 <= y < dungeon.height):
+                    continue
+                if dungeon.is_wall(x, y) or is_near_wall(dungeon, x, y, min_distance=2):
+                    continue
+                if math.sqrt((x - player_x) ** 2 + (y - player_y) ** 2) < min_distance_from_player:
+                    continue
+                if any(math.sqrt((x - ex) ** 2 + (y - ey) ** 2) < min_distance_between_enemies for ex, ey, _ in enemies):
+                    continue
+
+                enemies.append((x, y, rng.choice(available_types)))
+                break
+
+    # Ajouter des ennemis dans les couloirs
+    for _ in range(base_corridor_enemies):
+        for attempt in range(50):
+            x = rng.randint(1, dungeon.width - 2)
+            y = rng.randint(1, dungeon.height - 2)
+
+            if not (0 <= x < dungeon.width and 0 <= y < dungeon.height):
+                continue
+            if dungeon.is_wall(x, y):
+                continue
+            if math.sqrt((x - player_x) ** 2 + (y - player_y) ** 2) < min_distance_from_player:
+                continue
+            if any(math.sqrt((x - ex) ** 2 + (y - ey) ** 2) < min_distance_between_enemies for ex, ey, _ in enemies):
+                continue
+
+            enemies.append((x, y, rng.choice(available_types)))
+            break
+
+    # Ajouter plus de potions pour les niveaux élevés
+    potion_count = 6 + (level - 1) * 2
+    potions = []
+    for _ in range(potion_count):
+        for attempt in range(50):
+            x, y = rng.randint(1, dungeon.width - 2), rng.randint(1, dungeon.height - 2)
+            if (not dungeon.is_wall(x, y) and abs(x - player_x) >= 1 and abs(y - player_y) >= 1 and
+                    all(abs(x - ex) >= 1 and abs(y - ey) >= 1 for ex, ey, _ in enemies)):
+                potions.append((x, y, rng.randint(20, 40)))
+                break
+
+    return enemies, potions
+
+def minimap_cells(dungeon):
+    """Couleurs des cases de la mini-carte (tableau NumPy largeur x hauteur x 3), sans pygame : calculable dans un thread"""
+    floor = np.asarray(dungeon.grid).T != 0
+    cells = np.zeros(floor.shape + (3,), dtype=np.uint8)
+    cells[floor] = (100, 100, 100)
+    return cells
+
+def bake_minimap_surface(cells):
+    """Partie statique de la mini-carte (fond et cases praticables) à partir de minimap_cells.
+
+    Crée des Surface pygame : à appeler depuis le thread principal uniquement.
+    """
+    width, height = cells.shape[:2]
+    mini_scale = MINIMAP_SIZE / max(width, height)
+    cells_surface = pygame.transform.scale(pygame.surfarray.make_surface(cells),
+                                           (round(width * mini_scale), round(height * mini_scale)))
+    minimap = pygame.Surface((MINIMAP_SIZE, MINIMAP_SIZE))
+    minimap.blit(cells_surface, (0, 0))
+    return minimap
+
+def prepare_level(key, available_types, cached=None, minimap=True):
+    """Construit le niveau de clé `key` sans toucher à l'état du jeu (appelable depuis un thread).
+
+    La grille et les apparitions viennent de `cached` (LevelData) si fourni, sinon de la
+    génération ; le masque des murs, les cases de la mini-carte (tableau NumPy, la Surface
+    est créée par Game.install_level) et le champ de vision du point de départ sont précalculés.
+    """
+    seed, width, height, room_params, level = key
+    dungeon = Dungeon(width, height, seed)
+    if cached is not None:
+        dungeon.restore(cached.grid, cached.rooms)
+        level_data = cached
+    else:
+        dungeon.generate(*room_params)
+        enemies, potions = roll_spawns(dungeon, level, available_types)
+        level_data = LevelData(width, height, bytes(cell for row in dungeon.grid for cell in row),
+                               tuple((room["x"], room["y"], room["w"], room["h"]) for room in dungeon.rooms),
+                               tuple(enemies), tuple(potions))
+    start_x, start_y = start_position(dungeon)
+    dungeon.get_field_of_view((int(start_x), int(start_y)))
+    return PreparedLevel(key, dungeon, level_data, wall_mask(dungeon.grid),
+                         minimap_cells(dungeon) if minimap else None, None, cached is not None)
+
+class Game:
+    def __init__(self, wall_renderer="framebuffer", headless=False, seed=None, corridor_layout=None):
+        # En mode headless : ni fenêtre, ni mixer, ni ressources graphiques (simulation via step)
+        self.headless = headless
+        # Graine de la partie : None tire une graine par niveau, sinon chaque niveau en dérive (mêmes niveaux à chaque session)
+        self.seed = seed
+        # Paramètres de Dungeon.generate, dans la clé du cache ; corridor_layout (Labyrinth, Bent, Straight) : maze.py
+        self.room_params = ROOM_PARAMS if corridor_layout is None else ROOM_PARAMS + ("Scattered", corridor_layout)
+        self.verbose = not headless
+        self.wall_renderer = wall_renderer
+        self.framebuffer = None
+        self.textures = {}
+        self.enemy_sprites = {}
+        self.potion_sound = None
+        self.potion_use_sound = None
+
+        if headless:
+            self.screen = None
+            self.font = None
+            self.clock = None
+            self.hud = None
+            self.minimap_hud = None
+        else:
+            try:
+                pygame.mixer.init()
+            except pygame.error as e:
+                print(f"Audio indisponible : {e}")
+            pygame.init()
+            self.screen = pygame.display.set_mode((800, 600), pygame.RESIZABLE)
+            pygame.display.set_caption("Dungeon Explorer 3D")
+            self.font = pygame.font.Font(None, 36)
+            self.clock = pygame.time.Clock()
+            self.hud = Hud(24)
+            self.minimap_hud = Hud(20)
+
+            try:
+                self.enemy_sprites = load_enemy_sprites()
+                self.textures = load_textures()
+                base_path = os.path.dirname(__file__) + "/assets/audio/"
+                self.potion_sound = pygame.mixer.Sound(os.path.join(base_path, "potion_pickup.wav"))
+                self.potion_use_sound = pygame.mixer.Sound(os.path.join(base_path, "02_Heal_02.wav"))
+            except Exception as e:
+                print(f"Erreur de chargement des ressources : {e}")
+                self.potion_sound = None
+                self.potion_use_sound = None
         
         self.dungeon = None
+        self.wall_mask = None  # Masque NumPy des murs utilisé par le raycasting vectorisé
+        self.depth_buffer = None  # Distance du mur pour chaque colonne de l'écran (z-buffer des sprites)
+        self.minimap_surface = None  # Partie statique de la mini-carte, précalculée à chaque niveau
         self.player = None
         self.enemies = []
         self.health_potions = []
-        self.bullets = []
+        self.bullets = BulletPool(speed=BULLET_SPEED)  # Projectiles en tableaux NumPy parallèles
+        # Index spatiaux des ennemis et des potions, tenus à jour à chaque déplacement ou retrait
+        self.enemy_index = SpatialHash()
+        self.potion_index = SpatialHash()
+        # Graine de chaque niveau joué (un redémarrage rejoue le même niveau) et cache des niveaux générés.
+        # Sur disque seulement avec une graine fixée : sinon la clé change à chaque session et le fichier
+        # ne serait jamais relu. En headless, mémoire seulement pour ne pas écrire depuis plusieurs processus
+        self.level_seeds = {}
+        self.level_cache = LevelCache(None if headless or seed is None else LEVEL_CACHE_DIR)
+        # Niveaux déjà préparés, réinstallés tels quels sans refaire freeze, masque, mini-carte ni champ de vision
+        self.prepared_levels = OrderedDict()
+        self.level_key = None
+        self.cached_level = None  # LevelData du niveau installé (grille et positions d'apparition)
+        # Préparation du niveau suivant dans un thread pendant la partie (pas en headless, pour rester déterministe)
+        self.level_prefetcher = None if headless else LevelPrefetcher(prepare_level)
+        # Mises à jour des ennemis échelonnées selon leur distance ; sans budget en headless pour rester déterministe
+        self.ai_scheduler = AIScheduler(budget_ms=None if headless else AI_BUDGET_MS)
 
         self.start_time = None
+        self.tick_count = 0  # Ticks de logique écoulés depuis le début du niveau
+        self.damage_taken = 0  # Dégâts subis par le joueur depuis le début du niveau
+        self.xp_gained = 0  # XP gagnée depuis le début du niveau
         self.enemies_killed = 0
         self.current_level = 1  # Niveau actuel du donjon
         self.total_enemies_killed = 0  # Total des ennemis tués sur tous les niveaux
@@ -595,6 +979,11 @@ class Game:
         # Chemin du fichier de sauvegarde
         self.save_file = os.path.join(os.path.dirname(__file__), "dungeon_save.json")
 
+    def log(self, message):
+        """Affiche un message de jeu (désactivé en simulation headless)"""
+        if self.verbose:
+            print(message)
+
     def save_game(self):
         """Sauvegarde la progression du joueur"""
         try:
@@ -672,9 +1061,64 @@ class Game:
             print(f"Erreur lors de la suppression : {e}")
         return False
 
-    def setup_dungeon(self):
-        self.dungeon = Dungeon(20, 20)
-        self.dungeon.generate()
+    def available_types_for(self, level):
+        """Types d'ennemis du niveau `level` (0 : nouvelle partie, types des sprites chargés)"""
+        return self.get_enemy_types_for_level(level) if level else get_available_enemy_types()
+
+    def level_key_for(self, level):
+        """Clé du cache du niveau `level`, avec la graine mémorisée pour ce niveau (tirée au premier appel)"""
+        seed = self.level_seeds.get(level)
+        if seed is None:
+            seed = self.level_seeds[level] = (generation.new_seed() if self.seed is None
+                                              else generation.derive_seed(self.seed, level))
+        return (seed, DUNGEON_SIZE, DUNGEON_SIZE, self.room_params, level)
+
+    def setup_dungeon(self, level=0):
+        """Installe le donjon du niveau `level` (0 : nouvelle partie).
+
+        Le niveau préparé en arrière-plan est pris s'il est prêt ; sinon il est construit ici,
+        depuis le cache s'il y est. Le niveau suivant est ensuite lancé en arrière-plan.
+        """
+        key = self.level_key_for(level)
+        prepared = self.prepared_levels.get(key)
+        if prepared is None and self.level_prefetcher:
+            prepared = self.level_prefetcher.take(key)
+        if prepared is None:
+            prepared = prepare_level(key, self.available_types_for(level), self.level_cache.get(key),
+                                     minimap=not self.headless)
+        self.install_level(prepared)
+        self.prefetch_level(self.current_level + 1)
+
+    def install_level(self, prepared):
+        """Remplace d'un bloc le donjon et ses données dérivées par un PreparedLevel"""
+        self.level_key = prepared.key
+        self.dungeon = prepared.dungeon
+        self.cached_level = prepared.level
+        self.wall_mask = prepared.wall_mask
+        if prepared.minimap_surface is None and prepared.minimap is not None:
+            # Surface pygame créée ici, dans le thread principal, puis gardée avec le niveau préparé
+            prepared = prepared._replace(minimap_surface=bake_minimap_surface(prepared.minimap))
+        self.minimap_surface = prepared.minimap_surface
+        if not prepared.from_cache and prepared.key not in self.prepared_levels:
+            self.level_cache.put(prepared.key, prepared.level)
+        # Le donjon, le masque et la mini-carte ne sont que lus pendant la partie : réutilisables tels quels
+        self.prepared_levels[prepared.key] = prepared
+        self.prepared_levels.move_to_end(prepared.key)
+        while len(self.prepared_levels) > PREPARED_LEVELS_KEPT:
+            self.prepared_levels.popitem(last=False)
+
+    def prefetch_level(self, level):
+        """Lance la préparation du niveau `level` dans le thread de fond (hors headless)"""
+        if self.level_prefetcher is None:
+            return
+        key = self.level_key_for(level)
+        if key in self.prepared_levels:
+            return
+        self.level_prefetcher.request(key, self.available_types_for(level), self.level_cache.get(key))
+
+    def bake_minimap(self):
+        """Précalcule la partie statique de la mini-carte (fond et cases praticables)"""
+        self.minimap_surface = bake_minimap_surface(minimap_cells(self.dungeon))
 
     def is_valid_potion_position(self, x, y):
         """Vérifie si une position est valide pour placer une potion."""
@@ -688,11 +1132,7 @@ class Game:
 
     def is_near_wall(self, x, y, min_distance=2):
         """Vérifie si une position est trop proche d'un mur."""
-        for dx in range(-min_distance, min_distance + 1):
-            for dy in range(-min_distance, min_distance + 1):
-                if self.dungeon.is_wall(x + dx, y + dy):
-                    return True
-        return False
+        return is_near_wall(self.dungeon, x, y, min_distance)
 
     def place_potions(self, num_potions=6, max_attempts=50):
         """Place un nombre donné de potions dans le donjon."""
@@ -703,7 +1143,7 @@ class Game:
                 if (not self.dungeon.is_wall(x, y) and not self.is_near_wall(x, y, min_distance=2) and abs(x - self.player.x) >= 1 and abs(y - self.player.y) >= 1):
                     self.health_potions.append(HealthPotion(x, y))
                     break
-        print(f"Potions ajoutées : {len(self.health_potions)}")
+        self.log(f"Potions ajoutées : {len(self.health_potions)}")
 
     def get_enemy_types_for_level(self, level):
         """Retourne les types d'ennemis disponibles selon le niveau du donjon"""
@@ -756,69 +1196,22 @@ class Game:
         # Récupérer les types d'ennemis pour ce niveau
         available_types = self.get_enemy_types_for_level(level)
 
-        self.enemies = []
-        min_distance_from_player = 5
-        min_distance_between_enemies = 2
-
-        # Plus d'ennemis pour les niveaux élevés
-        base_enemies_per_room = 1 + (level - 1) // 2
-        base_corridor_enemies = 3 + (level - 1)
-
-        # Placer des ennemis dans chaque salle (sauf la première)
-        for room in self.dungeon.rooms[1:]:
-            for _ in range(base_enemies_per_room):
-                for attempt in range(50):
-                    x = random.randint(room["x"], room["x"] + room["w"] - 1)
-                    y = random.randint(room["y"], room["y"] + room["h"] - 1)
-
-                    if not (0 <= x < self.dungeon.width and 0 <= y < self.dungeon.height):
-                        continue
-                    if self.dungeon.is_wall(x, y) or self.is_near_wall(x, y, min_distance=2):
-                        continue
-                    if math.sqrt((x - self.player.x) ** 2 + (y - self.player.y) ** 2) < min_distance_from_player:
-                        continue
-                    if any(math.sqrt((x - e.x) ** 2 + (y - e.y) ** 2) < min_distance_between_enemies for e in self.enemies):
-                        continue
-
-                    enemy_type = random.choice(available_types)
-                    self.enemies.append(Enemy(x, y, enemy_type, available_types))
-                    break
-
-        # Ajouter des ennemis dans les couloirs
-        for _ in range(base_corridor_enemies):
-            for attempt in range(50):
-                x = random.randint(1, self.dungeon.width - 2)
-                y = random.randint(1, self.dungeon.height - 2)
-
-                if not (0 <= x < self.dungeon.width and 0 <= y < self.dungeon.height):
-                    continue
-                if self.dungeon.is_wall(x, y):
-                    continue
-                if math.sqrt((x - self.player.x) ** 2 + (y - self.player.y) ** 2) < min_distance_from_player:
-                    continue
-                if any(math.sqrt((x - e.x) ** 2 + (y - e.y) ** 2) < min_distance_between_enemies for e in self.enemies):
-                    continue
-
-                enemy_type = random.choice(available_types)
-                self.enemies.append(Enemy(x, y, enemy_type, available_types))
-                break
+        # Positions d'apparition tirées avec le donjon (prepare_level) ou relues dans le cache
+        self.spawn_level_entities(available_types)
 
         # Appliquer le scaling de difficulté
         self.scale_enemies_for_level(level)
 
-        # Ajouter plus de potions pour les niveaux élevés
-        potion_count = 6 + (level - 1) * 2
-        self.health_potions = []
-        for _ in range(potion_count):
-            for attempt in range(50):
-                x, y = random.randint(1, self.dungeon.width - 2), random.randint(1, self.dungeon.height - 2)
-                if (not self.dungeon.is_wall(x, y) and abs(x - self.player.x) >= 1 and abs(y - self.player.y) >= 1 and
-                        all(abs(x - e.x) >= 1 and abs(y - e.y) >= 1 for e in self.enemies)):
-                    self.health_potions.append(HealthPotion(x, y))
-                    break
+        self.index_entities()
+
+        self.log(f"Niveau {level}: {len(self.enemies)} ennemis, {len(self.health_potions)} potions")
+        self.log(f"Types d'ennemis disponibles: {available_types}")
 
-        print(f"Niveau {level}: {len(self.enemies)} ennemis, {len(self.health_potions)} potions")
-        print(f"Types d'ennemis disponibles: {available_types}")
+    def index_entities(self):
+        """Reconstruit les index spatiaux après le placement des ennemis et des potions"""
+        self.enemy_index = SpatialHash(self.enemies)
+        self.potion_index = SpatialHash(self.health_potions)
+        self.ai_scheduler.reset()
 
     def place_entities(self):
         self.enemies_killed = 0  # Réinitialiser le compteur d'ennemis tués
@@ -828,139 +1221,177 @@ class Game:
         else:
             self.player = Player3D(1, 1)
 
-        self.enemies = []
-        available_types = get_available_enemy_types()
-        min_distance_from_player = 5  # Distance minimale entre le joueur et les monstres
-        min_distance_between_enemies = 2  # Distance minimale entre les monstres
-
-        # Placer un ennemi par salle (sauf la première)
-        for room in self.dungeon.rooms[1:]:
-            for _ in range(50):  # Limiter les tentatives de placement
-                x = random.randint(room["x"], room["x"] + room["w"] - 1)
-                y = random.randint(room["y"], room["y"] + room["h"] - 1)
-
-                if not (0 <= x < self.dungeon.width and 0 <= y < self.dungeon.height):
-                    continue
-                if self.dungeon.is_wall(x, y) or self.is_near_wall(x, y, min_distance=2):
-                    continue
-                if math.sqrt((x - self.player.x) ** 2 + (y - self.player.y) ** 2) < min_distance_from_player:
-                    continue
-                if any(math.sqrt((x - e.x) ** 2 + (y - e.y) ** 2) < min_distance_between_enemies for e in self.enemies):
-                    continue
-
-                self.enemies.append(Enemy(x, y, available_types=available_types))
-                break
-
-        # Ajouter quelques ennemis dans les couloirs
-        for _ in range(3):
-            for _ in range(50):  # Limiter les tentatives de placement
-                x = random.randint(1, self.dungeon.width - 2)
-                y = random.randint(1, self.dungeon.height - 2)
-
-                if not (0 <= x < self.dungeon.width and 0 <= y < self.dungeon.height):
-                    continue
-                if self.dungeon.is_wall(x, y):
-                    continue
-                if math.sqrt((x - self.player.x) ** 2 + (y - self.player.y) ** 2) < min_distance_from_player:
-                    continue
-                if any(math.sqrt((x - e.x) ** 2 + (y - e.y) ** 2) < min_distance_between_enemies for e in self.enemies):
-                    continue
-
-                self.enemies.append(Enemy(x, y, available_types=available_types))
-                break
+        self.spawn_level_entities(get_available_enemy_types())
 
-        # Ajouter les potions
-        self.health_potions = []
-        for _ in range(6):  # Nombre de potions à placer
-            for _ in range(50):  # Limiter les tentatives de placement
-                x, y = random.randint(1, self.dungeon.width - 2), random.randint(1, self.dungeon.height - 2)
-                if (not self.dungeon.is_wall(x, y) and abs(x - self.player.x) >= 1 and abs(y - self.player.y) >= 1 and
-                        all(abs(x - e.x) >= 1 and abs(y - e.y) >= 1 for e in self.enemies)):  # Distance réduite
-                    self.health_potions.append(HealthPotion(x, y))
-                    break
+        self.index_entities()
 
         # Vérification des potions ajoutées
         # print(f"Potions ajoutées : {[{'x': p.x, 'y': p.y} for p in self.health_potions]}")
-        print(f"Potions ajoutées : {len(self.health_potions)}")
+        self.log(f"Potions ajoutées : {len(self.health_potions)}")
+
+    def spawn_level_entities(self, available_types):
+        """Crée les ennemis et les potions aux positions d'apparition du niveau installé (`cached_level`)"""
+        level = self.cached_level
+        self.enemies = [Enemy(x, y, enemy_type, available_types) for x, y, enemy_type in level.enemies]
+        self.health_potions = [HealthPotion(x, y, heal_amount) for x, y, heal_amount in level.potions]
 
     def handle_input(self, keys):
-        if keys[pygame.K_z]:
+        self.apply_actions([action for key, action in KEY_ACTIONS.items() if keys[key]])
+
+    def apply_actions(self, actions):
+        """Applique les actions de déplacement du joueur (voir KEY_ACTIONS)"""
+        if "forward" in actions:
             self.player.move(math.cos(self.player.angle), math.sin(self.player.angle), self.dungeon)
-        if keys[pygame.K_s]:
+        if "backward" in actions:
             self.player.move(-math.cos(self.player.angle), -math.sin(self.player.angle), self.dungeon)
-        if keys[pygame.K_q]:
+        if "turn_left" in actions:
             self.player.rotate(-0.05)
-        if keys[pygame.K_d]:
+        if "turn_right" in actions:
             self.player.rotate(0.05)
-        if keys[pygame.K_LEFT]:
+        if "strafe_left" in actions:
             self.player.move(math.cos(self.player.angle - math.pi/2), math.sin(self.player.angle - math.pi/2), self.dungeon)
-        if keys[pygame.K_RIGHT]:
+        if "strafe_right" in actions:
             self.player.move(math.cos(self.player.angle + math.pi/2), math.sin(self.player.angle + math.pi/2), self.dungeon)
-        if keys[pygame.K_p]:
+        if "use_potion" in actions:
             self.player.use_potion(self.potion_use_sound)
 
+    def step(self, actions=(), aim=None):
+        """Avance la logique du jeu d'un tick fixe (1/TICK_RATE s), sans rendu ni entrées pygame.
+
+        `actions` contient des valeurs de KEY_ACTIONS et éventuellement "shoot" ;
+        `aim` est la position (x, y) visée à l'écran, le centre par défaut.
+        Retourne "victory", "dead" ou None si le niveau continue.
+        """
+        if not self.enemies:
+            return "victory"
+
+        if "shoot" in actions:
+            screen_width, screen_height = self.screen.get_size() if self.screen else (800, 600)
+            aim_x, aim_y = aim if aim else (screen_width // 2, screen_height // 2)
+            shot = self.player.shoot(aim_x, aim_y, screen_width, screen_height, self.enemies, self.dungeon)
+            if shot:
+                self.bullets.spawn(*shot)
+        self.apply_actions(actions)
+
+        self.player.update()
+        self.collect_potions()
+        self.update_bullets()
+
+        for enemy, ticks in self.ai_scheduler.schedule(self.enemies, self.player, self.tick_count):
+            shot = enemy.update(self.player, self.dungeon, self.enemy_index, ticks)
+            self.enemy_index.update(enemy)
+            if shot:
+                self.bullets.spawn(*shot)
+
+        self.tick_count += 1
+        if self.player.hp <= 0:
+            return "dead"
+        return None
+
     def update_bullets(self):
-        for bullet in self.bullets[:]:
-            if not bullet.update(self.dungeon):
-                self.bullets.remove(bullet)
-                continue
-            
-            if bullet.is_player_bullet:
-                for enemy in self.enemies[:]:
-                    if abs(bullet.x - enemy.x) < 0.3 and abs(bullet.y - enemy.y) < 0.3:
-                        # Vérifier si l'attaque du joueur réussit
-                        if self.player.roll_attack(enemy.level):
-                            # L'attaque réussit, calculer les dégâts
-                            damage = self.player.roll_damage()
-                            enemy_killed = enemy.take_damage(damage)
-
-                            print(f"Touché! Dégâts: {damage} HP (Ennemi {enemy.enemy_type} niveau {enemy.level}: {enemy.hp}/{enemy.max_hp} HP)")
-
-                            if enemy_killed:
-                                # Attribuer l'XP au joueur
-                                xp_gained = enemy.xp_value
-                                leveled_up = self.player.gain_xp(xp_gained)
-                                print(f"Ennemi {enemy.enemy_type} tué! +{xp_gained} XP")
-
-                                if leveled_up:
-                                    print(f"NIVEAU SUPÉRIEUR! Niveau {self.player.level}")
-
-                                self.enemies.remove(enemy)
-                                self.enemies_killed += 1
-                        else:
-                            # L'attaque a raté
-                            print(f"Attaque ratée contre {enemy.enemy_type} niveau {enemy.level}")
-                            enemy.hit_animation = 5  # Animation plus courte pour les attaques ratées
-
-                        self.bullets.remove(bullet)
-                        break
-            else:
-                # Balle ennemie
-                if abs(bullet.x - self.player.x) < 0.3 and abs(bullet.y - self.player.y) < 0.3:
-                    # Trouver l'ennemi qui a tiré cette balle (approximation)
-                    closest_enemy = None
-                    min_distance = float('inf')
-                    for enemy in self.enemies:
-                        dist = math.sqrt((bullet.x - enemy.x)**2 + (bullet.y - enemy.y)**2)
-                        if dist < min_distance:
-                            min_distance = dist
-                            closest_enemy = enemy
-
-                    if closest_enemy and closest_enemy.roll_attack(self.player.level):
-                        # L'attaque de l'ennemi réussit
-                        damage = closest_enemy.roll_damage()
-                        self.player.take_damage(damage)
-                        print(f"Touché par {closest_enemy.enemy_type}! Dégâts: {damage} HP (Joueur: {self.player.hp}/{self.player.max_hp} HP)")
-                    else:
-                        print(f"L'attaque de l'ennemi a raté!")
+        pool = self.bullets
+        indices, stopped = pool.advance(self.dungeon, self.wall_mask)
+        if not indices.size:
+            return
 
-                    self.bullets.remove(bullet)
+        for index, enemy in self.find_bullet_hits(indices):
+            if enemy is not None:
+                if enemy not in self.enemy_index:
+                    continue  # Ennemi déjà tué par une autre balle pendant ce tick
+                # Vérifier si l'attaque du joueur réussit
+                if self.player.roll_attack(enemy.level):
+                    # L'attaque réussit, calculer les dégâts
+                    damage = self.player.roll_damage()
+                    enemy_killed = enemy.take_damage(damage)
+
+                    self.log(f"Touché! Dégâts: {damage} HP (Ennemi {enemy.enemy_type} niveau {enemy.level}: {enemy.hp}/{enemy.max_hp} HP)")
+
+                    if enemy_killed:
+                        # Attribuer l'XP au joueur
+                        xp_gained = enemy.xp_value
+                        self.xp_gained += xp_gained
+                        leveled_up = self.player.gain_xp(xp_gained)
+                        self.log(f"Ennemi {enemy.enemy_type} tué! +{xp_gained} XP")
+
+                        if leveled_up:
+                            self.log(f"NIVEAU SUPÉRIEUR! Niveau {self.player.level}")
+
+                        self.enemies.remove(enemy)
+                        self.enemy_index.remove(enemy)
+                        self.ai_scheduler.forget(enemy)
+                        self.enemies_killed += 1
+                else:
+                    # L'attaque a raté
+                    self.log(f"Attaque ratée contre {enemy.enemy_type} niveau {enemy.level}")
+                    enemy.hit_animation = 5  # Animation plus courte pour les attaques ratées
+            else:
+                bullet_x, bullet_y = float(pool.x[index]), float(pool.y[index])
+                # Trouver l'ennemi qui a tiré cette balle (approximation)
+                closest_enemy = self.enemy_index.nearest(bullet_x, bullet_y)
+
+                if closest_enemy and closest_enemy.roll_attack(self.player.level):
+                    # L'attaque de l'ennemi réussit
+                    damage = closest_enemy.roll_damage()
+                    self.player.take_damage(damage)
+                    self.damage_taken += damage
+                    self.log(f"Touché par {closest_enemy.enemy_type}! Dégâts: {damage} HP (Joueur: {self.player.hp}/{self.player.max_hp} HP)")
+                else:
+                    self.log(f"L'attaque de l'ennemi a raté!")
+
+            pool.release((index,))
+
+        pool.release(indices[stopped])
+
+    def find_bullet_hits(self, indices):
+        """Impacts des balles `indices` de la réserve pendant le dernier tick.
+
+        Retourne une liste (place de la balle, ennemi touché) ; l'ennemi vaut None pour
+        une balle ennemie qui touche le joueur. Chaque segment est déjà arrêté au mur ou
+        au sol éventuel, donc tout impact trouvé a lieu avant.
+        """
+        pool = self.bullets
+        hits = []
+        if indices.size <= SCALAR_BATCH_MAX:
+            for index in indices.tolist():
+                x0, y0, x1, y1 = pool.segment(index)
+                if pool.owner[index] == OWNER_PLAYER:
+                    # Premier ennemi touché le long du segment, parmi ceux des cases qu'il traverse
+                    reach = math.hypot(x1 - x0, y1 - y0) / 2 + HIT_RADIUS
+                    candidates = self.enemy_index.nearby((x0 + x1) / 2, (y0 + y1) / 2, reach)
+                    hit = first_circle_hit(x0, y0, x1, y1, candidates, HIT_RADIUS)
+                    if hit:
+                        hits.append((index, hit[1]))
+                elif segment_circle_hit(x0, y0, x1, y1, self.player.x, self.player.y, HIT_RADIUS) is not None:
+                    hits.append((index, None))
+            return hits
+
+        x0, y0 = pool.prev_x[indices], pool.prev_y[indices]
+        x1, y1 = pool.x[indices], pool.y[indices]
+        from_player = pool.owner[indices] == OWNER_PLAYER
+
+        # Balles du joueur contre tous les ennemis en un seul calcul
+        rows = np.flatnonzero(from_player)
+        if self.enemies and rows.size:
+            enemies = list(self.enemies)
+            enemy_x = np.fromiter((e.x for e in enemies), dtype=np.float64, count=len(enemies))
+            enemy_y = np.fromiter((e.y for e in enemies), dtype=np.float64, count=len(enemies))
+            hit_t, targets = sweep_circles(x0[rows], y0[rows], x1[rows], y1[rows], enemy_x, enemy_y, HIT_RADIUS)
+            hits += [(int(indices[rows[i]]), enemies[targets[i]]) for i in np.flatnonzero(np.isfinite(hit_t))]
+
+        # Balles ennemies contre le joueur
+        rows = np.flatnonzero(~from_player)
+        if rows.size:
+            player_x, player_y = np.array([self.player.x]), np.array([self.player.y])
+            hit_t, _ = sweep_circles(x0[rows], y0[rows], x1[rows], y1[rows], player_x, player_y, HIT_RADIUS)
+            hits += [(int(indices[rows[i]]), None) for i in np.flatnonzero(np.isfinite(hit_t))]
+        return hits
 
     def collect_potions(self):
-        for potion in self.health_potions[:]:
+        for potion in list(self.potion_index.nearby(self.player.x, self.player.y, 0.5)):
             if abs(self.player.x - potion.x) < 0.5 and abs(self.player.y - potion.y) < 0.5:
                 self.player.potions += 1
                 self.health_potions.remove(potion)
+                self.potion_index.remove(potion)
                 if self.potion_sound:  # Vérifier si le son est chargé
                     self.potion_sound.set_volume(0.4)
                     self.potion_sound.play()
@@ -980,6 +1411,7 @@ class Game:
             "Flèches - Déplacement latéral",
             "Clic gauche - Tirer sur les ennemis",
             "P - Utiliser une potion",
+            "F - Changer de moteur de rendu des murs",
             "",
             "Éliminez tous les ennemis!",
             "",
@@ -1170,38 +1602,52 @@ class Game:
     def start_new_level(self, level, preserve_stats=False):
         """Démarre un nouveau niveau"""
         self.current_level = level
-        self.setup_dungeon()
+        self.setup_dungeon(level)
         self.place_entities_for_level(level, preserve_stats)
-        self.bullets = []
+        self.bullets.clear()
         self.start_time = pygame.time.get_ticks()
+        self.tick_count = 0
+        self.damage_taken = 0
+        self.xp_gained = 0
 
-        print(f"=== NIVEAU {level} ===")
+        self.log(f"=== NIVEAU {level} ===")
         if preserve_stats:
-            print(f"Joueur niveau {self.player.level} avec {self.player.hp}/{self.player.max_hp} HP")
-        print(f"Difficulté augmentée, {len(self.enemies)} ennemis à affronter!")
+            self.log(f"Joueur niveau {self.player.level} avec {self.player.hp}/{self.player.max_hp} HP")
+        self.log(f"Difficulté augmentée, {len(self.enemies)} ennemis à affronter!")
 
     def render_walls(self, width, height):
-        for x in range(0, width, 2):
-            angle = self.player.angle - self.player.fov / 2 + (x / width) * self.player.fov
-            distance, hit_x, hit_y = cast_ray(self.player, angle, self.dungeon)
-            distance *= math.cos(angle - self.player.angle)
-            if distance > 0:
-                wall_height = int(height / (distance + 0.1))
-                wall_top = (height - wall_height) // 2
-                wall_bottom = wall_top + wall_height
-                wall_x = hit_x - math.floor(hit_x)
-                if abs(math.cos(angle)) > abs(math.sin(angle)):
-                    wall_x = hit_y - math.floor(hit_y)
-                base_color = 120 if int(wall_x * 8) % 2 == 0 else 100
-                brightness = max(50, 255 - int(distance * 12))
-                color = (min(255, base_color + brightness // 3), min(255, base_color // 2 + brightness // 4), min(255, base_color // 3 + brightness // 5))
-                pygame.draw.line(self.screen, color, (x, wall_top), (x, wall_bottom), 2)
+        projection = get_camera_projection(width, self.player.fov)
+        rays = cast_rays(self.player.x, self.player.y, self.player.angle, projection, self.wall_mask, stride=2)
+        wall_tops, wall_bottoms, colors = wall_strips(rays, height)
+        self.depth_buffer = np.repeat(rays.perp_distance, 2)[:width]
+        for i, x in enumerate(range(0, width, 2)):
+            if rays.perp_distance[i] > 0:
+                pygame.draw.line(self.screen, colors[i], (x, wall_tops[i]), (x, wall_bottoms[i]), 2)
+
+    def render_walls_framebuffer(self, width, height):
+        """Rendu des murs, du ciel et du sol dans un tampon de pixels, une colonne par pixel."""
+        if self.framebuffer is None or (self.framebuffer.width, self.framebuffer.height) != (width, height):
+            self.framebuffer = FramebufferRenderer(width, height, self.textures)
+        projection = get_camera_projection(width, self.player.fov)
+        rays = cast_rays(self.player.x, self.player.y, self.player.angle, projection, self.wall_mask)
+        self.depth_buffer = rays.perp_distance
+        self.framebuffer.render(self.screen, rays)
+
+    def toggle_wall_renderer(self):
+        """Bascule entre les moteurs de rendu des murs pour comparer les temps de frame"""
+        print(f"Rendu des murs '{self.wall_renderer}' : {self.clock.get_fps():.1f} FPS")
+        index = WALL_RENDERERS.index(self.wall_renderer)
+        self.wall_renderer = WALL_RENDERERS[(index + 1) % len(WALL_RENDERERS)]
+        print(f"Rendu des murs : {self.wall_renderer}")
 
     def render_player_ui(self, width, height):
-        debug_font = pygame.font.Font(None, 24)
-        player_debug = debug_font.render(f"Player: ({self.player.x:.1f}, {self.player.y:.1f}, {self.player.z:.1f})", True, (255, 255, 0))
+        player_debug = self.hud.label("position", "Player: ({:.1f}, {:.1f}, {:.1f})",
+                                      round(self.player.x, 1), round(self.player.y, 1), round(self.player.z, 1), color=(255, 255, 0))
         self.screen.blit(player_debug, (10, height - 60))
-        enemy_count = debug_font.render(f"Enemies visible: {len([e for e in self.enemies if math.sqrt((e.x - self.player.x) ** 2 + (e.y - self.player.y) ** 2) < 10])}", True, (255, 255, 0))
+        px, py = self.player.x, self.player.y
+        # Ennemis à moins de 10 cases, pris dans les cases voisines de l'index spatial
+        visible_enemies = sum(1 for e in self.enemy_index.nearby(px, py, 10) if (e.x - px) ** 2 + (e.y - py) ** 2 < 100)
+        enemy_count = self.hud.label("enemies", "Enemies visible: {}", visible_enemies, color=(255, 255, 0))
         self.screen.blit(enemy_count, (10, height - 40))
         health_bar_width = 200
         health_bar_height = 20
@@ -1212,19 +1658,18 @@ class Game:
         health_width = int(health_bar_width * health_ratio)
         pygame.draw.rect(self.screen, (0, 255, 0), (health_x, health_y, health_width, health_bar_height))
         pygame.draw.rect(self.screen, (255, 255, 255), (health_x, health_y, health_bar_width, health_bar_height), 2)
-        font = pygame.font.Font(None, 24)
-        hp_text = font.render(f"HP: {self.player.hp}/{self.player.max_hp}", True, (255, 255, 255))
+        hp_text = self.hud.label("hp", "HP: {}/{}", self.player.hp, self.player.max_hp)
         self.screen.blit(hp_text, (health_x, health_y + health_bar_height + 5))
-        potion_text = font.render(f"Potions: {self.player.potions}", True, (0, 255, 0))
+        potion_text = self.hud.label("potions", "Potions: {}", self.player.potions, color=(0, 255, 0))
         self.screen.blit(potion_text, (health_x - 120, health_y + 5))
 
         # Afficher le niveau et l'XP
-        level_text = font.render(f"Niveau: {self.player.level}", True, (255, 255, 255))
+        level_text = self.hud.label("level", "Niveau: {}", self.player.level)
         self.screen.blit(level_text, (health_x - 120, health_y + 30))
         xp_percentage = self.player.get_xp_percentage()
         pygame.draw.rect(self.screen, (100, 100, 255), (health_x, health_y + health_bar_height + 25, health_bar_width, health_bar_height))
         pygame.draw.rect(self.screen, (255, 255, 0), (health_x, health_y + health_bar_height + 25, health_bar_width * xp_percentage, health_bar_height))
-        xp_text = font.render(f"XP: {self.player.xp}/{self.player.xp_to_next_level}", True, (255, 255, 255))
+        xp_text = self.hud.label("xp", "XP: {}/{}", self.player.xp, self.player.xp_to_next_level)
         self.screen.blit(xp_text, (health_x, health_y + health_bar_height + 50))
 
         center_x, center_y = width // 2, height // 2
@@ -1245,43 +1690,48 @@ class Game:
 
     def render_3d(self):
         width, height = self.screen.get_size()
-        self.screen.fill((50, 50, 100))
-        pygame.draw.rect(self.screen, (100, 50, 0), (0, height // 2, width, height // 2))
-        self.render_walls(width, height)
-        for enemy in self.enemies:
-            self.render_entity(enemy, width, height)
-        for potion in self.health_potions:
-            self.render_potion(potion, width, height)
-        for bullet in self.bullets:
-            self.render_bullet(bullet, width, height)
+        if self.wall_renderer == "framebuffer":
+            self.render_walls_framebuffer(width, height)
+        else:
+            self.screen.fill((50, 50, 100))
+            pygame.draw.rect(self.screen, (100, 50, 0), (0, height // 2, width, height // 2))
+            self.render_walls(width, height)
+
+        # Sprites triés du plus lointain au plus proche, découpés par le z-buffer des murs
+        sprites = [(enemy, self.render_entity) for enemy in self.enemies]
+        sprites += [(potion, self.render_potion) for potion in self.health_potions]
+        sprites += [(bullet, self.render_bullet) for bullet in self.bullets]
+        sprites.sort(key=lambda sprite: (sprite[0].x - self.player.x) ** 2 + (sprite[0].y - self.player.y) ** 2, reverse=True)
+        for obj, render in sprites:
+            render(obj, width, height)
         self.render_player_ui(width, height)
 
     def render_entity(self, enemy, width, height):
         distance, angle_diff, screen_x = get_perspective_params(enemy.x, enemy.y, self.player, width, height)
-        if distance < 10 and abs(angle_diff) < self.player.fov / 2 and has_line_of_sight(self.player, enemy, self.dungeon):
-            sprite_surface = self.enemy_sprites.get(enemy.enemy_type, self.enemy_sprites.get('orc', generate_enemy_sprite()))
+        if distance < 10 and abs(angle_diff) < self.player.fov / 2:
+            sprite_surface = self.enemy_sprites.get(enemy.enemy_type) or self.enemy_sprites.get('orc') or get_enemy_sprite(enemy.enemy_type)
             original_width, original_height = sprite_surface.get_size()
             aspect_ratio = original_width / original_height
             real_height = enemy.height
             perspective_scale = 1.0 / (distance + 0.1)
-            screen_height_px = max(40, int(real_height * 200 * perspective_scale))
+            screen_height_px = _scaled_sprite_cache.quantize_height(max(40, int(real_height * 200 * perspective_scale)))
             screen_width_px = int(screen_height_px * aspect_ratio)
             eye_level_y = height // 2
             vertical_offset = int(self.player.eye_height * VERTICAL_PERSPECTIVE_FACTOR / (distance + 0.1))
             ground_level_y = eye_level_y + vertical_offset
             sprite_y = ground_level_y - screen_height_px
             sprite_x = screen_x - screen_width_px // 2
-            if 0 <= screen_x < width and screen_height_px > 10:
-                scaled_sprite = pygame.transform.scale(sprite_surface, (screen_width_px, screen_height_px))
+            # Colonnes où l'ennemi est devant les murs
+            spans = visible_spans(self.depth_buffer, sprite_x, sprite_x + screen_width_px, distance * math.cos(angle_diff))
+            if 0 <= screen_x < width and screen_height_px > 10 and spans:
                 brightness = max(0.3, 1.0 - distance / 10)
-                dark_sprite = scaled_sprite.copy()
+                red_tint = None
                 if enemy.hit_animation > 0:
                     hit_intensity = enemy.hit_animation / 10.0
-                    red_tint = (255, int(100 * hit_intensity), int(100 * hit_intensity))
-                    dark_sprite.fill(red_tint, special_flags=pygame.BLEND_MULT)
-                else:
-                    dark_sprite.fill((int(255 * brightness), int(255 * brightness), int(255 * brightness)), special_flags=pygame.BLEND_MULT)
-                self.screen.blit(dark_sprite, (sprite_x, sprite_y))
+                    red_tint = (255, min(255, int(100 * hit_intensity)), min(255, int(100 * hit_intensity)))
+                dark_sprite = _scaled_sprite_cache.get(enemy.enemy_type, sprite_surface, screen_height_px, brightness, red_tint)
+                for span_start, span_end in spans:
+                    self.screen.blit(dark_sprite, (span_start, sprite_y), (span_start - sprite_x, 0, span_end - span_start, screen_height_px))
 
                 # Barre d'HP au-dessus de l'ennemi
                 if enemy.hp < enemy.max_hp:
@@ -1303,7 +1753,7 @@ class Game:
 
     def render_potion(self, potion, width, height):
         distance, angle_diff, screen_x = get_perspective_params(potion.x, potion.y, self.player, width, height)
-        if distance < 8 and abs(angle_diff) < self.player.fov / 2 and has_line_of_sight(self.player, potion, self.dungeon):
+        if distance < 8 and abs(angle_diff) < self.player.fov / 2:
             real_height = 0.3
             perspective_scale = 1.0 / (distance + 0.1)
             potion_size = max(20, int(real_height * 200 * perspective_scale))
@@ -1312,30 +1762,32 @@ class Game:
             ground_level_y = eye_level_y + vertical_offset
             sprite_bottom = ground_level_y
             potion_y = sprite_bottom - potion_size
+            spans = visible_spans(self.depth_buffer, screen_x - potion_size // 2, screen_x + potion_size // 2 + 1, distance * math.cos(angle_diff))
             if 0 <= screen_x < width and potion_size > 5:
-                pygame.draw.circle(self.screen, (0, 255, 0), (screen_x, potion_y + potion_size // 2), potion_size // 3)
-                pygame.draw.line(self.screen, (255, 255, 255), (screen_x - potion_size // 4, potion_y + potion_size // 2), (screen_x + potion_size // 4, potion_y + potion_size // 2), 3)
-                pygame.draw.line(self.screen, (255, 255, 255), (screen_x, potion_y + potion_size // 2 - potion_size // 4), (screen_x, potion_y + potion_size // 2 + potion_size // 4), 3)
+                # Dessin limité aux colonnes non masquées par un mur
+                for span_start, span_end in spans:
+                    self.screen.set_clip((span_start, 0, span_end - span_start, height))
+                    pygame.draw.circle(self.screen, (0, 255, 0), (screen_x, potion_y + potion_size // 2), potion_size // 3)
+                    pygame.draw.line(self.screen, (255, 255, 255), (screen_x - potion_size // 4, potion_y + potion_size // 2), (screen_x + potion_size // 4, potion_y + potion_size // 2), 3)
+                    pygame.draw.line(self.screen, (255, 255, 255), (screen_x, potion_y + potion_size // 2 - potion_size // 4), (screen_x, potion_y + potion_size // 2 + potion_size // 4), 3)
+                self.screen.set_clip(None)
 
     def render_bullet(self, bullet, width, height):
         distance, angle_diff, screen_x = get_perspective_params(bullet.x, bullet.y, self.player, width, height)
         if distance < 8 and abs(angle_diff) < self.player.fov / 2:
             bullet_size = max(3, int(20 / (distance + 0.1)))
             bullet_y = height // 2
-            if 0 <= screen_x < width:
+            if 0 <= screen_x < width and self.depth_buffer[screen_x] > distance * math.cos(angle_diff):
                 bullet_color = (255, 255, 0) if bullet.is_player_bullet else (255, 100, 100)
                 pygame.draw.circle(self.screen, bullet_color, (screen_x, bullet_y), bullet_size)
 
     def draw_minimap(self):
-        mini_size = 150
-        mini_scale = mini_size / max(self.dungeon.width, self.dungeon.height)
-        pygame.draw.rect(self.screen, (0, 0, 0), (10, 10, mini_size, mini_size))
+        mini_scale = MINIMAP_SIZE / max(self.dungeon.width, self.dungeon.height)
 
-        # Dessiner les murs
-        for y in range(self.dungeon.height):
-            for x in range(self.dungeon.width):
-                if self.dungeon.grid[y][x] != 0:
-                    pygame.draw.rect(self.screen, (100, 100, 100), (10 + x * mini_scale, 10 + y * mini_scale, mini_scale, mini_scale))
+        # Fond et cases praticables, précalculés au début du niveau
+        if self.minimap_surface is None:
+            self.bake_minimap()
+        self.screen.blit(self.minimap_surface, (10, 10))
 
         # Dessiner le joueur
         player_map_x = int(10 + self.player.x * mini_scale)
@@ -1356,13 +1808,13 @@ class Game:
 
         # Afficher le niveau du donjon et les statistiques
         elapsed_time = (pygame.time.get_ticks() - self.start_time) // 1000
-        level_text = pygame.font.Font(None, 20).render(f"NIVEAU {self.current_level}", True, (255, 255, 0))
-        time_text = pygame.font.Font(None, 20).render(f"Temps: {elapsed_time}s", True, (255, 255, 255))
-        kills_text = pygame.font.Font(None, 20).render(f"Tués: {self.enemies_killed}", True, (255, 255, 255))
+        level_text = self.minimap_hud.label("level", "NIVEAU {}", self.current_level, color=(255, 255, 0))
+        time_text = self.minimap_hud.label("time", "Temps: {}s", elapsed_time)
+        kills_text = self.minimap_hud.label("kills", "Tués: {}", self.enemies_killed)
 
-        self.screen.blit(level_text, (10 + mini_size + 10, 10))
-        self.screen.blit(time_text, (10 + mini_size + 10, 30))
-        self.screen.blit(kills_text, (10 + mini_size + 10, 50))
+        self.screen.blit(level_text, (10 + MINIMAP_SIZE + 10, 10))
+        self.screen.blit(time_text, (10 + MINIMAP_SIZE + 10, 30))
+        self.screen.blit(kills_text, (10 + MINIMAP_SIZE + 10, 50))
 
     def run(self):
         choice = self.show_instructions()
@@ -1381,7 +1833,7 @@ class Game:
                 print(f"Partie chargée : Niveau {self.player.level}, Donjon {self.current_level}")
 
                 # Démarrer au niveau sauvegardé
-                self.setup_dungeon()
+                self.setup_dungeon(self.current_level)
                 # Positionner le joueur dans le donjon
                 if self.dungeon.rooms:
                     room = self.dungeon.rooms[0]
@@ -1402,25 +1854,34 @@ class Game:
             self.setup_dungeon()
             self.place_entities()
 
-        self.bullets = []
+        self.bullets.clear()
         self.start_time = pygame.time.get_ticks()
+        self.tick_count = 0
+        self.damage_taken = 0
+        self.xp_gained = 0
 
         running = True
         while running:
             keys = pygame.key.get_pressed()
+            actions = [action for key, action in KEY_ACTIONS.items() if keys[key]]
+            aim = None
 
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     running = False
                 elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                    mouse_x, mouse_y = event.pos
-                    bullet = self.player.shoot(mouse_x, mouse_y, 800, 600, self.enemies, self.dungeon)
-                    if bullet:
-                        self.bullets.append(bullet)
-
-            self.handle_input(keys)
-
-            if not self.enemies:
+                    actions.append("shoot")
+                    aim = event.pos
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_f:
+                    self.toggle_wall_renderer()
+                elif event.type == pygame.VIDEORESIZE:
+                    # Les tables de projection et le tampon de pixels dépendent de la taille de la fenêtre
+                    clear_camera_projections()
+                    self.framebuffer = None
+
+            status = self.step(actions, aim)
+
+            if status == "victory":
                 elapsed_time = (pygame.time.get_ticks() - self.start_time) // 1000
                 action = self.show_victory_screen(self.enemies_killed, elapsed_time)
                 if action == "continue":
@@ -1432,16 +1893,7 @@ class Game:
                     running = False
                 continue
 
-            self.player.update()
-            self.collect_potions()
-            self.update_bullets()
-
-            for enemy in self.enemies:
-                bullet = enemy.update(self.player, self.dungeon, self.enemies)
-                if bullet:
-                    self.bullets.append(bullet)
-
-            if self.player.hp <= 0:
+            if status == "dead":
                 elapsed_time = (pygame.time.get_ticks() - self.start_time) // 1000
                 action = self.show_death_screen(self.enemies_killed, elapsed_time)
                 if action:
@@ -1454,24 +1906,27 @@ class Game:
             self.draw_minimap()
 
             pygame.display.flip()
-            self.clock.tick(60)
+            self.clock.tick(TICK_RATE)
 
+        if self.level_prefetcher:
+            self.level_prefetcher.shutdown()
         pygame.quit()
 
 
 def get_perspective_params(obj_x, obj_y, player, width, height):
+    projection = get_camera_projection(width, player.fov)
     dx = obj_x - player.x
     dy = obj_y - player.y
     distance = math.sqrt(dx * dx + dy * dy)
     angle = math.atan2(dy, dx)
-    angle_diff = angle - player.angle
-    while angle_diff > math.pi:
-        angle_diff -= 2 * math.pi
-    while angle_diff < -math.pi:
-        angle_diff += 2 * math.pi
-    screen_x = int(width / 2 + (angle_diff / (player.fov / 2)) * width / 2)
+    angle_diff = math.remainder(angle - player.angle, 2 * math.pi)
+    screen_x = int(width / 2 + angle_diff * projection.columns_per_radian)
     return distance, angle_diff, screen_x
 
 if __name__ == "__main__":
-    game = Game()
+    # python dungeon_3d.py [graine] [Labyrinth|Bent|Straight] : avec une graine, les niveaux sont les mêmes
+    # à chaque session et mis en cache sur disque ; avec une disposition, couloirs en labyrinthe de dungeon.pl
+    arguments = sys.argv[1:]
+    game = Game(seed=next((int(argument) for argument in arguments if argument.isdigit()), None),
+                corridor_layout=next((argument for argument in arguments if argument in CORRIDOR_LAYOUT), None))
     game.run()
@@ -0,0 +1,81 @@
+"""Rendu des murs dans un tampon de pixels NumPy, présenté en un seul blit.
+
+Alternative au rendu historique par pygame.draw.line : le ciel, le sol et toutes
+les colonnes de murs sont écrits dans un tableau (largeur, hauteur) de pixels
+32 bits puis copiés dans une surface persistante via pygame.surfarray.
+"""
+import numpy as np
+import pygame
+
+from raycaster import FACE_E, FACE_W, wall_strips
+
+TEXTURE_SIZE = 64
+SHADE_LEVELS = 16
+SKY_COLORS = ((30, 30, 70), (50, 50, 100))     # haut de l'écran -> horizon
+FLOOR_COLORS = ((50, 25, 0), (100, 50, 0))     # horizon -> bas de l'écran
+
+
+def _gradient(top_color, bottom_color, rows):
+    t = np.linspace(0.0, 1.0, rows)[:, None]
+    return (np.array(top_color) * (1 - t) + np.array(bottom_color) * t).astype(np.uint32)
+
+
+class FramebufferRenderer:
+    def __init__(self, width, height, textures=None):
+        self.width = width
+        self.height = height
+        self.surface = pygame.Surface((width, height), depth=32)
+        self.shifts = self.surface.get_shifts()[:3]
+        self.rows = np.arange(height, dtype=np.int32)
+
+        horizon = height // 2
+        column = self.map_rgb(np.concatenate([_gradient(*SKY_COLORS, horizon),
+                                              _gradient(*FLOOR_COLORS, height - horizon)]))
+        self.background = np.ascontiguousarray(np.broadcast_to(column, (width, height)))
+        self.pixels = np.empty((width, height), dtype=np.uint32)
+
+        # Textures murales pré-assombries : briques pour les faces N/S, pierre pour les faces E/O
+        self.wall_textures = None
+        textures = textures or {}
+        names = [name for name in ("wall_brick", "wall_stone") if name in textures]
+        if names:
+            arrays = [pygame.surfarray.array3d(pygame.transform.scale(textures[name], (TEXTURE_SIZE, TEXTURE_SIZE)))
+                      for name in names]
+            if len(arrays) == 1:
+                arrays.append(arrays[0])
+            levels = np.linspace(50 / 255, 1.0, SHADE_LEVELS)[None, :, None, None, None]
+            shaded = (np.stack(arrays)[:, None].astype(np.float64) * levels).astype(np.uint32)
+            self.wall_textures = self.map_rgb(shaded).ravel()
+
+    def map_rgb(self, rgb):
+        """Convertit un tableau (..., 3) de couleurs en pixels 32 bits au format de la surface."""
+        rgb = rgb.astype(np.uint32)
+        r_shift, g_shift, b_shift = self.shifts
+        return (rgb[..., 0] << r_shift) | (rgb[..., 1] << g_shift) | (rgb[..., 2] << b_shift)
+
+    def render(self, screen, rays):
+        """Dessine ciel, sol et murs décrits par `rays` (une colonne d'écran par rayon)."""
+        wall_tops, wall_bottoms, colors = wall_strips(rays, self.height)
+        rows = self.rows[None, :]
+        in_wall = (rows >= wall_tops[:, None]) & (rows < wall_bottoms[:, None])
+        in_wall &= (rays.perp_distance > 0)[:, None]
+
+        if self.wall_textures is None:
+            wall_pixels = self.map_rgb(colors)[:, None]
+        else:
+            wall_heights = np.maximum(wall_bottoms - wall_tops, 1)
+            tex_scale = (TEXTURE_SIZE / wall_heights).astype(np.float32)
+            tex_rows = ((rows - wall_tops[:, None]) * tex_scale[:, None]).astype(np.int32)
+            np.clip(tex_rows, 0, TEXTURE_SIZE - 1, out=tex_rows)
+            # Index de départ de la colonne de texture (texture, niveau d'ombre, colonne) dans le tableau aplati
+            tex_cols = (rays.tex_x * TEXTURE_SIZE).astype(np.int32).clip(0, TEXTURE_SIZE - 1)
+            tex_ids = ((rays.face == FACE_E) | (rays.face == FACE_W)).astype(np.int32)
+            shade_ids = ((rays.shade - 50) * (SHADE_LEVELS - 1) // 205).clip(0, SHADE_LEVELS - 1)
+            column_starts = ((tex_ids * SHADE_LEVELS + shade_ids) * TEXTURE_SIZE + tex_cols) * TEXTURE_SIZE
+            tex_rows += column_starts[:, None].astype(np.int32)
+            wall_pixels = self.wall_textures.take(tex_rows)
+
+        np.copyto(self.pixels, self.background)
+        np.copyto(self.pixels, wall_pixels, where=in_wall)
+        pygame.surfarray.blit_array(self.surface, self.pixels)
+        screen.blit(self.surface, (0, 0))
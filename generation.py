@@ -0,0 +1,314 @@
+"""Génération de donjons reproductible, partagée par dungeon.py et dungeon_3d.py.
+
+Comme l'option seed de dungeon.pl, chaque donjon a une graine : tous les tirages
+de la génération passent par une instance random.Random qui lui est propre, si
+bien qu'un niveau est régénéré à l'identique à partir de sa graine, quel que soit
+l'état du module random global.
+
+Le donjon est un dict (width, height, grid, rooms, connections, stairs, seed) ;
+la grille utilise les codes de cases ci-dessous.
+"""
+import random
+
+# Codes des cases de la grille
+EMPTY, ROOM, CORRIDOR, STAIRS_UP, STAIRS_DOWN = 0, 1, 2, 3, 4
+
+# Tirages (taille et position) d'une salle Scattered avant de chercher une place libre par balayage
+SCATTER_ATTEMPTS = 8
+
+
+def new_seed():
+    """Graine tirée du module random global (donc reproductible si l'appelant l'a initialisé)."""
+    return random.getrandbits(32)
+
+
+def derive_seed(seed, *parts):
+    """Graine dérivée de `seed` et de `parts` (par exemple un numéro de niveau), stable d'une session à l'autre."""
+    return random.Random(":".join(str(part) for part in (seed, *parts))).getrandbits(32)
+
+
+def make_rng(seed):
+    """Générateur isolé utilisé pour tous les tirages d'un donjon."""
+    return random.Random(seed)
+
+
+def init_dungeon(width=50, height=50, seed=None):
+    return {"width": width, "height": height, "grid": [[EMPTY] * width for _ in range(height)],
+            "rooms": [], "connections": [], "stairs": [], "seed": new_seed() if seed is None else seed}
+
+
+def room_overlaps(room, rooms):
+    x, y, w, h = room["x"], room["y"], room["w"], room["h"]
+    return any(x < r["x"] + r["w"] and x + w > r["x"] and y < r["y"] + r["h"] and y + h > r["y"] for r in rooms)
+
+
+def carve_room(grid, room):
+    for j in range(room["y"], room["y"] + room["h"]):
+        row = grid[j]
+        for i in range(room["x"], room["x"] + room["w"]):
+            row[i] = ROOM
+
+
+def carve_corridor(grid, x1, y1, x2, y2):
+    """Couloir en L : horizontal sur la ligne y1, puis vertical sur la colonne x2 (sans écraser les salles)."""
+    for x in range(min(x1, x2), max(x1, x2) + 1):
+        if grid[y1][x] == EMPTY:
+            grid[y1][x] = CORRIDOR
+    for y in range(min(y1, y2), max(y1, y2) + 1):
+        if grid[y][x2] == EMPTY:
+            grid[y][x2] = CORRIDOR
+
+
+class OccupancyGrid:
+    """Index des cases occupées : une ligne = un entier dont le bit x vaut 1 si la case est prise.
+
+    Tester ou occuper un rectangle coûte une opération par ligne (au lieu d'un parcours
+    des salles existantes), et find_free trouve une position libre pour une taille
+    donnée en un balayage des lignes, sans tirage au hasard.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.rows = [0] * height
+
+    def is_free(self, x, y, w, h):
+        mask = ((1 << w) - 1) << x
+        return not any(row & mask for row in self.rows[y:y + h])
+
+    def occupy(self, x, y, w, h):
+        mask = ((1 << w) - 1) << x
+        rows = self.rows
+        for j in range(y, y + h):
+            rows[j] |= mask
+
+    def find_free(self, w, h, x0=0, y0=0, min_x=1, min_y=1):
+        """Position (x, y) où un rectangle w x h tient dans [min_x, width - 1[ x [min_y, height - 1[, ou None.
+
+        Le balayage part de la ligne y0 (en revenant au début) et, dans une ligne, préfère
+        la première position libre à partir de x0 : l'appelant y passe une position tirée.
+        """
+        max_x, max_y = self.width - w - 1, self.height - h - 1
+        if max_x < min_x or max_y < min_y:
+            return None
+        # Bits des positions de départ admises
+        allowed = ((1 << (max_x - min_x + 1)) - 1) << min_x
+        full = (1 << self.width) - 1
+        rows = self.rows
+        y0 = min(max(y0, min_y), max_y)
+        for y in (*range(y0, max_y + 1), *range(min_y, y0)):
+            combined = 0
+            for row in rows[y:y + h]:
+                combined |= row
+            free = ~combined & full
+            # Bit x conservé si les cases x .. x + w - 1 sont toutes libres
+            starts = free
+            for k in range(1, w):
+                starts &= free >> k
+            starts &= allowed
+            if starts:
+                after = starts >> x0
+                if after:
+                    return x0 + (after & -after).bit_length() - 1, y
+                return (starts & -starts).bit_length() - 1, y
+        return None
+
+
+def emplace_rooms(dungeon, rng, max_rooms=20, min_size=3, max_size=8, room_layout="Scattered"):
+    """Place les salles selon `room_layout`, comme emplace_rooms de dungeon.pl (Packed ou Scattered)."""
+    if room_layout == "Packed":
+        pack_rooms(dungeon, rng, max_rooms, min_size, max_size)
+    else:
+        scatter_rooms(dungeon, rng, max_rooms, min_size, max_size)
+
+
+def _add_room(dungeon, x, y, w, h):
+    room = {"x": x, "y": y, "w": w, "h": h}
+    dungeon["rooms"].append(room)
+    carve_room(dungeon["grid"], room)
+
+
+def _occupy_with_margin(index, x, y, w, h, margin=1):
+    """Occupe le rectangle et `margin` cases autour (dans la carte) : une salle posée à côté ne le touchera pas."""
+    x0, y0 = max(x - margin, 0), max(y - margin, 0)
+    x1, y1 = min(x + w + margin, index.width), min(y + h + margin, index.height)
+    index.occupy(x0, y0, x1 - x0, y1 - y0)
+
+
+def _occupancy(dungeon, margin=0):
+    """Index des salles déjà placées dans `dungeon`, agrandies de `margin` cases."""
+    index = OccupancyGrid(dungeon["width"], dungeon["height"])
+    for room in dungeon["rooms"]:
+        _occupy_with_margin(index, room["x"], room["y"], room["w"], room["h"], margin)
+    return index
+
+
+def scatter_rooms(dungeon, rng, max_rooms=20, min_size=3, max_size=8):
+    """Place `max_rooms` salles à des positions aléatoires, séparées d'au moins une case.
+
+    Comme l'ancien tirage avec rejet, une salle qui ne tient pas est retirée jusqu'à
+    SCATTER_ATTEMPTS fois : d'abord à une autre position avec la même taille, puis avec
+    une nouvelle taille (retirer la taille d'emblée favoriserait les petites salles sur
+    les cartes chargées). Ensuite seulement, elle va à la position libre la plus proche
+    dans l'ordre de balayage, puis en taille minimale si sa taille ne tient nulle part.
+    Le nombre demandé n'est manqué que si la carte est pleine.
+    """
+    width, height = dungeon["width"], dungeon["height"]
+    index = _occupancy(dungeon, margin=1)
+    for _ in range(max_rooms):
+        for attempt in range(SCATTER_ATTEMPTS):
+            if attempt == 0 or attempt >= SCATTER_ATTEMPTS // 2:
+                w = rng.randint(min_size, max_size)
+                h = rng.randint(min_size, max_size)
+            x = rng.randint(1, width - w - 1)
+            y = rng.randint(1, height - h - 1)
+            if index.is_free(x, y, w, h):
+                break
+        else:
+            position = index.find_free(w, h, x, y)
+            if position is None:
+                w = h = min_size
+                position = index.find_free(w, h, x, y)
+                if position is None:
+                    break  # Même une salle minimale ne tient plus : les suivantes non plus
+            x, y = position
+        _occupy_with_margin(index, x, y, w, h)
+        _add_room(dungeon, x, y, w, h)
+
+
+def pack_rooms(dungeon, rng, max_rooms=None, min_size=3, max_size=8):
+    """Remplit la carte de salles ligne par ligne, séparées d'une case, comme pack_rooms de dungeon.pl.
+
+    Chaque case libre rencontrée reçoit une salle de taille tirée, réduite à la place
+    disponible. Si la carte en contient plus que `max_rooms`, un échantillon aléatoire
+    (dans l'ordre du balayage) est gardé ; None les garde toutes.
+    """
+    width, height = dungeon["width"], dungeon["height"]
+    index = _occupancy(dungeon)
+    rows = index.rows
+    full = (1 << width) - 1
+    placed = []
+    for y in range(1, height - min_size):
+        x = 1
+        while x < width - min_size:
+            # Prochaine case libre de la ligne, puis longueur de la plage libre qui la suit
+            free = (~rows[y] & full) >> x
+            if not free:
+                break
+            x += (free & -free).bit_length() - 1
+            taken = rows[y] >> x
+            run = (taken & -taken).bit_length() - 1 if taken else width - x
+            run = min(run, width - 1 - x)
+            w = min(rng.randint(min_size, max_size), run)
+            h = min(rng.randint(min_size, max_size), height - 1 - y)
+            if w < min_size or h < min_size:
+                x += run + 1
+                continue
+            # Les salles posées plus haut et qui descendent jusqu'ici coupent déjà la ligne y :
+            # une plage libre sur cette ligne est donc libre sur toute la hauteur
+            placed.append((x, y, w, h))
+            # Salle et sa bordure à gauche, à droite et en dessous (au-dessus, c'est déjà fait)
+            index.occupy(x - 1, y, min(w + 2, width - x + 1), min(h + 1, height - y))
+            x += w + 1
+
+    if max_rooms is not None and len(placed) > max_rooms:
+        placed = [placed[i] for i in sorted(rng.sample(range(len(placed)), max_rooms))]
+    for x, y, w, h in placed:
+        _add_room(dungeon, x, y, w, h)
+
+
+def corridors(dungeon, corridor_ratio=1.0):
+    """Relie les salles consécutives ; `corridor_ratio` réduit le nombre de liaisons (difficulté)."""
+    rooms = dungeon["rooms"]
+    connections = dungeon["connections"]
+    max_connections = int((len(rooms) - 1) * corridor_ratio)
+
+    for i in range(max_connections):
+        a, b = rooms[i], rooms[i + 1]
+        ax, ay = a["x"] + a["w"] // 2, a["y"] + a["h"] // 2
+        bx, by = b["x"] + b["w"] // 2, b["y"] + b["h"] // 2
+        carve_corridor(dungeon["grid"], ax, ay, bx, by)
+        connections.append(((ax, ay), (bx, by)))
+
+
+def keep_largest_region(grid):
+    """Vide les cases praticables qui ne sont pas reliées (en 4-connexité) à la plus grande région."""
+    height, width = len(grid), len(grid[0])
+    regions = []
+    seen = set()
+    for y in range(height):
+        for x in range(width):
+            if grid[y][x] == EMPTY or (x, y) in seen:
+                continue
+            region = [(x, y)]
+            seen.add((x, y))
+            for cx, cy in region:  # La liste grandit pendant le parcours (largeur d'abord)
+                for nx, ny in ((cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1)):
+                    if 0 <= nx < width and 0 <= ny < height and grid[ny][nx] != EMPTY and (nx, ny) not in seen:
+                        seen.add((nx, ny))
+                        region.append((nx, ny))
+            regions.append(region)
+    regions.sort(key=len)
+    for region in regions[:-1]:
+        for x, y in region:
+            grid[y][x] = EMPTY
+
+
+def emplace_stairs(dungeon, rng):
+    """Place un escalier montant et un descendant au centre de deux salles distinctes."""
+    rooms = dungeon["rooms"]
+    if len(rooms) < 2:
+        return
+
+    grid = dungeon["grid"]
+    up, down = rng.sample(rooms, 2)
+    ux, uy = up["x"] + up["w"] // 2, up["y"] + up["h"] // 2
+    dx, dy = down["x"] + down["w"] // 2, down["y"] + down["h"] // 2
+    grid[uy][ux] = STAIRS_UP
+    grid[dy][dx] = STAIRS_DOWN
+    dungeon["stairs"] = [{"type": "up", "x": ux, "y": uy}, {"type": "down", "x": dx, "y": dy}]
+
+
+def generate(width=50, height=50, seed=None, max_rooms=20, min_size=3, max_size=8, corridor_ratio=1.0, stairs=True,
+             room_layout="Scattered", corridor_layout=None):
+    """Génère un donjon complet ; la même graine et les mêmes paramètres donnent le même donjon.
+
+    Avec `corridor_layout` (Labyrinth, Bent ou Straight), le donjon vient du portage de
+    dungeon.pl (maze.py) : portes, couloirs en labyrinthe et culs-de-sac en partie refermés ;
+    `max_rooms` et `corridor_ratio` ne s'appliquent alors pas (nombre de salles de dungeon.pl).
+    """
+    if corridor_layout is not None:
+        return generate_maze(width, height, seed, min_size, max_size, stairs, room_layout, corridor_layout)
+    dungeon = init_dungeon(width, height, seed)
+    rng = make_rng(dungeon["seed"])
+    emplace_rooms(dungeon, rng, max_rooms, min_size, max_size, room_layout)
+    corridors(dungeon, corridor_ratio)
+    if stairs:
+        emplace_stairs(dungeon, rng)
+    return dungeon
+
+
+def generate_maze(width=50, height=50, seed=None, min_size=3, max_size=8, stairs=True, room_layout="Scattered",
+                  corridor_layout="Bent"):
+    """Donjon de maze.create_dungeon au format de ce module, complété à `width` x `height` cases."""
+    import maze  # maze.py importe ce module
+
+    dungeon = init_dungeon(width, height, seed)
+    # dungeon.pl travaille sur une grille de côté impair : n_rows + 1 cases, bordure comprise
+    level = maze.to_level(maze.create_dungeon(
+        seed=dungeon["seed"], n_rows=height - 1, n_cols=width - 1, room_min=min_size, room_max=max_size,
+        room_layout=room_layout, corridor_layout=corridor_layout, add_stairs=2 if stairs else 0))
+    grid = dungeon["grid"]
+    for y, row in enumerate(level["grid"]):
+        grid[y][:len(row)] = row
+    # Les arbres de couloirs ne se rejoignent que par les portes : un arbre sans porte reste isolé
+    keep_largest_region(grid)
+    dungeon["rooms"] = [room for room in level["rooms"] if grid[room["y"]][room["x"]] != EMPTY]
+    dungeon["stairs"] = [stair for stair in level["stairs"] if grid[stair["y"]][stair["x"]] != EMPTY]
+    if stairs and len(dungeon["stairs"]) < 2:
+        # Pas assez de culs-de-sac pour les escaliers de dungeon.pl : au centre de deux salles
+        for stair in dungeon["stairs"]:
+            grid[stair["y"]][stair["x"]] = CORRIDOR
+        dungeon["stairs"] = []
+        emplace_stairs(dungeon, make_rng(dungeon["seed"]))
+    return dungeon
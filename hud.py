@@ -0,0 +1,40 @@
+"""Textes du HUD : police créée une seule fois, surfaces mises en cache.
+
+Chaque label est lié à ses valeurs : tant qu'elles ne changent pas, la surface
+déjà rendue est réutilisée. Les rendus sont aussi partagés via un cache
+(texte, couleur) pour les valeurs qui reviennent (PV, compteurs...).
+"""
+from collections import OrderedDict
+
+import pygame
+
+
+class Hud:
+    def __init__(self, font_size=24, max_cached_texts=256):
+        self.font = pygame.font.Font(None, font_size)
+        self.max_cached_texts = max_cached_texts
+        self._texts = OrderedDict()  # (texte, couleur) -> surface
+        self._labels = {}  # nom -> (valeurs, couleur, surface)
+        self.renders = 0
+
+    def render_text(self, text, color):
+        """Surface du texte, rendue seulement si (texte, couleur) n'est pas déjà en cache."""
+        key = (text, color)
+        surface = self._texts.get(key)
+        if surface is None:
+            surface = self._texts[key] = self.font.render(text, True, color)
+            self.renders += 1
+            if len(self._texts) > self.max_cached_texts:
+                self._texts.popitem(last=False)
+        else:
+            self._texts.move_to_end(key)
+        return surface
+
+    def label(self, name, template, *values, color=(255, 255, 255)):
+        """Surface du label `name` ; le texte n'est reformaté que si ses valeurs ont changé."""
+        cached = self._labels.get(name)
+        if cached is not None and cached[0] == values and cached[1] == color:
+            return cached[2]
+        surface = self.render_text(template.format(*values), color)
+        self._labels[name] = (values, color, surface)
+        return surface
@@ -0,0 +1,184 @@
+"""Cache des niveaux générés, en mémoire et sur disque.
+
+Un niveau est entièrement déterminé par sa clé (graine, largeur, hauteur,
+paramètres des salles, numéro de niveau) : la grille, les salles et les positions
+d'apparition des ennemis et des potions sont mémorisées sous cette clé, pour
+qu'un redémarrage ou un jeu de niveaux pré-générés se charge sans régénérer.
+
+Format sur disque : en-tête struct suivi de la grille (un octet par case), des
+salles et des apparitions en entiers 16 bits, le tout compressé par zlib.
+"""
+import os
+import struct
+import zlib
+from array import array
+from collections import OrderedDict, namedtuple
+
+# À incrémenter quand la génération ou le placement changent : les anciens fichiers sont ignorés
+FORMAT_VERSION = 2
+MAGIC = b"DLVL"
+
+# grid : bytes, ligne par ligne ; rooms : (x, y, w, h) ; enemies : (x, y, type) ; potions : (x, y, soin)
+LevelData = namedtuple("LevelData", ["width", "height", "grid", "rooms", "enemies", "potions"])
+
+# version, largeur, hauteur, nombre de salles, de types d'ennemis, d'ennemis, de potions
+_HEADER = struct.Struct("<HHHHHHH")
+
+
+def encode_level(level):
+    """Sérialise un LevelData dans le format binaire compact."""
+    types = sorted({enemy_type for _, _, enemy_type in level.enemies})
+    type_ids = {enemy_type: i for i, enemy_type in enumerate(types)}
+    parts = [
+        _HEADER.pack(FORMAT_VERSION, level.width, level.height, len(level.rooms), len(types),
+                     len(level.enemies), len(level.potions)),
+        bytes(level.grid),
+        array("H", [value for room in level.rooms for value in room]).tobytes(),
+    ]
+    for enemy_type in types:
+        name = enemy_type.encode("utf-8")
+        parts.append(bytes([len(name)]) + name)
+    parts.append(array("H", [value for x, y, enemy_type in level.enemies
+                             for value in (x, y, type_ids[enemy_type])]).tobytes())
+    parts.append(array("H", [value for potion in level.potions for value in potion]).tobytes())
+    return MAGIC + zlib.compress(b"".join(parts))
+
+
+def _read_shorts(data, offset, count):
+    values = array("H")
+    values.frombytes(data[offset:offset + count * 2])
+    return values, offset + count * 2
+
+
+def decode_level(data):
+    """Relit un niveau écrit par encode_level ; lève ValueError si les données sont invalides ou d'une autre version."""
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError("pas un niveau en cache")
+    try:
+        body = zlib.decompress(data[len(MAGIC):])
+        version, width, height, room_count, type_count, enemy_count, potion_count = _HEADER.unpack_from(body)
+    except (zlib.error, struct.error) as e:
+        raise ValueError(f"niveau en cache illisible : {e}") from e
+    if version != FORMAT_VERSION:
+        raise ValueError(f"version de niveau {version} au lieu de {FORMAT_VERSION}")
+
+    offset = _HEADER.size
+    grid = body[offset:offset + width * height]
+    offset += width * height
+    values, offset = _read_shorts(body, offset, room_count * 4)
+    rooms = tuple(tuple(values[i:i + 4]) for i in range(0, len(values), 4))
+    types = []
+    for _ in range(type_count):
+        length = body[offset]
+        types.append(body[offset + 1:offset + 1 + length].decode("utf-8"))
+        offset += 1 + length
+    values, offset = _read_shorts(body, offset, enemy_count * 3)
+    enemies = tuple((values[i], values[i + 1], types[values[i + 2]]) for i in range(0, len(values), 3))
+    values, offset = _read_shorts(body, offset, potion_count * 3)
+    potions = tuple(tuple(values[i:i + 3]) for i in range(0, len(values), 3))
+    if len(grid) != width * height or offset != len(body):
+        raise ValueError("niveau en cache tronqué")
+    return LevelData(width, height, grid, rooms, enemies, potions)
+
+
+class LevelCache:
+    def __init__(self, directory=None, max_entries=32, max_files=256):
+        self.directory = directory  # None : cache en mémoire seulement
+        self.max_entries = max_entries
+        self.max_files = max_files  # Au-delà, les fichiers les plus anciens sont supprimés
+        self._entries = OrderedDict()  # clé -> LevelData
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.errors = 0  # Fichiers illisibles ou écritures échouées
+        self.pruned = 0  # Fichiers supprimés pour rester sous max_files
+
+    def _path(self, key):
+        return os.path.join(self.directory, "_".join(str(part) for part in _flatten(key)) + ".lvl")
+
+    def get(self, key):
+        """Niveau mémorisé sous `key`, lu en mémoire puis sur disque ; None s'il faut le générer."""
+        level = self._entries.get(key)
+        if level is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return level
+
+        if self.directory is not None:
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    level = decode_level(f.read())
+                os.utime(path)  # Fichier relu : le dernier à supprimer par _prune
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError):
+                self.errors += 1
+            else:
+                self.disk_hits += 1
+                self._remember(key, level)
+                return level
+
+        self.misses += 1
+        return None
+
+    def put(self, key, level):
+        """Mémorise `level` sous `key`, et l'écrit sur disque si un dossier est configuré."""
+        self._remember(key, level)
+        if self.directory is None:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Écriture dans un fichier temporaire puis renommage : un lecteur ne voit jamais de fichier partiel
+            temporary = f"{path}.{os.getpid()}.tmp"
+            with open(temporary, "wb") as f:
+                f.write(encode_level(level))
+            os.replace(temporary, path)
+            self._prune()
+        except OSError:
+            self.errors += 1
+
+    def _prune(self):
+        """Supprime les fichiers de niveau les plus anciens au-delà de `max_files`."""
+        paths = [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith(".lvl")]
+        if len(paths) <= self.max_files:
+            return
+        paths.sort(key=os.path.getmtime)
+        for path in paths[:len(paths) - self.max_files]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # Déjà supprimé par un autre processus
+            self.pruned += 1
+
+    def _remember(self, key, level):
+        self._entries[key] = level
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Vide le cache en mémoire (les fichiers restent sur disque)."""
+        self._entries.clear()
+
+    def stats(self):
+        """Compteurs du cache (réussites en mémoire et sur disque, échecs, erreurs)."""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "pruned": self.pruned,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
+
+
+def _flatten(key):
+    for part in key:
+        if isinstance(part, tuple):
+            yield from _flatten(part)
+        else:
+            yield part
@@ -0,0 +1,59 @@
+"""Préparation du niveau suivant dans un thread de fond.
+
+Pendant qu'un niveau est joué, le suivant (donjon, apparitions, mini-carte...) est
+construit par un thread. À la transition, le jeu le récupère s'il est prêt ;
+sinon il le construit lui-même, sans attendre le thread.
+"""
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+class LevelPrefetcher:
+    def __init__(self, build):
+        self.build = build  # build(key, *args) : construit le niveau de clé `key`, sans effet sur le jeu
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="level-prefetch")
+        self._key = None
+        self._future = None
+        self.ready = 0  # Niveaux pris prêts à la transition
+        self.not_ready = 0  # Transitions arrivées avant la fin de la préparation
+        self.failed = 0  # Préparations terminées par une exception
+
+    def request(self, key, *args):
+        """Lance la préparation du niveau `key` (remplace une demande précédente pour un autre niveau)."""
+        if key == self._key:
+            return
+        if self._future is not None:
+            self._future.cancel()
+        self._key = key
+        self._future = self._executor.submit(self.build, key, *args)
+
+    def take(self, key):
+        """Niveau préparé pour `key` s'il est terminé, sinon None (l'appelant le construit lui-même)."""
+        if key != self._key:
+            return None
+        future = self._future
+        self._key = self._future = None
+        if not future.done():
+            self.not_ready += 1
+            future.cancel()
+            return None
+        try:
+            prepared = future.result()
+        except Exception:
+            self.failed += 1
+            return None
+        self.ready += 1
+        return prepared
+
+    def wait(self, timeout=None):
+        """Attend la fin de la préparation en cours ; retourne False si elle n'est pas finie après `timeout` secondes."""
+        if self._future is None:
+            return True
+        return not wait([self._future], timeout).not_done
+
+    def shutdown(self):
+        self._key = self._future = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        """Compteurs des transitions (niveau prêt, pas prêt, préparation en échec)."""
+        return {"ready": self.ready, "not_ready": self.not_ready, "failed": self.failed}
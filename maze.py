@@ -0,0 +1,620 @@
+"""Portage en Python du générateur de dungeon.pl (salles, portes, couloirs en labyrinthe).
+
+Comme dans le script Perl, le donjon est une grille de cases à champs de bits
+(BLOCKED, ROOM, CORRIDOR, PERIMETER, ENTRANCE, identifiant de salle, portes,
+escaliers, étiquette), rangée ici dans un array('I') à plat : la case (r, c) est
+cells[r * stride + c]. Les salles et les couloirs sont alignés sur les cases
+impaires ; le creusement des couloirs et l'effondrement des culs-de-sac, récursifs
+dans dungeon.pl, sont itératifs, si bien qu'une carte 1001x1001 ne bute pas sur la
+limite de récursion.
+
+create_dungeon renvoie le donjon au format du script Perl ; to_level le convertit
+au format de generation.py (codes de cases EMPTY, ROOM...) pour les deux jeux.
+`python maze.py` affiche un donjon en JSON, comme dungeon.pl.
+"""
+import itertools
+import json
+import math
+from array import array
+
+from generation import CORRIDOR as CORRIDOR_TILE
+from generation import EMPTY, ROOM as ROOM_TILE, STAIRS_DOWN, STAIRS_UP, OccupancyGrid, make_rng, new_seed
+
+# Bits des cases, comme dans dungeon.pl
+NOTHING = 0x00000000
+
+BLOCKED = 0x00000001
+ROOM = 0x00000002
+CORRIDOR = 0x00000004
+PERIMETER = 0x00000010
+ENTRANCE = 0x00000020
+ROOM_ID = 0x0000FFC0
+
+ARCH = 0x00010000
+DOOR = 0x00020000
+LOCKED = 0x00040000
+TRAPPED = 0x00080000
+SECRET = 0x00100000
+PORTC = 0x00200000
+STAIR_DN = 0x00400000
+STAIR_UP = 0x00800000
+
+LABEL = 0xFF000000
+
+OPENSPACE = ROOM | CORRIDOR
+DOORSPACE = ARCH | DOOR | LOCKED | TRAPPED | SECRET | PORTC
+ESPACE = ENTRANCE | DOORSPACE | 0xFF000000
+STAIRS = STAIR_DN | STAIR_UP
+
+BLOCK_ROOM = BLOCKED | ROOM
+BLOCK_CORR = BLOCKED | PERIMETER | CORRIDOR
+BLOCK_DOOR = BLOCKED | DOORSPACE
+
+MAX_ROOMS = 999  # ROOM_ID tient sur 10 bits
+
+DUNGEON_LAYOUT = {
+    "Box": ((1, 1, 1), (1, 0, 1), (1, 1, 1)),
+    "Cross": ((0, 1, 0), (1, 1, 1), (0, 1, 0)),
+}
+# Probabilité (en %) qu'un couloir continue tout droit
+CORRIDOR_LAYOUT = {"Labyrinth": 0, "Bent": 50, "Straight": 100}
+
+DI = {"north": -1, "south": 1, "west": 0, "east": 0}
+DJ = {"north": 0, "south": 0, "west": -1, "east": 1}
+DIRECTIONS = sorted(DJ)
+DIRECTION_ORDERS = tuple(itertools.permutations(DIRECTIONS))  # Tirer l'une d'elles vaut un mélange
+OPPOSITE = {"north": "south", "south": "north", "west": "east", "east": "west"}
+
+# Culs-de-sac où placer un escalier : cases murées autour, couloir sur trois cases
+STAIR_END = {
+    "north": {"walled": ((1, -1), (0, -1), (-1, -1), (-1, 0), (-1, 1), (0, 1), (1, 1)),
+              "corridor": ((0, 0), (1, 0), (2, 0)), "next": (1, 0)},
+    "south": {"walled": ((-1, -1), (0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1)),
+              "corridor": ((0, 0), (-1, 0), (-2, 0)), "next": (-1, 0)},
+    "west": {"walled": ((-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1), (1, 0), (1, 1)),
+             "corridor": ((0, 0), (0, 1), (0, 2)), "next": (0, 1)},
+    "east": {"walled": ((-1, -1), (-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1)),
+             "corridor": ((0, 0), (0, -1), (0, -2)), "next": (0, -1)},
+}
+# Culs-de-sac à refermer : la case est fermée puis on continue vers `recurse`
+CLOSE_END = {
+    "north": {"walled": ((0, -1), (1, -1), (1, 0), (1, 1), (0, 1)), "close": ((0, 0),), "recurse": (-1, 0)},
+    "south": {"walled": ((0, -1), (-1, -1), (-1, 0), (-1, 1), (0, 1)), "close": ((0, 0),), "recurse": (1, 0)},
+    "west": {"walled": ((-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0)), "close": ((0, 0),), "recurse": (0, -1)},
+    "east": {"walled": ((-1, 0), (-1, -1), (0, -1), (1, -1), (1, 0)), "close": ((0, 0),), "recurse": (0, 1)},
+}
+
+# (seuil sur 110, bit, caractère de l'étiquette, clé, nom), tirés comme door_type
+DOOR_TYPES = (
+    (15, ARCH, None, "arch", "Archway"),
+    (60, DOOR, "o", "open", "Unlocked Door"),
+    (75, LOCKED, "x", "lock", "Locked Door"),
+    (90, TRAPPED, "t", "trap", "Trapped Door"),
+    (100, SECRET, "s", "secret", "Secret Door"),
+    (110, PORTC, "#", "portc", "Portcullis"),
+)
+
+
+def get_opts(**options):
+    """Options par défaut de dungeon.pl, surchargées par `options`."""
+    opts = {
+        "seed": None,  # None : tirée du module random global
+        "n_rows": 39,  # nombre impair
+        "n_cols": 39,  # nombre impair
+        "dungeon_layout": "None",  # Box, Cross, Round
+        "room_min": 3,  # taille minimale d'une salle
+        "room_max": 9,  # taille maximale d'une salle
+        "room_layout": "Scattered",  # Packed, Scattered
+        "corridor_layout": "Bent",  # Labyrinth, Bent, Straight
+        "remove_deadends": 50,  # pourcentage
+        "add_stairs": 2,  # nombre d'escaliers
+    }
+    unknown = set(options) - set(opts)
+    if unknown:
+        raise ValueError(f"options inconnues : {', '.join(sorted(unknown))}")
+    opts.update(options)
+    return opts
+
+
+def create_dungeon(**options):
+    """Génère un donjon comme create_dungeon de dungeon.pl ; la même graine donne le même donjon."""
+    dungeon = get_opts(**options)
+    if dungeon["seed"] is None:
+        dungeon["seed"] = new_seed()
+    dungeon["n_i"] = dungeon["n_rows"] // 2
+    dungeon["n_j"] = dungeon["n_cols"] // 2
+    dungeon["n_rows"] = dungeon["n_i"] * 2
+    dungeon["n_cols"] = dungeon["n_j"] * 2
+    dungeon["max_row"] = dungeon["n_rows"] - 1
+    dungeon["max_col"] = dungeon["n_cols"] - 1
+    dungeon["n_rooms"] = 0
+    dungeon["room"] = [None]  # Les identifiants de salle commencent à 1
+    dungeon["door"] = []
+    dungeon["stair"] = []
+
+    room_max, room_min = dungeon["room_max"], dungeon["room_min"]
+    dungeon["room_base"] = (room_min + 1) // 2
+    dungeon["room_radix"] = (room_max - room_min) // 2 + 1
+
+    rng = make_rng(dungeon["seed"])
+    init_cells(dungeon)
+    emplace_rooms(dungeon, rng)
+    open_rooms(dungeon, rng)
+    label_rooms(dungeon)
+    corridors(dungeon, rng)
+    if dungeon["add_stairs"]:
+        emplace_stairs(dungeon, rng)
+    clean_dungeon(dungeon, rng)
+    del dungeon["index"]
+    return dungeon
+
+
+def init_cells(dungeon):
+    """Grille vide (n_rows + 1 lignes de n_cols + 1 cases), bloquée hors du masque de `dungeon_layout`."""
+    stride = dungeon["stride"] = dungeon["n_cols"] + 1
+    rows = dungeon["n_rows"] + 1
+    cells = dungeon["cell"] = array("I", bytes(4 * rows * stride))
+    # Cases occupées par une salle ou bloquées, pour tester un emplacement de salle en une opération par ligne
+    dungeon["index"] = OccupancyGrid(stride, rows)
+
+    layout = dungeon["dungeon_layout"]
+    if layout in DUNGEON_LAYOUT:
+        mask = DUNGEON_LAYOUT[layout]
+        r_x = len(mask) / rows
+        c_x = len(mask[0]) / stride
+        blocked = lambda r, c: not mask[int(r * r_x)][int(c * c_x)]  # noqa: E731
+    elif layout == "Round":
+        center_r, center_c = dungeon["n_rows"] // 2, dungeon["n_cols"] // 2
+        blocked = lambda r, c: math.sqrt((r - center_r) ** 2 + (c - center_c) ** 2) > center_c  # noqa: E731
+    else:
+        return
+    for r in range(rows):
+        for c in range(stride):
+            if blocked(r, c):
+                cells[r * stride + c] = BLOCKED
+                dungeon["index"].occupy(c, r, 1, 1)
+
+
+def emplace_rooms(dungeon, rng):
+    if dungeon["room_layout"] == "Packed":
+        pack_rooms(dungeon, rng)
+    else:
+        scatter_rooms(dungeon, rng)
+
+
+def pack_rooms(dungeon, rng):
+    cells, stride = dungeon["cell"], dungeon["stride"]
+    for i in range(dungeon["n_i"]):
+        r = i * 2 + 1
+        for j in range(dungeon["n_j"]):
+            c = j * 2 + 1
+            if cells[r * stride + c] & ROOM:
+                continue
+            if (i == 0 or j == 0) and rng.randrange(2):
+                continue
+            emplace_room(dungeon, rng, {"i": i, "j": j})
+
+
+def scatter_rooms(dungeon, rng):
+    for _ in range(alloc_rooms(dungeon)):
+        emplace_room(dungeon, rng)
+
+
+def alloc_rooms(dungeon):
+    """Nombre de salles à tenter : surface du donjon divisée par celle de la plus grande salle."""
+    return (dungeon["n_cols"] * dungeon["n_rows"]) // (dungeon["room_max"] * dungeon["room_max"])
+
+
+def emplace_room(dungeon, rng, proto=None):
+    if dungeon["n_rooms"] == MAX_ROOMS:
+        return
+    proto = set_room(dungeon, rng, proto or {})
+
+    r1 = proto["i"] * 2 + 1
+    c1 = proto["j"] * 2 + 1
+    r2 = (proto["i"] + proto["height"]) * 2 - 1
+    c2 = (proto["j"] + proto["width"]) * 2 - 1
+    if r1 < 1 or r2 > dungeon["max_row"] or c1 < 1 or c2 > dungeon["max_col"]:
+        return
+    # sound_room : la moindre case bloquée ou déjà dans une salle fait renoncer
+    index = dungeon["index"]
+    if not index.is_free(c1, r1, c2 - c1 + 1, r2 - r1 + 1):
+        return
+    index.occupy(c1, r1, c2 - c1 + 1, r2 - r1 + 1)
+
+    room_id = dungeon["n_rooms"] = dungeon["n_rooms"] + 1
+    dungeon["last_room_id"] = room_id
+    cells, stride = dungeon["cell"], dungeon["stride"]
+    room_bits = ROOM | (room_id << 6)
+    for r in range(r1, r2 + 1):
+        for p in range(r * stride + c1, r * stride + c2 + 1):
+            cell = cells[p]
+            if cell & ENTRANCE:
+                cell &= ~ESPACE
+            elif cell & PERIMETER:
+                cell &= ~PERIMETER
+            cells[p] = cell | room_bits
+
+    height = (r2 - r1 + 1) * 10
+    width = (c2 - c1 + 1) * 10
+    dungeon["room"].append({
+        "id": room_id, "row": r1, "col": c1,
+        "north": r1, "south": r2, "west": c1, "east": c2,
+        "height": height, "width": width, "area": height * width, "door": {},
+    })
+
+    # Bordure de la salle, que les couloirs ne traversent pas
+    for r in range(r1 - 1, r2 + 2):
+        for p in (r * stride + c1 - 1, r * stride + c2 + 1):
+            if not cells[p] & (ROOM | ENTRANCE):
+                cells[p] |= PERIMETER
+    for c in range(c1 - 1, c2 + 2):
+        for p in ((r1 - 1) * stride + c, (r2 + 1) * stride + c):
+            if not cells[p] & (ROOM | ENTRANCE):
+                cells[p] |= PERIMETER
+
+
+def set_room(dungeon, rng, proto):
+    """Complète la position (i, j) et la taille d'un prototype de salle, en demi-cases."""
+    base, radix = dungeon["room_base"], dungeon["room_radix"]
+    for size, position, extent in (("height", "i", dungeon["n_i"]), ("width", "j", dungeon["n_j"])):
+        if size not in proto:
+            if position in proto:
+                r = min(max(extent - base - proto[position], 0), radix)
+                proto[size] = (rng.randrange(r) if r else 0) + base
+            else:
+                proto[size] = rng.randrange(radix) + base
+    for size, position, extent in (("height", "i", dungeon["n_i"]), ("width", "j", dungeon["n_j"])):
+        if position not in proto:
+            proto[position] = rng.randrange(max(extent - proto[size], 1))
+    return proto
+
+
+def open_rooms(dungeon, rng):
+    connect = set()
+    for room in dungeon["room"][1:]:
+        open_room(dungeon, rng, room, connect)
+
+
+def open_room(dungeon, rng, room, connect):
+    """Perce des portes dans la bordure de la salle, au plus une par salle voisine."""
+    sills = door_sills(dungeon, rng, room)
+    if not sills:
+        return
+    n_opens = alloc_opens(rng, room)
+    cells, stride = dungeon["cell"], dungeon["stride"]
+
+    opened = 0
+    while opened < n_opens and sills:
+        sill = sills.pop(rng.randrange(len(sills)))
+        door_r, door_c = sill["door_r"], sill["door_c"]
+        door_p = door_r * stride + door_c
+        if cells[door_p] & DOORSPACE:
+            continue
+        out_id = sill["out_id"]
+        if out_id:
+            pair = (min(room["id"], out_id), max(room["id"], out_id))
+            if pair in connect:
+                continue
+            connect.add(pair)
+        opened += 1
+
+        direction = sill["dir"]
+        for x in range(3):
+            p = (sill["sill_r"] + DI[direction] * x) * stride + sill["sill_c"] + DJ[direction] * x
+            cells[p] = (cells[p] & ~PERIMETER) | ENTRANCE
+
+        door_bit, char, key, name = door_type(rng)
+        cells[door_p] |= door_bit
+        if char:
+            cells[door_p] |= ord(char) << 24
+        door = {"row": door_r, "col": door_c, "key": key, "type": name}
+        if out_id:
+            door["out_id"] = out_id
+        room["door"].setdefault(direction, []).append(door)
+
+
+def alloc_opens(rng, room):
+    room_h = (room["south"] - room["north"]) // 2 + 1
+    room_w = (room["east"] - room["west"]) // 2 + 1
+    flumph = int(math.sqrt(room_w * room_h))
+    return flumph + rng.randrange(flumph)
+
+
+def door_sills(dungeon, rng, room):
+    """Emplacements de porte possibles sur les quatre côtés de la salle, mélangés."""
+    cells, stride = dungeon["cell"], dungeon["stride"]
+    sills = []
+    if room["north"] >= 3:
+        sills += (check_sill(cells, stride, room, room["north"], c, "north")
+                  for c in range(room["west"], room["east"] + 1, 2))
+    if room["south"] <= dungeon["n_rows"] - 3:
+        sills += (check_sill(cells, stride, room, room["south"], c, "south")
+                  for c in range(room["west"], room["east"] + 1, 2))
+    if room["west"] >= 3:
+        sills += (check_sill(cells, stride, room, r, room["west"], "west")
+                  for r in range(room["north"], room["south"] + 1, 2))
+    if room["east"] <= dungeon["n_cols"] - 3:
+        sills += (check_sill(cells, stride, room, r, room["east"], "east")
+                  for r in range(room["north"], room["south"] + 1, 2))
+    sills = [sill for sill in sills if sill]
+    rng.shuffle(sills)
+    return sills
+
+
+def check_sill(cells, stride, room, sill_r, sill_c, direction):
+    door_r = sill_r + DI[direction]
+    door_c = sill_c + DJ[direction]
+    door_cell = cells[door_r * stride + door_c]
+    if not door_cell & PERIMETER or door_cell & BLOCK_DOOR:
+        return None
+    out_cell = cells[(door_r + DI[direction]) * stride + door_c + DJ[direction]]
+    if out_cell & BLOCKED:
+        return None
+
+    out_id = None
+    if out_cell & ROOM:
+        out_id = (out_cell & ROOM_ID) >> 6
+        if out_id == room["id"]:
+            return None
+    return {"sill_r": sill_r, "sill_c": sill_c, "dir": direction,
+            "door_r": door_r, "door_c": door_c, "out_id": out_id}
+
+
+def door_type(rng):
+    roll = rng.randrange(110)
+    for threshold, bit, char, key, name in DOOR_TYPES:
+        if roll < threshold:
+            return bit, char, key, name
+
+
+def label_rooms(dungeon):
+    """Inscrit le numéro de chaque salle dans les bits LABEL des cases de son centre."""
+    cells, stride = dungeon["cell"], dungeon["stride"]
+    for room in dungeon["room"][1:]:
+        label = str(room["id"])
+        label_r = (room["north"] + room["south"]) // 2
+        label_c = (room["west"] + room["east"] - len(label)) // 2 + 1
+        for offset, char in enumerate(label):
+            cells[label_r * stride + label_c + offset] |= ord(char) << 24
+
+
+def corridors(dungeon, rng):
+    cells, stride = dungeon["cell"], dungeon["stride"]
+    for i in range(1, dungeon["n_i"]):
+        r = i * 2 + 1
+        for j in range(1, dungeon["n_j"]):
+            c = j * 2 + 1
+            if cells[r * stride + c] & CORRIDOR:
+                continue
+            tunnel(dungeon, rng, i, j)
+
+
+def tunnel(dungeon, rng, i, j, last_dir=None):
+    """Creuse un labyrinthe depuis la case (i, j), en profondeur d'abord.
+
+    Même parcours que la récursion de dungeon.pl, avec une pile explicite : chaque
+    entrée garde les directions restant à essayer depuis sa case.
+    """
+    cells, stride = dungeon["cell"], dungeon["stride"]
+    n_i, n_j = dungeon["n_i"], dungeon["n_j"]
+    straight = CORRIDOR_LAYOUT.get(dungeon["corridor_layout"], 0)
+    # Pas d'une case dans chaque direction, en indice de cells
+    steps = {direction: DI[direction] * stride + DJ[direction] for direction in DIRECTIONS}
+
+    stack = [(i, j, iter(tunnel_dirs(rng, straight, last_dir)))]
+    while stack:
+        i, j, directions = stack[-1]
+        for direction in directions:
+            next_i, next_j = i + DI[direction], j + DJ[direction]
+            if not (0 <= next_i < n_i and 0 <= next_j < n_j):
+                continue
+            if open_tunnel(cells, (i * 2 + 1) * stride + j * 2 + 1, steps[direction]):
+                stack.append((next_i, next_j, iter(tunnel_dirs(rng, straight, direction))))
+                break
+        else:
+            stack.pop()
+
+
+def tunnel_dirs(rng, straight, last_dir):
+    """Directions mélangées, précédées de `last_dir` avec la probabilité `straight` (en %)."""
+    directions = list(DIRECTION_ORDERS[rng.randrange(len(DIRECTION_ORDERS))])
+    if last_dir and straight and rng.randrange(100) < straight:
+        directions.insert(0, last_dir)
+    return directions
+
+
+def open_tunnel(cells, this, step):
+    """Prolonge le couloir de la case `this` de deux cases de pas `step`, si sound_tunnel l'accepte.
+
+    sound_tunnel : ni case bloquée, ni bordure de salle, ni autre couloir sur la case
+    du milieu et la suivante ; delve_tunnel : les trois cases deviennent du couloir.
+    """
+    middle = this + step
+    following = middle + step
+    if (cells[middle] | cells[following]) & BLOCK_CORR:
+        return False
+    for p in (this, middle, following):
+        cells[p] = (cells[p] & ~ENTRANCE) | CORRIDOR
+    return True
+
+
+def emplace_stairs(dungeon, rng):
+    n = dungeon["add_stairs"]
+    if n <= 0:
+        return
+    ends = stair_ends(dungeon)
+    cells, stride = dungeon["cell"], dungeon["stride"]
+    for i in range(n):
+        if not ends:
+            break
+        stair = ends.pop(rng.randrange(len(ends)))
+        p = stair["row"] * stride + stair["col"]
+        down = (i if i < 2 else rng.randrange(2)) == 0
+        if down:
+            cells[p] |= STAIR_DN | (ord("d") << 24)
+            stair["key"] = "down"
+        else:
+            cells[p] |= STAIR_UP | (ord("u") << 24)
+            stair["key"] = "up"
+        dungeon["stair"].append(stair)
+
+
+def stair_ends(dungeon):
+    """Culs-de-sac de couloir où un escalier peut se placer."""
+    cells, stride = dungeon["cell"], dungeon["stride"]
+    checks = tunnel_checks(STAIR_END, stride)
+    ends = []
+    for i in range(dungeon["n_i"]):
+        r = i * 2 + 1
+        for j in range(dungeon["n_j"]):
+            c = j * 2 + 1
+            if cells[r * stride + c] != CORRIDOR:
+                continue
+            for corridor, walled, end in checks:
+                if check_tunnel(cells, r * stride + c, corridor, walled):
+                    ends.append({"row": r, "col": c,
+                                 "next_row": r + end["next"][0], "next_col": c + end["next"][1]})
+                    break
+    return ends
+
+
+def clean_dungeon(dungeon, rng):
+    if dungeon["remove_deadends"]:
+        remove_deadends(dungeon, rng)
+    fix_doors(dungeon)
+    empty_blocks(dungeon)
+
+
+def remove_deadends(dungeon, rng):
+    collapse_tunnels(dungeon, rng, dungeon["remove_deadends"], CLOSE_END)
+
+
+def collapse_tunnels(dungeon, rng, p, xc):
+    """Referme chaque cul-de-sac avec la probabilité `p` (en %), 100 les refermant tous."""
+    if not p:
+        return
+    every = p == 100
+    cells, stride = dungeon["cell"], dungeon["stride"]
+    checks = [(corridor, walled, tuple(dr * stride + dc for dr, dc in end["close"]),
+               end["open"][0] * stride + end["open"][1] if "open" in end else None,
+               end["recurse"][0] * stride + end["recurse"][1])
+              for corridor, walled, end in tunnel_checks(xc, stride)]
+    for i in range(dungeon["n_i"]):
+        r = i * 2 + 1
+        for j in range(dungeon["n_j"]):
+            c = j * 2 + 1
+            cell = cells[r * stride + c]
+            if not cell & OPENSPACE or cell & STAIRS:
+                continue
+            if every or rng.randrange(100) < p:
+                collapse(cells, r * stride + c, checks)
+
+
+def collapse(cells, p, checks):
+    """Referme le cul-de-sac en `p` et remonte le couloir tant qu'il se termine en cul-de-sac.
+
+    `checks` : (corridor, walled, close, open, recurse) en décalages d'indice. Dans
+    dungeon.pl, collapse se rappelle sur la case suivante ; une fois la case fermée,
+    aucune autre direction ne peut plus mener à une case ouverte, d'où une simple boucle.
+    """
+    while cells[p] & OPENSPACE:
+        for corridor, walled, close, opening, recurse in checks:
+            if check_tunnel(cells, p, corridor, walled):
+                for offset in close:
+                    cells[p + offset] = NOTHING
+                if opening is not None:
+                    cells[p + opening] |= CORRIDOR
+                p += recurse
+                break
+        else:
+            return
+
+
+def tunnel_checks(ends, stride):
+    """Motifs de STAIR_END ou CLOSE_END en décalages d'indice de cells : (corridor, walled, motif)."""
+    return [(tuple(dr * stride + dc for dr, dc in end.get("corridor", ())),
+             tuple(dr * stride + dc for dr, dc in end.get("walled", ())), end)
+            for end in ends.values()]
+
+
+def check_tunnel(cells, p, corridor, walled):
+    for offset in corridor:
+        if cells[p + offset] != CORRIDOR:
+            return False
+    for offset in walled:
+        if cells[p + offset] & OPENSPACE:
+            return False
+    return True
+
+
+def fix_doors(dungeon):
+    """Retire des salles les portes refermées avec les culs-de-sac et recopie les autres chez la salle voisine."""
+    cells, stride = dungeon["cell"], dungeon["stride"]
+    fixed = set()
+    for room in dungeon["room"][1:]:
+        for direction in sorted(room["door"]):
+            shiny = []
+            for door in room["door"][direction]:
+                p = door["row"] * stride + door["col"]
+                if not cells[p] & OPENSPACE:
+                    continue
+                if p not in fixed:
+                    out_id = door.get("out_id")
+                    if out_id:
+                        out_doors = dungeon["room"][out_id]["door"]
+                        out_doors.setdefault(OPPOSITE[direction], []).append(door)
+                    fixed.add(p)
+                shiny.append(door)
+            if shiny:
+                room["door"][direction] = shiny
+                dungeon["door"] += shiny
+            else:
+                del room["door"][direction]
+
+
+def empty_blocks(dungeon):
+    cells = dungeon["cell"]
+    for p, cell in enumerate(cells):
+        if cell & BLOCKED:
+            cells[p] = NOTHING
+
+
+def to_level(dungeon):
+    """Donjon au format de generation.py : grille de codes, salles (x, y, w, h) et escaliers."""
+    cells, stride = dungeon["cell"], dungeon["stride"]
+    width, height = stride, dungeon["n_rows"] + 1
+    grid = []
+    for r in range(height):
+        row = []
+        for cell in cells[r * stride:(r + 1) * stride]:
+            if cell & STAIR_UP:
+                row.append(STAIRS_UP)
+            elif cell & STAIR_DN:
+                row.append(STAIRS_DOWN)
+            elif cell & ROOM:
+                row.append(ROOM_TILE)
+            elif cell & (CORRIDOR | DOORSPACE):
+                row.append(CORRIDOR_TILE)
+            else:
+                row.append(EMPTY)
+        grid.append(row)
+    rooms = [{"x": room["west"], "y": room["north"],
+              "w": room["east"] - room["west"] + 1, "h": room["south"] - room["north"] + 1}
+             for room in dungeon["room"][1:]]
+    stairs = [{"type": stair["key"], "x": stair["col"], "y": stair["row"]} for stair in dungeon["stair"]]
+    return {"width": width, "height": height, "grid": grid, "rooms": rooms, "connections": [],
+            "stairs": stairs, "seed": dungeon["seed"]}
+
+
+def to_json(dungeon):
+    """JSON du donjon tel que l'affiche dungeon.pl (grille en listes de lignes, sans séparateurs superflus)."""
+    stride = dungeon["stride"]
+    cells = dungeon["cell"]
+    data = {key: value for key, value in dungeon.items() if key not in ("cell", "stride")}
+    data["cell"] = [cells[r * stride:(r + 1) * stride].tolist() for r in range(dungeon["n_rows"] + 1)]
+    return json.dumps(data, separators=(",", ":"))
+
+
+if __name__ == "__main__":
+    print(to_json(create_dungeon()))
@@ -0,0 +1,331 @@
+"""Services de pathfinding partagés entre les ennemis.
+
+FlowField : une seule recherche en largeur depuis la case du joueur donne, pour
+chaque case praticable, la distance au joueur et la case voisine qui s'en
+rapproche. Chaque ennemi lit ensuite son prochain pas en O(1).
+
+RoomGraph : graphe abstrait des salles et des couloirs, calculé une fois par
+niveau, pour des chemins hiérarchiques sur les grandes cartes. Prototype : seul
+benchmarks.py s'en sert, les cartes du jeu (20x20) sont trop petites pour qu'il
+y gagne et les ennemis suivent le champ de flux.
+
+PathCache : cache LRU des chemins déjà calculés, avec réutilisation de leurs
+suffixes quand l'appelant a avancé le long d'un chemin. Il sert les marcheurs qui
+ont chacun leur cible (le bot de balance_sim.py) ; les ennemis, qui visent tous
+la case du joueur, lisent le champ de flux et ne lui demandent rien.
+"""
+from collections import OrderedDict, deque
+from heapq import heappop, heappush
+
+# Même ordre de voisins que find_path
+NEIGHBOR_OFFSETS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+
+
+class FlowField:
+    def __init__(self, dungeon):
+        self.dungeon = dungeon
+        self.goal = None
+        self.distances = [-1] * len(dungeon.walkable)
+        self.next_cells = [-1] * len(dungeon.walkable)
+        self.updates = 0
+
+    def update(self, goal):
+        """Recalcule le champ vers la case `goal` ; ne fait rien si la cible n'a pas changé de case."""
+        if goal == self.goal:
+            return False
+        self.goal = goal
+        self.updates += 1
+
+        dungeon = self.dungeon
+        distances = self.distances = [-1] * len(dungeon.walkable)
+        next_cells = self.next_cells = [-1] * len(dungeon.walkable)
+
+        goal_x, goal_y = goal
+        if not (0 <= goal_x < dungeon.width and 0 <= goal_y < dungeon.height):
+            return True
+        start = dungeon.cell_index(goal_x, goal_y)
+        if not dungeon.walkable[start]:
+            return True
+
+        # BFS sur la table des voisins précalculée par Dungeon.freeze
+        neighbors = dungeon.neighbors
+        distances[start] = 0
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            next_distance = distances[current] + 1
+            for neighbor in neighbors[current]:
+                if distances[neighbor] < 0:
+                    distances[neighbor] = next_distance
+                    next_cells[neighbor] = current
+                    queue.append(neighbor)
+        return True
+
+    def _cell_distance(self, x, y):
+        if not (0 <= x < self.dungeon.width and 0 <= y < self.dungeon.height):
+            return -1
+        return self.distances[self.dungeon.cell_index(x, y)]
+
+    def _best_neighbor(self, x, y):
+        best, best_distance = None, -1
+        for dx, dy in NEIGHBOR_OFFSETS:
+            distance = self._cell_distance(x + dx, y + dy)
+            if distance >= 0 and (best is None or distance < best_distance):
+                best, best_distance = (x + dx, y + dy), distance
+        return best
+
+    def distance(self, cell):
+        """Nombre de pas entre `cell` et la cible, -1 si elle est inaccessible.
+
+        Une case hors du champ (par exemple un ennemi qui déborde dans un mur) passe
+        par sa meilleure voisine, comme le faisait la recherche A*.
+        """
+        x, y = cell
+        distance = self._cell_distance(x, y)
+        if distance >= 0:
+            return distance
+        best = self._best_neighbor(x, y)
+        return -1 if best is None else self._cell_distance(*best) + 1
+
+    def next_step(self, cell):
+        """Case voisine de `cell` qui rapproche de la cible, ou None (cible atteinte ou inaccessible)."""
+        x, y = cell
+        distance = self._cell_distance(x, y)
+        if distance == 0:
+            return None
+        if distance < 0:
+            return self._best_neighbor(x, y)
+        return self.dungeon.index_cell(self.next_cells[self.dungeon.cell_index(x, y)])
+
+
+# Côté (en cases) des blocs qui découpent les couloirs en régions du graphe abstrait
+CLUSTER_SIZE = 8
+
+
+class RoomGraph:
+    """Graphe abstrait des salles et des couloirs, pour une recherche hiérarchique (HPA*).
+
+    Chaque salle de Dungeon.rooms forme une région ; les cases de couloir sont
+    découpées en blocs de CLUSTER_SIZE cases de côté, puis en composantes connexes
+    dans chaque bloc. Deux régions sont reliées quand elles ont des cases voisines.
+    find_path cherche d'abord la suite de régions, puis un A* limité à ces régions.
+    """
+
+    def __init__(self, dungeon):
+        self.dungeon = dungeon
+        walkable, stride, neighbors = dungeon.walkable, dungeon.stride, dungeon.neighbors
+        region_of = [-1] * len(walkable)
+        cells = []  # région -> index de ses cases
+
+        for room in dungeon.rooms:
+            region = len(cells)
+            members = []
+            for y in range(room["y"], room["y"] + room["h"]):
+                for x in range(room["x"], room["x"] + room["w"]):
+                    index = dungeon.cell_index(x, y)
+                    if walkable[index] and region_of[index] < 0:
+                        region_of[index] = region
+                        members.append(index)
+            cells.append(members)
+
+        for y in range(dungeon.height):
+            for x in range(dungeon.width):
+                index = dungeon.cell_index(x, y)
+                if not walkable[index] or region_of[index] >= 0:
+                    continue
+                # Composante connexe du couloir, sans sortir du bloc de la case de départ
+                cluster = (x // CLUSTER_SIZE, y // CLUSTER_SIZE)
+                region = len(cells)
+                region_of[index] = region
+                members = [index]
+                queue = deque(members)
+                while queue:
+                    current = queue.popleft()
+                    for neighbor in neighbors[current]:
+                        if region_of[neighbor] >= 0:
+                            continue
+                        ny, nx = divmod(neighbor, stride)
+                        if ((nx - 1) // CLUSTER_SIZE, (ny - 1) // CLUSTER_SIZE) == cluster:
+                            region_of[neighbor] = region
+                            members.append(neighbor)
+                            queue.append(neighbor)
+                cells.append(members)
+
+        # Centre de chaque région et coût des arêtes : distance de Manhattan entre centres
+        centers = []
+        for members in cells:
+            xs, ys = zip(*(dungeon.index_cell(index) for index in members)) if members else ((0,), (0,))
+            centers.append((sum(xs) / len(xs), sum(ys) / len(ys)))
+        edges = [dict() for _ in cells]
+        for region, members in enumerate(cells):
+            for index in members:
+                for neighbor in neighbors[index]:
+                    other = region_of[neighbor]
+                    if other != region and other not in edges[region]:
+                        (ax, ay), (bx, by) = centers[region], centers[other]
+                        edges[region][other] = abs(ax - bx) + abs(ay - by)
+
+        self.region_of = region_of
+        self.cells = cells
+        self.centers = centers
+        self.edges = edges
+        self.expansions = 0  # Cases développées par le dernier find_path (recherche abstraite exclue)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def region_path(self, start_region, goal_region):
+        """Suite des régions de `start_region` à `goal_region` (A* sur le graphe abstrait), [] si aucune."""
+        centers, edges = self.centers, self.edges
+        goal_x, goal_y = centers[goal_region]
+
+        def heuristic(region):
+            x, y = centers[region]
+            return abs(x - goal_x) + abs(y - goal_y)
+
+        open_set = [(heuristic(start_region), start_region)]
+        came_from = {}
+        g_score = {start_region: 0}
+        while open_set:
+            f, current = heappop(open_set)
+            if current == goal_region:
+                path = [current]
+                while current in came_from:
+                    current = came_from[current]
+                    path.append(current)
+                return path[::-1]
+            if f > g_score[current] + heuristic(current):
+                continue  # Entrée périmée
+            for neighbor, cost in edges[current].items():
+                tentative_g_score = g_score[current] + cost
+                if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
+                    came_from[neighbor] = current
+                    g_score[neighbor] = tentative_g_score
+                    heappush(open_set, (tentative_g_score + heuristic(neighbor), neighbor))
+        return []
+
+    def find_path(self, start, goal):
+        """Chemin de cases de `start` à `goal` (mêmes conventions que dungeon_3d.find_path).
+
+        Le chemin n'est pas toujours le plus court : il reste dans les régions choisies
+        par la recherche abstraite.
+        """
+        dungeon = self.dungeon
+        self.expansions = 0
+        if not (0 <= start[0] < dungeon.width and 0 <= start[1] < dungeon.height):
+            return []
+        if not (0 <= goal[0] < dungeon.width and 0 <= goal[1] < dungeon.height):
+            return []
+        start_index = dungeon.cell_index(*start)
+        goal_index = dungeon.cell_index(*goal)
+        start_region, goal_region = self.region_of[start_index], self.region_of[goal_index]
+        if start_region < 0 or goal_region < 0:
+            return []
+
+        regions = self.region_path(start_region, goal_region)
+        if not regions:
+            return []
+        allowed = set(regions)
+
+        # A* local, limité aux cases des régions retenues
+        region_of, neighbors, stride = self.region_of, dungeon.neighbors, dungeon.stride
+        goal_x, goal_y = goal
+        open_set = [(0, start[0], start[1], start_index)]
+        came_from = {}
+        g_score = {start_index: 0}
+        closed = set()
+        while open_set:
+            _, _, _, current = heappop(open_set)
+            if current == goal_index:
+                path = []
+                while current in came_from:
+                    path.append(dungeon.index_cell(current))
+                    current = came_from[current]
+                return path[::-1]
+            if current in closed:
+                continue
+            closed.add(current)
+            self.expansions += 1
+
+            tentative_g_score = g_score[current] + 1
+            for neighbor in neighbors[current]:
+                if region_of[neighbor] not in allowed:
+                    continue
+                if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
+                    came_from[neighbor] = current
+                    g_score[neighbor] = tentative_g_score
+                    ny, nx = divmod(neighbor, stride)
+                    nx -= 1
+                    ny -= 1
+                    heappush(open_set, (tentative_g_score + abs(nx - goal_x) + abs(ny - goal_y), nx, ny, neighbor))
+        return []
+
+
+class PathCache:
+    """Cache LRU des chemins, clé (case de départ, case d'arrivée, Dungeon.level_id).
+
+    La grille est figée après la génération : un chemin ne devient faux qu'au
+    changement de niveau, et level_id change alors. Chaque case d'un chemin
+    mémorisé est aussi indexée, pour répondre à une demande partie de cette case
+    vers la même arrivée avec la fin du chemin, sans nouvelle recherche.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (start, goal, level_id) -> tuple des cases du chemin
+        self._suffixes = {}  # (case, goal, level_id) -> (clé du chemin qui y passe, position de la case)
+        self.hits = 0
+        self.suffix_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, dungeon, start, goal, search):
+        """Chemin de `start` à `goal` sur `dungeon`, calculé par `search(dungeon, start, goal)` si besoin."""
+        key = (start, goal, dungeon.level_id)
+        path = self._entries.get(key)
+        if path is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return list(path)
+
+        suffix = self._suffixes.get(key)
+        if suffix is not None:
+            owner, position = suffix
+            self.suffix_hits += 1
+            self._entries.move_to_end(owner)
+            return list(self._entries[owner][position + 1:])
+
+        self.misses += 1
+        path = tuple(search(dungeon, start, goal))
+        self._entries[key] = path
+        if path:
+            for position, cell in enumerate((start,) + path[:-1]):
+                self._suffixes[(cell, goal, dungeon.level_id)] = (key, position - 1)
+        while len(self._entries) > self.max_entries:
+            self._evict()
+        return list(path)
+
+    def _evict(self):
+        key, path = self._entries.popitem(last=False)
+        start, goal, level_id = key
+        for cell in (start,) + path[:-1]:
+            suffix_key = (cell, goal, level_id)
+            if self._suffixes.get(suffix_key, (None,))[0] == key:
+                del self._suffixes[suffix_key]
+        self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._suffixes.clear()
+
+    def stats(self):
+        """Compteurs du cache (réussites exactes et par suffixe, échecs, évictions)."""
+        lookups = self.hits + self.suffix_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "suffix_hits": self.suffix_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.suffix_hits) / lookups if lookups else 0.0,
+        }
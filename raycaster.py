@@ -0,0 +1,168 @@
+"""Raycasting vectorisé (NumPy) : une seule passe DDA pour toutes les colonnes de l'écran.
+
+Le moteur travaille sur un masque booléen des murs entouré d'une bordure de murs,
+ce qui supprime les tests de limites dans la boucle de parcours.
+"""
+import math
+from collections import namedtuple
+
+import numpy as np
+
+# Codes de face (index dans FACES), -1 si le rayon n'a rien touché
+FACES = ("N", "S", "E", "W")
+FACE_N, FACE_S, FACE_E, FACE_W = range(4)
+
+RayBatch = namedtuple("RayBatch", ["angles", "distance", "perp_distance", "hit_x", "hit_y", "face", "tex_x", "shade"])
+
+
+def wall_mask(grid):
+    """Convertit Dungeon.grid en masque booléen des murs, bordé d'une case de mur (indices décalés de 1)."""
+    walls = np.asarray(grid) == 0
+    return np.pad(walls, 1, constant_values=True)
+
+
+class CameraProjection:
+    """Tables par colonne d'écran, qui ne dépendent que de la largeur de l'écran et du FOV.
+
+    offsets : décalage angulaire du rayon de chaque colonne par rapport à l'angle du joueur
+    cos_offsets / sin_offsets : servent à la fois à la correction fisheye et à tourner
+    les rayons avec l'angle du joueur sans appeler cos/sin par colonne.
+    """
+
+    def __init__(self, width, fov):
+        self.width = width
+        self.fov = fov
+        self.half_fov = fov / 2
+        self.columns_per_radian = width / fov
+        self.offsets = -self.half_fov + (np.arange(width, dtype=np.float64) / width) * fov
+        self.cos_offsets = np.cos(self.offsets)
+        self.sin_offsets = np.sin(self.offsets)
+
+    def column_offset(self, x):
+        """Décalage angulaire de la colonne x (bornée à l'écran)."""
+        return float(self.offsets[min(max(int(x), 0), self.width - 1)])
+
+
+# Cache des projections, indexé par (largeur, fov)
+_projection_cache = {}
+
+
+def get_camera_projection(width, fov):
+    """Retourne la projection de caméra pour cette largeur d'écran et ce FOV (mise en cache)."""
+    key = (width, fov)
+    projection = _projection_cache.get(key)
+    if projection is None:
+        projection = _projection_cache[key] = CameraProjection(width, fov)
+    return projection
+
+
+def clear_camera_projections():
+    """Vide le cache des projections (à appeler quand la fenêtre est redimensionnée)."""
+    _projection_cache.clear()
+
+
+def cast_rays(pos_x, pos_y, player_angle, projection, walls, max_distance=20.0, stride=1):
+    """Lance en parallèle le rayon d'une colonne sur `stride` de `projection` depuis (pos_x, pos_y).
+
+    `walls` est le masque produit par wall_mask. Retourne un RayBatch dont chaque champ
+    est un tableau d'une valeur par rayon ; perp_distance est corrigée de l'effet fisheye
+    et shade est la luminosité (50-255) utilisée pour les murs.
+    """
+    cos_offsets = projection.cos_offsets[::stride]
+    sin_offsets = projection.sin_offsets[::stride]
+    angles = player_angle + projection.offsets[::stride]
+    n = angles.shape[0]
+
+    # Rotation des rayons de la projection par l'angle du joueur : deux appels trigonométriques par frame
+    cos_a, sin_a = math.cos(player_angle), math.sin(player_angle)
+    dir_x = cos_a * cos_offsets - sin_a * sin_offsets
+    dir_y = sin_a * cos_offsets + cos_a * sin_offsets
+
+    cell_x, cell_y = int(pos_x), int(pos_y)
+    map_x = np.full(n, cell_x + 1, dtype=np.intp)
+    map_y = np.full(n, cell_y + 1, dtype=np.intp)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        delta_x = np.where(dir_x != 0, np.abs(1.0 / dir_x), np.inf)
+        delta_y = np.where(dir_y != 0, np.abs(1.0 / dir_y), np.inf)
+        side_x = np.where(dir_x > 0, (cell_x + 1 - pos_x) * delta_x, (pos_x - cell_x) * delta_x)
+        side_y = np.where(dir_y > 0, (cell_y + 1 - pos_y) * delta_y, (pos_y - cell_y) * delta_y)
+    side_x[dir_x == 0] = np.inf
+    side_y[dir_y == 0] = np.inf
+    step_x = np.where(dir_x > 0, 1, -1)
+    step_y = np.where(dir_y > 0, 1, -1)
+
+    distance = np.full(n, float(max_distance))
+    vertical_side = np.zeros(n, dtype=bool)
+    hit = np.zeros(n, dtype=bool)
+    active = np.ones(n, dtype=bool)
+
+    # Chaque itération avance chaque rayon actif d'exactement une case
+    while active.any():
+        use_x = side_x < side_y
+        t = np.where(use_x, side_x, side_y)
+
+        adv_x = active & use_x
+        adv_y = active & ~use_x
+        map_x += step_x * adv_x
+        map_y += step_y * adv_y
+        side_x = np.where(adv_x, side_x + delta_x, side_x)
+        side_y = np.where(adv_y, side_y + delta_y, side_y)
+
+        active &= t <= max_distance
+        landed = active & walls[map_y, map_x]
+        distance[landed] = t[landed]
+        vertical_side[landed] = use_x[landed]
+        hit |= landed
+        active &= ~landed
+
+    hit_x = pos_x + dir_x * distance
+    hit_y = pos_y + dir_y * distance
+
+    face = np.full(n, -1, dtype=np.int8)
+    face[hit & vertical_side & (step_x > 0)] = FACE_W
+    face[hit & vertical_side & (step_x < 0)] = FACE_E
+    face[hit & ~vertical_side & (step_y > 0)] = FACE_N
+    face[hit & ~vertical_side & (step_y < 0)] = FACE_S
+
+    # Coordonnée de texture orientée pour que les textures ne soient pas inversées selon la face
+    tex_x = np.where(vertical_side, hit_y - np.floor(hit_y), hit_x - np.floor(hit_x))
+    flip = (face == FACE_E) | (face == FACE_N)
+    tex_x[flip] = 1.0 - tex_x[flip]
+    tex_x[~hit] = 0.0
+
+    perp_distance = distance * cos_offsets
+    shade = np.maximum(50, 255 - (perp_distance * 12).astype(np.int32))
+
+    return RayBatch(angles, distance, perp_distance, hit_x, hit_y, face, tex_x, shade)
+
+
+def wall_strips(rays, height):
+    """Convertit un RayBatch en bandes verticales prêtes à dessiner.
+
+    Retourne (wall_top, wall_bottom, colors) : deux tableaux d'entiers et un tableau
+    (n, 3) uint8 reproduisant les couleurs rayées du rendu historique.
+    """
+    perp = np.maximum(rays.perp_distance, 0.0)
+    wall_height = (height / (perp + 0.1)).astype(np.int32)
+    wall_top = (height - wall_height) // 2
+    wall_bottom = wall_top + wall_height
+
+    base_color = np.where((rays.tex_x * 8).astype(np.int32) % 2 == 0, 120, 100)
+    shade = rays.shade
+    colors = np.empty((rays.angles.shape[0], 3), dtype=np.uint8)
+    colors[:, 0] = np.minimum(255, base_color + shade // 3)
+    colors[:, 1] = np.minimum(255, base_color // 2 + shade // 4)
+    colors[:, 2] = np.minimum(255, base_color // 3 + shade // 5)
+    return wall_top, wall_bottom, colors
+
+
+def visible_spans(depth_buffer, x_start, x_end, depth):
+    """Intervalles [début, fin[ des colonnes de [x_start, x_end[ où un objet à `depth` est devant les murs."""
+    x_start = max(x_start, 0)
+    x_end = min(x_end, depth_buffer.shape[0])
+    if x_start >= x_end:
+        return []
+    visible = np.concatenate(([False], depth_buffer[x_start:x_end] > depth, [False]))
+    edges = np.flatnonzero(visible[1:] != visible[:-1])
+    return [(x_start + int(start), x_start + int(end)) for start, end in zip(edges[::2], edges[1::2])]
@@ -0,0 +1,109 @@
+"""Index spatial des entités sur une grille uniforme.
+
+Chaque entité (objet avec des attributs x et y) est rangée dans la case entière
+qui contient sa position. Les requêtes de proximité ne parcourent que les cases
+couvertes par le rayon demandé, au lieu de toute la liste des entités.
+"""
+import math
+
+# En dessous de ce nombre d'entités, nearest balaye toutes les entités plutôt que les anneaux de cases
+LINEAR_SCAN_MAX = 32
+
+
+class SpatialHash:
+    def __init__(self, entities=(), cell_size=1.0):
+        self.cell_size = cell_size
+        self.buckets = {}  # (cx, cy) -> liste des entités de la case
+        self.cells = {}  # entité -> case où elle est rangée
+        for entity in entities:
+            self.insert(entity)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, entity):
+        return entity in self.cells
+
+    def cell_of(self, x, y):
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def insert(self, entity):
+        cell = self.cell_of(entity.x, entity.y)
+        self.cells[entity] = cell
+        self.buckets.setdefault(cell, []).append(entity)
+
+    def remove(self, entity):
+        cell = self.cells.pop(entity, None)
+        if cell is None:
+            return False
+        bucket = self.buckets[cell]
+        bucket.remove(entity)
+        if not bucket:
+            del self.buckets[cell]
+        return True
+
+    def update(self, entity):
+        """À appeler après un déplacement ; ne change l'entité de case que si elle en a franchi la frontière."""
+        cell = self.cell_of(entity.x, entity.y)
+        if self.cells.get(entity) == cell:
+            return False
+        self.remove(entity)
+        self.cells[entity] = cell
+        self.buckets.setdefault(cell, []).append(entity)
+        return True
+
+    def nearby(self, x, y, radius):
+        """Entités des cases recoupant le carré de demi-côté `radius` autour de (x, y).
+
+        Le filtrage est grossier : l'appelant fait son propre test de distance.
+        """
+        min_x, min_y = self.cell_of(x - radius, y - radius)
+        max_x, max_y = self.cell_of(x + radius, y + radius)
+        buckets = self.buckets
+        for cy in range(min_y, max_y + 1):
+            for cx in range(min_x, max_x + 1):
+                bucket = buckets.get((cx, cy))
+                if bucket:
+                    yield from bucket
+
+    def nearest(self, x, y):
+        """Entité la plus proche de (x, y), ou None si l'index est vide.
+
+        Les cases sont parcourues par anneaux autour de celle de (x, y) ; la recherche
+        s'arrête dès qu'aucun anneau plus lointain ne peut contenir d'entité plus proche.
+        """
+        if not self.cells:
+            return None
+        if len(self.cells) <= LINEAR_SCAN_MAX:
+            return min(self.cells, key=lambda e: (e.x - x) ** 2 + (e.y - y) ** 2)
+        center_x, center_y = self.cell_of(x, y)
+        best, best_distance = None, math.inf
+        remaining = len(self.cells)
+        ring = 0
+        while remaining:
+            for cell in self._ring(center_x, center_y, ring):
+                bucket = self.buckets.get(cell)
+                if not bucket:
+                    continue
+                remaining -= len(bucket)
+                for entity in bucket:
+                    distance = (entity.x - x) ** 2 + (entity.y - y) ** 2
+                    if distance < best_distance:
+                        best, best_distance = entity, distance
+            # Toute entité d'un anneau suivant est à au moins `ring` cases de (x, y)
+            if best is not None and best_distance <= (ring * self.cell_size) ** 2:
+                break
+            ring += 1
+        return best
+
+    @staticmethod
+    def _ring(center_x, center_y, ring):
+        if ring == 0:
+            yield center_x, center_y
+            return
+        for cx in range(center_x - ring, center_x + ring + 1):
+            yield cx, center_y - ring
+            yield cx, center_y + ring
+        for cy in range(center_y - ring + 1, center_y + ring):
+            yield center_x - ring, cy
+            yield center_x + ring, cy
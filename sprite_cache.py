@@ -0,0 +1,77 @@
+"""Cache LRU des sprites mis à l'échelle et teintés.
+
+Le rendu d'un ennemi demandait à chaque frame un pygame.transform.scale, une copie
+et un fill(BLEND_MULT). Ici la hauteur affichée et la luminosité sont quantifiées
+pour que les mêmes surfaces soient réutilisées d'une frame à l'autre.
+"""
+from collections import OrderedDict
+
+import pygame
+
+
+class ScaledSpriteCache:
+    def __init__(self, max_bytes=32 * 1024 * 1024, height_step=4, brightness_levels=16):
+        self.max_bytes = max_bytes
+        self.height_step = height_step
+        self.brightness_levels = brightness_levels
+        self._entries = OrderedDict()
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def quantize_height(self, height):
+        """Arrondit une hauteur en pixels au palier supérieur (paliers plus larges pour les grands sprites)."""
+        step = max(self.height_step, height // 24)
+        return max(step, (height + step - 1) // step * step)
+
+    def get(self, sprite_key, sprite, height, brightness=1.0, tint=None):
+        """Retourne `sprite` mis à l'échelle à `height` pixels (déjà quantifiée) et assombri.
+
+        `tint` (couleur RGB) remplace l'assombrissement par une teinte, par exemple
+        le rouge d'un ennemi touché. `sprite_key` identifie l'image source.
+        """
+        brightness_bucket = None
+        if tint is None:
+            brightness_bucket = round(max(0.0, min(1.0, brightness)) * (self.brightness_levels - 1))
+        key = (sprite_key, height, brightness_bucket, tint)
+
+        surface = self._entries.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        original_width, original_height = sprite.get_size()
+        width = max(1, int(height * original_width / original_height))
+        surface = pygame.transform.scale(sprite, (width, height))
+        if tint is not None:
+            surface.fill(tint, special_flags=pygame.BLEND_MULT)
+        elif brightness_bucket < self.brightness_levels - 1:
+            level = int(255 * brightness_bucket / (self.brightness_levels - 1))
+            surface.fill((level, level, level), special_flags=pygame.BLEND_MULT)
+
+        self._entries[key] = surface
+        self.bytes_used += width * height * surface.get_bytesize()
+        while self.bytes_used > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes_used -= evicted.get_width() * evicted.get_height() * evicted.get_bytesize()
+            self.evictions += 1
+        return surface
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes_used = 0
+
+    def stats(self):
+        """Compteurs du cache (taux de réussite, taille mémoire, évictions)."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes_used,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
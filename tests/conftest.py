@@ -0,0 +1,6 @@
+"""Les modules du jeu sont à la racine du dépôt, sans paquet : on les rend importables."""
+import os
+import sys
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
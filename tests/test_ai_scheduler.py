@@ -0,0 +1,70 @@
+from ai_scheduler import AIScheduler
+
+
+class FakeEnemy:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+class FakePlayer:
+    x = 0.0
+    y = 0.0
+
+
+class FakeClock:
+    """Horloge avancée à la main : chaque mise à jour « coûte » le temps qu'on lui ajoute."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_slow_near_updates_do_not_starve_far_enemies():
+    near = [FakeEnemy(1.0, 0.0) for _ in range(3)]
+    far = [FakeEnemy(30.0 + i, 0.0) for i in range(40)]
+    clock = FakeClock()
+    scheduler = AIScheduler(budget_ms=2.0, max_delay_ticks=8, clock=clock)
+    last_update = {enemy: 0 for enemy in far}
+    worst_gap = 0
+
+    for tick in range(1, 61):
+        for enemy, _ in scheduler.schedule(near + far, FakePlayer, tick):
+            if enemy in last_update:
+                worst_gap = max(worst_gap, tick - last_update[enemy])
+                last_update[enemy] = tick
+                clock.now += 0.001  # Mise à jour lointaine lente : le budget n'en laisse passer que trois
+            else:
+                clock.now += 0.001  # Les proches seuls prennent plus que le budget de 2 ms
+
+    assert scheduler.deferred > 0
+    assert worst_gap <= scheduler.max_delay_ticks
+    assert all(60 - tick <= scheduler.max_delay_ticks for tick in last_update.values())
+
+
+def test_far_updates_stop_at_the_budget():
+    far = [FakeEnemy(30.0, float(i)) for i in range(10)]
+    clock = FakeClock()
+    scheduler = AIScheduler(budget_ms=2.0, clock=clock)
+    list(scheduler.schedule(far, FakePlayer, 1))
+    updates = scheduler.updates
+    # Tick 5 : après une période complète les dix ennemis lointains sont dus, chacun coûte 1 ms
+    for _ in scheduler.schedule(far, FakePlayer, 5):
+        clock.now += 0.001
+
+    # Le troisième dépasse les 2 ms après coup ; les sept suivants sont reportés
+    assert scheduler.updates - updates == 3
+    assert scheduler.deferred == 7
+    assert scheduler.overruns == 1
+    assert scheduler.last_tick_ms == 3.0
+
+
+def test_without_budget_every_due_enemy_is_updated():
+    far = [FakeEnemy(30.0, float(i)) for i in range(10)]
+    scheduler = AIScheduler()
+    for tick in range(1, 9):
+        list(scheduler.schedule(far, FakePlayer, tick))
+    assert scheduler.deferred == 0
+    assert scheduler.updates == 2 * len(far)  # Période de 4 ticks sur 8 ticks
@@ -0,0 +1,36 @@
+import random
+
+import pytest
+
+from dungeon_3d import Dungeon
+
+
+def open_dungeon(width=6, height=4):
+    """Donjon dont toutes les cases sont praticables : seuls les abords de la carte sont des murs."""
+    dungeon = Dungeon(width, height, seed=1)
+    dungeon.grid = [[1] * width for _ in range(height)]
+    dungeon.freeze()
+    return dungeon
+
+
+@pytest.mark.parametrize("x, y", [
+    (6.5, 0.5),  # Juste après la bordure de droite : l'index tomberait sur la ligne suivante
+    (7.2, 1.5),
+    (0.5, 5.5),  # Sous la bordure du bas : hors du bytearray
+    (-2.5, 1.5),  # Index négatifs : lus depuis la fin du tableau
+    (1.5, -3.0),
+    (1e6, -1e6),
+])
+def test_is_wall_far_outside_the_map(x, y):
+    assert open_dungeon().is_wall(x, y)
+
+
+def test_is_wall_matches_the_grid_for_overshooting_points():
+    dungeon = Dungeon(20, 20, seed=5)
+    dungeon.generate()
+    rng = random.Random(2)
+    for _ in range(5000):
+        # Balle ou rayon qui dépasse largement la carte dans toutes les directions
+        x, y = rng.uniform(-60, 80), rng.uniform(-60, 80)
+        inside = 0 <= x < dungeon.width and 0 <= y < dungeon.height
+        assert dungeon.is_wall(x, y) == (not inside or dungeon.grid[int(y)][int(x)] == 0)
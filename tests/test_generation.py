@@ -0,0 +1,42 @@
+import statistics
+
+import pytest
+
+from generation import init_dungeon, make_rng, scatter_rooms
+
+
+def rooms_touch(a, b):
+    """Vrai si les salles se chevauchent ou se touchent (par un côté ou un coin)."""
+    return (a["x"] - 1 < b["x"] + b["w"] and a["x"] + a["w"] + 1 > b["x"] and
+            a["y"] - 1 < b["y"] + b["h"] and a["y"] + a["h"] + 1 > b["y"])
+
+
+def scattered(size, max_rooms, min_size, max_size, seeds=range(60)):
+    for seed in seeds:
+        dungeon = init_dungeon(size, size, seed)
+        scatter_rooms(dungeon, make_rng(seed), max_rooms, min_size, max_size)
+        yield dungeon
+
+
+@pytest.mark.parametrize("size, max_rooms, min_size, max_size", [(20, 10, 3, 6), (41, 25, 3, 6), (80, 25, 3, 8)])
+def test_scattered_rooms_never_touch(size, max_rooms, min_size, max_size):
+    for dungeon in scattered(size, max_rooms, min_size, max_size):
+        rooms = dungeon["rooms"]
+        assert not any(rooms_touch(a, b) for i, a in enumerate(rooms) for b in rooms[i + 1:])
+
+
+@pytest.mark.parametrize("size, max_rooms, min_size, max_size", [(41, 25, 3, 6), (50, 25, 3, 8)])
+def test_scattered_size_distribution_survives_crowded_maps(size, max_rooms, min_size, max_size):
+    rooms = []
+    for dungeon in scattered(size, max_rooms, min_size, max_size):
+        assert len(dungeon["rooms"]) == max_rooms
+        rooms += dungeon["rooms"]
+
+    sizes = range(min_size, max_size + 1)
+    # Tailles tirées uniformément : moyenne proche du milieu, toutes les tailles présentes,
+    # et pas d'afflux de salles rabattues à la taille minimale
+    assert abs(statistics.mean(room["w"] for room in rooms) - (min_size + max_size) / 2) < 0.3
+    assert abs(statistics.mean(room["h"] for room in rooms) - (min_size + max_size) / 2) < 0.3
+    assert {room["w"] for room in rooms} == set(sizes)
+    smallest = sum(room["w"] == room["h"] == min_size for room in rooms) / len(rooms)
+    assert smallest < 2 / len(sizes) ** 2
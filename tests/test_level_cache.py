@@ -0,0 +1,23 @@
+import os
+
+from level_cache import LevelCache, LevelData
+
+LEVEL = LevelData(3, 2, bytes([0, 1, 0, 1, 1, 0]), ((1, 0, 1, 2),), ((1, 1, "orc"),), ((1, 0, 25),))
+
+
+def test_disk_cache_keeps_at_most_max_files(tmp_path):
+    cache = LevelCache(str(tmp_path), max_files=3)
+    for seed in range(6):
+        cache.put((seed, 3, 2, (10, 3, 6), 1), LEVEL)
+        # Dates distinctes : _prune supprime les plus anciens
+        os.utime(cache._path((seed, 3, 2, (10, 3, 6), 1)), (seed, seed))
+    cache.put((6, 3, 2, (10, 3, 6), 1), LEVEL)
+
+    assert sorted(os.listdir(tmp_path)) == ["4_3_2_10_3_6_1.lvl", "5_3_2_10_3_6_1.lvl", "6_3_2_10_3_6_1.lvl"]
+    assert cache.stats()["pruned"] == 4
+
+
+def test_disk_hit_reads_back_the_level(tmp_path):
+    key = (7, 3, 2, (10, 3, 6), 1)
+    LevelCache(str(tmp_path)).put(key, LEVEL)
+    assert LevelCache(str(tmp_path)).get(key) == LEVEL
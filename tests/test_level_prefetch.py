@@ -0,0 +1,31 @@
+import numpy as np
+
+import dungeon_3d
+from dungeon_3d import Dungeon, prepare_level
+from level_prefetch import LevelPrefetcher
+
+KEY = (42, 20, 20, dungeon_3d.ROOM_PARAMS, 1)
+
+
+def test_worker_prepares_a_minimap_array_and_no_surface():
+    prefetcher = LevelPrefetcher(prepare_level)
+    prefetcher.request(KEY, ["orc"])
+    assert prefetcher.wait(timeout=10)
+    prepared = prefetcher.take(KEY)
+    prefetcher.shutdown()
+
+    # Aucune Surface pygame n'est créée dans le thread de fond : Game.install_level s'en charge
+    assert isinstance(prepared.minimap, np.ndarray)
+    assert prepared.minimap.shape == (20, 20, 3)
+    assert prepared.minimap_surface is None
+
+
+def test_prepared_dungeon_is_frozen_once(monkeypatch):
+    freezes = []
+    original = Dungeon.freeze
+    monkeypatch.setattr(Dungeon, "freeze", lambda self: freezes.append(self) or original(self))
+
+    prepared = prepare_level(KEY, ["orc"])
+
+    assert freezes == [prepared.dungeon]
+    assert not prepared.dungeon.is_wall(*dungeon_3d.start_position(prepared.dungeon))
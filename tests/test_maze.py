@@ -0,0 +1,53 @@
+import random
+from collections import deque
+
+import pytest
+
+import generation
+from dungeon_3d import Game
+
+
+def walkable_cells(grid):
+    return {(x, y) for y, row in enumerate(grid) for x, cell in enumerate(row) if cell != generation.EMPTY}
+
+
+def connected(cells):
+    start = next(iter(cells))
+    seen, queue = {start}, deque([start])
+    while queue:
+        x, y = queue.popleft()
+        for neighbor in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if neighbor in cells and neighbor not in seen:
+                seen.add(neighbor)
+                queue.append(neighbor)
+    return seen == cells
+
+
+@pytest.mark.parametrize("corridor_layout", ["Labyrinth", "Bent", "Straight"])
+@pytest.mark.parametrize("size", [20, 41, 80])
+def test_generate_with_corridor_layout_returns_a_valid_level(corridor_layout, size):
+    for seed in range(5):
+        dungeon = generation.generate(size, size, seed, min_size=3, max_size=6, corridor_layout=corridor_layout)
+        grid = dungeon["grid"]
+        assert len(grid) == size and all(len(row) == size for row in grid)
+        assert dungeon["rooms"]
+        assert sorted(stair["type"] for stair in dungeon["stairs"]) == ["down", "up"]
+        for stair in dungeon["stairs"]:
+            expected = generation.STAIRS_UP if stair["type"] == "up" else generation.STAIRS_DOWN
+            assert grid[stair["y"]][stair["x"]] == expected
+        assert connected(walkable_cells(grid))
+        assert generation.generate(size, size, seed, min_size=3, max_size=6,
+                                   corridor_layout=corridor_layout)["grid"] == grid
+
+
+def test_game_spawns_enemies_and_potions_in_a_maze_level():
+    random.seed(3)
+    game = Game(headless=True, corridor_layout="Bent")
+    game.verbose = False
+    game.start_new_level(2)
+
+    floor = walkable_cells(game.dungeon.grid)
+    assert game.level_key[3] == game.room_params and "Bent" in game.room_params
+    assert game.enemies and game.health_potions
+    for entity in [*game.enemies, *game.health_potions, game.player]:
+        assert (int(entity.x), int(entity.y)) in floor
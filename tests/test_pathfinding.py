@@ -0,0 +1,44 @@
+from dungeon_3d import Dungeon, Enemy, Player3D
+from spatial_hash import SpatialHash
+
+
+def corner_dungeon():
+    """Couloir en L : le joueur au bout d'une branche ne voit pas le début de l'autre."""
+    dungeon = Dungeon(7, 7, seed=1)
+    for x in range(1, 6):
+        dungeon.grid[1][x] = 2
+    for y in range(1, 6):
+        dungeon.grid[y][5] = 2
+    dungeon.freeze()
+    return dungeon
+
+
+def test_hidden_enemies_follow_the_shared_flow_field():
+    dungeon = corner_dungeon()
+    player = Player3D(5.5, 5.5)
+    enemies = [Enemy(1.5, 1.5, "orc"), Enemy(2.5, 1.5, "goblin")]
+    index = SpatialHash(enemies)
+    assert not dungeon.get_field_of_view((5, 5)).is_visible(1.5, 1.5)
+
+    for _ in range(120):
+        for enemy in enemies:
+            enemy.update(player, dungeon, index)
+            index.update(enemy)
+
+    flow_field = dungeon.flow_field
+    assert flow_field.updates == 1  # Un seul BFS tant que le joueur reste dans sa case
+    assert flow_field.distance((int(enemies[0].x), int(enemies[0].y))) < 8
+    assert all(not dungeon.is_wall(enemy.x, enemy.y) for enemy in enemies)
+
+
+def test_enemies_beyond_chase_distance_stay_put():
+    dungeon = Dungeon(30, 3, seed=1)
+    dungeon.grid[1] = [0] + [2] * 28 + [0]
+    dungeon.freeze()
+    player = Player3D(1.5, 1.5)
+    enemy = Enemy(28.5, 1.5, "orc")
+
+    for _ in range(120):
+        enemy._try_move(dungeon, player, SpatialHash([enemy]))
+
+    assert (enemy.x, enemy.y) == (28.5, 1.5)
@@ -0,0 +1,20 @@
+from dungeon_3d import Dungeon
+
+# Taille maximale des labyrinthes de maze.py
+SIZE = 1001
+
+
+def test_field_of_view_on_a_large_open_map():
+    # Carte ouverte coupée par une ligne de piliers le long de la diagonale : chaque pilier
+    # ouvre une nouvelle zone d'ombre, plus de 1000 imbrications avec une version récursive
+    dungeon = Dungeon(SIZE, SIZE, seed=1)
+    dungeon.grid = [[1] * SIZE for _ in range(SIZE)]
+    for k in range(SIZE - 1):
+        dungeon.grid[k][k + 1] = 0
+    dungeon.freeze()
+
+    field_of_view = dungeon.get_field_of_view((0, 0))
+
+    assert field_of_view.is_visible(SIZE - 0.5, SIZE - 0.5)  # Bout de la diagonale, le long des piliers
+    assert field_of_view.is_visible(0.5, SIZE - 0.5)
+    assert not field_of_view.is_visible(SIZE - 0.5, 0.5)  # Derrière la ligne de piliers
@@ -0,0 +1,115 @@
+"""Champ de vision partagé par les ennemis.
+
+FieldOfView : un shadowcasting depuis la case du joueur marque toutes les cases
+visibles dans un bytearray indexé comme Dungeon.walkable. Il n'est recalculé que
+lorsque le joueur change de case ; chaque test de visibilité est ensuite une
+simple lecture. Le balayage utilise une pile explicite plutôt que la récursion,
+pour les grandes cartes.
+"""
+import math
+
+# Transformations (xx, xy, yx, yy) ramenant chacun des 8 octants au premier
+OCTANTS = [
+    (1, 0, 0, 1), (0, 1, 1, 0), (0, -1, 1, 0), (-1, 0, 0, 1),
+    (-1, 0, 0, -1), (0, -1, -1, 0), (0, 1, -1, 0), (1, 0, 0, -1),
+]
+
+
+class FieldOfView:
+    def __init__(self, dungeon):
+        self.dungeon = dungeon
+        self.origin = None
+        self.visible = bytearray(len(dungeon.walkable))
+        self._lit = []  # Index marqués, pour remettre `visible` à zéro sans tout parcourir
+        self.updates = 0
+
+    def update(self, origin):
+        """Recalcule les cases visibles depuis la case `origin` ; ne fait rien si elle n'a pas changé."""
+        if origin == self.origin:
+            return False
+        self.origin = origin
+        self.updates += 1
+
+        for index in self._lit:
+            self.visible[index] = 0
+        self._lit = []
+
+        dungeon = self.dungeon
+        x, y = origin
+        if not (0 <= x < dungeon.width and 0 <= y < dungeon.height):
+            return True
+
+        self._light(dungeon.cell_index(x, y))
+        # Portée suffisante pour traverser toute la carte : seuls les murs arrêtent la vue
+        radius = dungeon.width + dungeon.height
+        for xx, xy, yx, yy in OCTANTS:
+            self._cast_light(x, y, radius, xx, xy, yx, yy)
+        return True
+
+    def _light(self, index):
+        if not self.visible[index]:
+            self.visible[index] = 1
+            self._lit.append(index)
+
+    def _cast_light(self, cx, cy, radius, xx, xy, yx, yy):
+        """Balaye un octant ligne par ligne (algorithme de Bergström).
+
+        Chaque mur qui ouvre une zone d'ombre empile la suite du balayage au-dessus
+        de lui, sous forme (ligne, pente start, pente end), au lieu d'un appel
+        récursif : la profondeur ne dépend plus de la taille de la carte.
+        """
+        dungeon = self.dungeon
+        walkable, stride = dungeon.walkable, dungeon.stride
+        # Coordonnées admises : la carte et sa bordure de murs
+        min_x, max_x, min_y, max_y = -1, dungeon.width, -1, dungeon.height
+        stack = [(1, 1.0, 0.0)]
+
+        while stack:
+            row, start, end = stack.pop()
+            if start < end:
+                continue
+            new_start = start
+
+            for j in range(row, radius + 1):
+                # Première colonne utile déduite de la pente `start` (les précédentes sont dans l'ombre)
+                dx, dy = max(-j, math.ceil(-start * (j + 0.5) - 0.5) - 1) - 1, -j
+                blocked = False
+                while dx <= 0:
+                    dx += 1
+                    map_x = cx + dx * xx + dy * xy
+                    map_y = cy + dx * yx + dy * yy
+                    left_slope = (dx - 0.5) / (dy + 0.5)
+                    right_slope = (dx + 0.5) / (dy - 0.5)
+                    if start < right_slope:
+                        continue
+                    if end > left_slope:
+                        break
+
+                    if min_x <= map_x <= max_x and min_y <= map_y <= max_y:
+                        index = (map_y + 1) * stride + map_x + 1
+                        opaque = not walkable[index]
+                        # Un mur est visible dès qu'une partie l'est, une case libre seulement par son centre
+                        if opaque or start >= dx / dy >= end:
+                            self._light(index)
+                    else:
+                        opaque = True
+
+                    if blocked:
+                        if opaque:
+                            new_start = right_slope
+                        else:
+                            blocked = False
+                            start = new_start
+                    elif opaque and j < radius:
+                        blocked = True
+                        stack.append((j + 1, start, left_slope))
+                        new_start = right_slope
+                if blocked:
+                    break
+
+    def is_visible(self, x, y):
+        """Vrai si la position (x, y) est dans une case visible depuis la case d'origine."""
+        dungeon = self.dungeon
+        if not (0 <= x < dungeon.width and 0 <= y < dungeon.height):
+            return False
+        return self.visible[dungeon.cell_index(int(x), int(y))] == 1